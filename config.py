@@ -3,10 +3,13 @@ Configuración de la aplicación móvil
 """
 
 import os
-from dotenv import load_dotenv
 
-# Cargar variables de entorno
-load_dotenv()
+# Cargar variables de entorno (python-dotenv no se empaqueta en el APK)
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
 
 # URL del backend API
 API_BASE_URL = os.getenv('API_URL', 'https://chat-cv1i.onrender.com')
@@ -15,16 +18,171 @@ API_BASE_URL = os.getenv('API_URL', 'https://chat-cv1i.onrender.com')
 DEFAULT_USERNAME = os.getenv('USUARIO', 'UsuarioMovil')
 
 # Configuración de timeouts
-REQUEST_TIMEOUT = 10
-MAX_RETRIES = 3
+REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '10'))
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
 
-# Configuración de UI
+# Timeouts por endpoint (segundos), se aplica el prefijo más largo que coincida
+ENDPOINT_TIMEOUTS = {
+    '/canales': 10,
+    '/mensajes/': 15,
+    '/enviar': 10,
+    '/api/personnel/': 15,
+    '/api/reports/': 30,
+}
+HEALTH_CHECK_TIMEOUT = 5
+
+# Monitor de salud: Render duerme la instancia gratuita tras ~15 min sin
+# tráfico y despertarla puede tardar más de 30 s (segundos)
+HEALTH_WARMUP_TIMEOUT = 60
+HEALTH_INTERVAL_MIN = 5
+HEALTH_INTERVAL_MAX = 300
+HEALTH_SAMPLE_WINDOW = 100
+
+# Reintentos con backoff exponencial y jitter (segundos)
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 8
+
+# Reutilización de respuestas GET idénticas (segundos)
+GET_MEMO_TTL = 2
+
+# Pool de conexiones keep-alive
+HTTP_POOL_CONNECTIONS = 2
+HTTP_POOL_MAXSIZE = 4
+
+# Peticiones simultáneas del ejecutor de red
+NETWORK_WORKERS = 2
+
+# Formato de las respuestas: compresión siempre y MessagePack (si el módulo
+# msgpack está instalado) en los endpoints de listas
+WIRE_ENCODINGS = 'gzip, deflate'
+WIRE_MSGPACK = os.getenv('CORPOTACHIRA_MSGPACK', '1') == '1'
+WIRE_COMPACT_PATHS = ('/mensajes/', '/api/personnel/', '/api/reports/')
+
+# Configuración de UI (tamaño de ventana solo en escritorio)
 MOBILE_WINDOW_WIDTH = 360
 MOBILE_WINDOW_HEIGHT = 640
+UI_ANIMATIONS = True  # Transiciones animadas entre pantallas
 
 # Configuración de colores (Material Design)
 THEME_COLORS = {
     'primary': 'Blue',
     'accent': 'Orange',
     'style': 'Light'
-}
\ No newline at end of file
+}
+
+# Planificador de trabajo de UI
+UI_FRAME_BUDGET_MS = 8  # Milisegundos por frame (a 60 fps el frame dura 16,6)
+UI_VISIBLE_ITEMS = 20  # Elementos de una lista que se crean con prioridad
+
+# Reserva de widgets de lista reutilizados entre cargas y sesiones
+WIDGET_POOL_MAX_PER_KIND = 60
+
+# Retención del estado de pestañas ocultas
+TAB_RETAIN_STATE = os.getenv('TAB_RETAIN_STATE', '0') == '1'
+TAB_STATE_MEMORY_BUDGET = 6 * 1024 * 1024  # Bytes estimados para pestañas ocultas
+TAB_STATE_WIDGET_BYTES = 4 * 1024  # Estimación de memoria por widget
+
+# Caché local (SQLite) de respuestas del backend
+CACHE_DB_NAME = 'cache.sqlite3'
+CACHE_FRESH_SECONDS = 10  # Dentro de este margen no se revalida con el servidor
+
+# Caché de imágenes remotas (avatares, adjuntos de reportes)
+IMAGE_CACHE_DIR = 'images'
+IMAGE_MEMORY_BUDGET = 24 * 1024 * 1024  # Bytes de texturas en memoria
+IMAGE_DISK_BUDGET = 64 * 1024 * 1024  # Bytes de archivos en disco
+IMAGE_WORKERS = 2  # Hilos de descarga y decodificación
+IMAGE_TIMEOUT = 20
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# Sincronización incremental de mensajes (segundos)
+SYNC_LONG_POLL_WAIT = 25
+SYNC_POLL_INTERVAL = 5
+SYNC_MAX_POLL_INTERVAL = 60  # Tope del sondeo si el servidor ignora el cursor
+
+# Bandeja de salida de mensajes
+OUTBOX_DB_NAME = 'outbox.sqlite3'
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_KEEP_SENT_SECONDS = 24 * 3600
+
+# Líneas que conserva el registro de mensajes en pantalla
+MESSAGE_LOG_LIMIT = int(os.getenv('MESSAGE_LOG_LIMIT', '200'))
+
+# Precarga de pestañas tras el login (segundos)
+TAB_PREWARM_ENABLED = True
+TAB_PREWARM_DELAY = 1.0
+TAB_PREWARM_INTERVAL = 0.25
+
+# Reportes: descarga por páginas en streaming y agregados en el dispositivo
+REPORTS_DB_NAME = 'reports.sqlite3'
+REPORT_PAGE_SIZE = 500  # Filas por página pedida al servidor
+REPORT_STREAM_CHUNK = 16 * 1024  # Bytes leídos de la respuesta cada vez
+REPORT_UI_BATCH = 100  # Filas por entrega a la UI
+REPORT_CACHE_SECONDS = 15 * 60  # Tras este margen un rango se vuelve a descargar
+REPORT_MAX_RANGES = 12  # Rangos descargados que se conservan
+REPORT_MAX_PAGES = 500  # Tope de páginas por descarga
+
+# Sesión persistente
+SESSION_FILE_NAME = 'session.json'
+SESSION_TTL = 7 * 24 * 3600  # Vigencia máxima de la sesión guardada (segundos)
+# Endpoint que responde 401/403 a un token inválido; el backend documentado
+# no lo tiene (404) y entonces la sesión no se puede verificar
+SESSION_VALIDATE_PATH = os.getenv('SESSION_VALIDATE_PATH', '/api/auth/verify')
+
+# Instrumentación de rendimiento (también con CORPOTACHIRA_METRICS=1)
+METRICS_ENABLED = os.getenv('CORPOTACHIRA_METRICS', '0') == '1'
+METRICS_WINDOW = 200  # Muestras por métrica para los percentiles
+METRICS_OVERLAY_INTERVAL = 1.0  # Segundos entre refrescos de la superposición
+METRICS_EXPORT_NAME = 'metrics.json'
+
+# Perfil de rendimiento del dispositivo: 'auto' lo elige al arrancar por
+# núcleos y RAM y baja un nivel si los primeros frames son lentos;
+# CORPOTACHIRA_PROFILE=low|medium|high lo fija. Cada perfil sustituye las
+# constantes de arriba (medium usa los valores por defecto); una variable
+# de entorno con el nombre de la constante tiene prioridad
+PERFORMANCE_PROFILE = os.getenv('CORPOTACHIRA_PROFILE', 'auto')
+PROFILE_LOW_MAX_CPUS = 2
+PROFILE_LOW_MAX_RAM_MB = 2048
+PROFILE_HIGH_MIN_CPUS = 6
+PROFILE_HIGH_MIN_RAM_MB = 6144
+PROFILE_FRAME_SAMPLES = 120  # Frames medidos tras el arranque
+PROFILE_FRAME_DELAY = 3.0  # Segundos tras el arranque antes de medir
+PROFILE_SLOW_FRAME_MS = 30  # Mediana por encima de la cual se baja un nivel
+PERFORMANCE_PROFILES = {
+    'low': {
+        'UI_ANIMATIONS': False,
+        'UI_FRAME_BUDGET_MS': 6,
+        'UI_VISIBLE_ITEMS': 12,
+        'MESSAGE_LOG_LIMIT': 100,
+        'REPORT_PAGE_SIZE': 200,
+        'REPORT_UI_BATCH': 50,
+        'REPORT_MAX_RANGES': 6,
+        'IMAGE_MEMORY_BUDGET': 8 * 1024 * 1024,
+        'IMAGE_DISK_BUDGET': 32 * 1024 * 1024,
+        'IMAGE_WORKERS': 1,
+        'HTTP_POOL_MAXSIZE': 2,
+        'SYNC_POLL_INTERVAL': 10,
+        'TAB_STATE_MEMORY_BUDGET': 2 * 1024 * 1024,
+        'TAB_PREWARM_ENABLED': False,
+        'WIDGET_POOL_MAX_PER_KIND': 30,
+        'METRICS_WINDOW': 100,
+    },
+    'medium': {},
+    'high': {
+        'UI_FRAME_BUDGET_MS': 10,
+        'UI_VISIBLE_ITEMS': 40,
+        'MESSAGE_LOG_LIMIT': 400,
+        'REPORT_PAGE_SIZE': 1000,
+        'REPORT_UI_BATCH': 200,
+        'REPORT_MAX_RANGES': 24,
+        'IMAGE_MEMORY_BUDGET': 64 * 1024 * 1024,
+        'IMAGE_DISK_BUDGET': 128 * 1024 * 1024,
+        'IMAGE_WORKERS': 3,
+        'NETWORK_WORKERS': 4,
+        'HTTP_POOL_MAXSIZE': 6,
+        'SYNC_POLL_INTERVAL': 3,
+        'TAB_STATE_MEMORY_BUDGET': 16 * 1024 * 1024,
+        'TAB_PREWARM_INTERVAL': 0.1,
+        'WIDGET_POOL_MAX_PER_KIND': 120,
+        'METRICS_WINDOW': 400,
+    },
+}
@@ -5,18 +5,47 @@ CORPOTACHIRA v8.0 - APK de Prueba Mínima
 Sistema de Chat Empresarial
 """
 
-from kivy.app import App
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.label import Label
-from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
-from kivy.clock import Clock
-import requests
+from services.startup_profiler import profiler
+
+with profiler.phase('import_kivy'):
+    from kivy.app import App
+    from kivy.uix.boxlayout import BoxLayout
+    from kivy.uix.label import Label
+    from kivy.uix.button import Button
+    from kivy.uix.textinput import TextInput
+
+# El perfil de rendimiento ajusta config (MESSAGE_LOG_LIMIT,
+# NETWORK_WORKERS...) antes de importar los servicios y los widgets
+from services.device_profile import get_device_profile
+with profiler.phase('device_profile'):
+    get_device_profile()
+
+with profiler.phase('import_services'):
+    from services.api_client import get_api_client
+    from services.health_monitor import get_health_monitor
+    from widgets.message_log import MessageLog
+
+WELCOME_LINES = (
+    '¡Bienvenido a CORPOTACHIRA v8.0!',
+    'Este es un APK de prueba del sistema de chat empresarial.',
+)
 
 
 class CorpotachiraApp(App):
     def build(self):
+        with profiler.phase('build'):
+            root = self.build_layout()
+        profiler.watch_first_frame()
+        return root
+
+    def build_layout(self):
         self.title = "CORPOTACHIRA v8.0"
+        self.api = get_api_client()
+
+        # Despertar el backend mientras aún se muestra el presplash
+        self.health = get_health_monitor()
+        self.health.add_listener(self.on_health_status)
+        self.health.start()
 
         # Layout principal
         main_layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
@@ -33,10 +62,18 @@ class CorpotachiraApp(App):
 
         # Status de conexión
         self.status_label = Label(
-            text='Estado: Iniciando...',
+            text='Estado: Conectando con el servidor...',
             font_size='14sp',
             size_hint_y=None,
-            height='50dp'
+            height='30dp'
+        )
+
+        # Latencia del backend (histograma del monitor de salud)
+        self.latency_label = Label(
+            text='',
+            font_size='11sp',
+            size_hint_y=None,
+            height='20dp'
         )
 
         # Input de prueba
@@ -55,14 +92,9 @@ class CorpotachiraApp(App):
         clear_btn = Button(text='Limpiar')
         clear_btn.bind(on_press=self.clear_input)
 
-        # Área de mensajes
-        self.messages_label = Label(
-            text='¡Bienvenido a CORPOTACHIRA v8.0!\n\nEste es un APK de prueba del sistema de chat empresarial.',
-            font_size='12sp',
-            text_size=(None, None),
-            halign='left',
-            valign='top'
-        )
+        # Área de mensajes (acotada a config.MESSAGE_LOG_LIMIT líneas)
+        self.message_log = MessageLog()
+        self.message_log.clear(*WELCOME_LINES)
 
         # Ensamblar layout
         button_layout.add_widget(test_btn)
@@ -70,36 +102,55 @@ class CorpotachiraApp(App):
 
         main_layout.add_widget(title)
         main_layout.add_widget(self.status_label)
+        main_layout.add_widget(self.latency_label)
         main_layout.add_widget(self.text_input)
         main_layout.add_widget(button_layout)
-        main_layout.add_widget(self.messages_label)
-
-        # Probar conexión al iniciar
-        Clock.schedule_once(self.initial_test, 1)
+        main_layout.add_widget(self.message_log)
 
         return main_layout
 
-    def initial_test(self, dt):
-        self.status_label.text = 'Estado: Probando conexión...'
-        try:
-            response = requests.get('https://chat-cv1i.onrender.com/', timeout=5)
-            if response.status_code == 200:
-                self.status_label.text = 'Estado: ✅ Conectado al servidor'
-                self.messages_label.text += '\n\n✅ Conexión exitosa al backend de producción!'
+    def on_health_status(self, snapshot):
+        """Refleja cada medición del monitor de salud en la cabecera"""
+        if snapshot['reachable']:
+            if snapshot['status_code'] == 200:
+                self.status_label.text = f"Estado: ✅ Conectado · {snapshot['rtt_ms']:.0f} ms"
             else:
-                self.status_label.text = f'Estado: ⚠️ Respuesta: {response.status_code}'
-        except Exception as e:
-            self.status_label.text = f'Estado: ❌ Error de conexión'
-            self.messages_label.text += f'\n\n❌ Error: {str(e)[:50]}...'
+                self.status_label.text = f"Estado: ⚠️ Respuesta: {snapshot['status_code']}"
+        else:
+            self.status_label.text = f"Estado: ❌ Error de conexión ({snapshot['failures']})"
+
+        if snapshot['p50_ms'] is not None:
+            barras = ' '.join(
+                f"{'≤' + str(limite) if limite else '>30000'}:{cuenta}"
+                for limite, cuenta in snapshot['histogram'] if cuenta
+            )
+            self.latency_label.text = (
+                f"p50 {snapshot['p50_ms']:.0f} ms · p90 {snapshot['p90_ms']:.0f} ms · {barras}"
+            )
+
+    def on_connection_checked(self, snapshot):
+        if snapshot['reachable'] and snapshot['status_code'] == 200:
+            self.message_log.append('✅ Conexión exitosa al backend de producción!')
+        elif snapshot['reachable']:
+            self.message_log.append(f"⚠️ Respuesta: {snapshot['status_code']}")
+        else:
+            self.message_log.append(f"❌ Error: {str(snapshot['error'])[:50]}...")
 
     def test_connection(self, instance):
-        self.initial_test(None)
+        self.status_label.text = 'Estado: Probando conexión...'
+        # Volver a pulsar no cancela el sondeo en vuelo: se reutiliza su
+        # resultado, así que pulsar varias veces no encola peticiones
+        self.health.check_now(callback=self.on_connection_checked)
         if self.text_input.text:
-            self.messages_label.text += f'\n\n📱 Mensaje: {self.text_input.text}'
+            self.message_log.append(f'📱 Mensaje: {self.text_input.text}')
 
     def clear_input(self, instance):
         self.text_input.text = ''
-        self.messages_label.text = '¡Bienvenido a CORPOTACHIRA v8.0!\n\nEste es un APK de prueba del sistema de chat empresarial.'
+        self.message_log.clear(*WELCOME_LINES)
+
+    def on_stop(self):
+        self.health.stop()
+        self.api.close()
 
 
 if __name__ == '__main__':
@@ -7,31 +7,78 @@ Punto de entrada principal con control de sesiones
 
 __version__ = "8.0"
 
-from kivymd.app import MDApp
-from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.screen import MDScreen
-from kivymd.uix.screenmanager import MDScreenManager
-from kivymd.uix.toolbar import MDTopAppBar
-from kivymd.uix.tab import MDTabs, MDTabsBase
-from kivymd.uix.floatlayout import MDFloatLayout
-from kivymd.uix.button import MDIconButton, MDRaisedButton
-from kivymd.uix.gridlayout import MDGridLayout
-from kivymd.uix.label import MDLabel
-from kivy.core.window import Window
-from kivy.metrics import dp
-from kivy.properties import StringProperty, DictProperty
-from kivy.clock import Clock
-
-# Importar pantallas existentes
-from screens.chat_screen import ChatScreen
-from screens.personal_screen import PersonalScreen
-from screens.reportes_screen import ReportesScreen
-from screens.info_personal_screen import InfoPersonalScreen
+import importlib
+import weakref
+from collections import OrderedDict
+
+from services.startup_profiler import profiler
+
+with profiler.phase('import_kivymd'):
+    from kivymd.app import MDApp
+    from kivymd.uix.boxlayout import MDBoxLayout
+    from kivymd.uix.screen import MDScreen
+    from kivymd.uix.screenmanager import MDScreenManager
+    from kivymd.uix.toolbar import MDTopAppBar
+    from kivymd.uix.tab import MDTabs, MDTabsBase
+    from kivymd.uix.floatlayout import MDFloatLayout
+    from kivymd.uix.button import MDIconButton, MDRaisedButton
+    from kivymd.uix.gridlayout import MDGridLayout
+    from kivymd.uix.label import MDLabel
+    from kivy.core.window import Window
+    from kivy.metrics import dp
+    from kivy.uix.screenmanager import NoTransition
+    from kivy.utils import platform
+    from kivy.properties import StringProperty, ObjectProperty
+    from kivy.clock import Clock
+
+with profiler.phase('import_config'):
+    import config
+
+# El perfil de rendimiento ajusta config antes de crear ningún servicio
+from services.device_profile import get_device_profile, watch_frame_time
+with profiler.phase('device_profile'):
+    get_device_profile()
+
+from services.api_client import get_api_client
+from services.chat_repository import get_chat_repository
+from services.health_monitor import get_health_monitor
+from services.image_cache import get_image_cache
+from services.local_cache import get_local_cache
+from services.metrics import metrics
+from services.models import UserProfile, intern_value
+from services.message_sync import get_message_sync
+from services.network_executor import get_network_executor
+from services.outbox import get_outbox
+from services.personnel_repository import get_personnel_repository
+from services.report_repository import get_report_repository
+from services.session_store import get_session_store
+from services.session_teardown import release_user_state
+from services.ui_scheduler import get_ui_scheduler
+from services.widget_pool import get_widget_pool
 
 # Importar nuevas pantallas de autenticación
-from screens.role_selection_screen import RoleSelectionScreen
-from screens.login_screen import LoginScreen
-from screens.login_obrero_screen import LoginObreroScreen
+with profiler.phase('import_auth_screens'):
+    from screens.role_selection_screen import RoleSelectionScreen
+    from screens.login_screen import LoginScreen
+    from screens.login_obrero_screen import LoginObreroScreen
+
+
+def lazy_screen(module_name, class_name):
+    """
+    Crea una fábrica que importa y construye la pantalla al primer uso
+
+    Args:
+        module_name (str): Módulo de la pantalla, p. ej. 'screens.chat_screen'
+        class_name (str): Clase a instanciar
+
+    Returns:
+        callable: Fábrica sin argumentos que devuelve la pantalla
+    """
+    def factory():
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)()
+    factory.screen_name = class_name
+    return factory
 
 
 class TabContent(MDFloatLayout, MDTabsBase):
@@ -39,6 +86,12 @@ class TabContent(MDFloatLayout, MDTabsBase):
     pass
 
 
+# Niveles de usuario y colores de los botones de navegación
+USER_LEVELS = ('admin', 'moderador', 'obrero')
+ACTIVE_TAB_COLOR = [1, 0.6, 0, 1]  # Naranja
+INACTIVE_TAB_COLOR = [1, 1, 1, 0.7]  # Blanco
+
+
 class CustomBottomNav(MDBoxLayout):
     """Navegación inferior personalizada con control de niveles v8.0"""
 
@@ -50,11 +103,18 @@ class CustomBottomNav(MDBoxLayout):
         self.md_bg_color = [0.2, 0.6, 1, 1]  # Color azul
         self.spacing = 0
         self.current_screen = None
-        self.screens = {}
+        self.screens = {}  # Pantallas ya construidas
+        self.screen_factories = {}  # Fábricas de pantallas aún no construidas
+        self.on_screen_created = None  # Callback(name, widget) al construir una pantalla
         self.buttons = {}
         self.tab_containers = {}  # Para ocultar/mostrar pestañas
+        # (weakref de la pantalla, usuario, nivel) de la última reconfiguración
+        self._personal_configured_for = None
+        self.visible_tabs = []  # Pestañas mostradas, en orden
+        self.active_tab = None  # Pestaña con el botón resaltado
+        self._tabs_by_level = None  # Pestañas visibles precalculadas por nivel
 
-    def add_tab(self, name, text, icon, screen_widget, required_levels=None):
+    def add_tab(self, name, text, icon, screen_factory, required_levels=None):
         """
         Agregar una pestaña con su pantalla asociada y niveles requeridos
 
@@ -62,10 +122,13 @@ class CustomBottomNav(MDBoxLayout):
             name (str): Nombre de la pestaña
             text (str): Texto a mostrar
             icon (str): Icono de la pestaña
-            screen_widget: Widget de la pantalla
+            screen_factory: Fábrica de la pantalla (se construye al primer uso) o widget ya creado
             required_levels (list): Niveles que pueden ver esta pestaña ['admin', 'moderador', 'obrero']
         """
-        self.screens[name] = screen_widget
+        if callable(screen_factory):
+            self.screen_factories[name] = screen_factory
+        else:
+            self.screens[name] = screen_factory
 
         # Crear contenedor para el botón
         button_container = MDBoxLayout(
@@ -79,7 +142,7 @@ class CustomBottomNav(MDBoxLayout):
         button = MDIconButton(
             icon=icon,
             theme_icon_color="Custom",
-            icon_color=[1, 1, 1, 1],  # Blanco
+            icon_color=list(INACTIVE_TAB_COLOR),
             size_hint=(1, None),
             height=dp(32),
             on_release=lambda x, tab_name=name: self.switch_tab(tab_name)
@@ -90,7 +153,7 @@ class CustomBottomNav(MDBoxLayout):
             text=text,
             font_size=dp(10),
             theme_text_color="Custom",
-            text_color=[1, 1, 1, 1],  # Blanco
+            text_color=list(INACTIVE_TAB_COLOR),
             halign="center",
             size_hint_y=None,
             height=dp(16)
@@ -99,35 +162,111 @@ class CustomBottomNav(MDBoxLayout):
         button_container.add_widget(button)
         button_container.add_widget(label)
         self.add_widget(button_container)
+        self.visible_tabs.append(name)
 
         self.buttons[name] = (button, label)
         self.tab_containers[name] = {
             'container': button_container,
             'required_levels': required_levels or ['admin', 'moderador', 'obrero']
         }
+        self._tabs_by_level = None
 
         # Si es la primera pestaña, activarla
-        if len(self.screens) == 1:
+        if len(self.tab_containers) == 1:
             self.switch_tab(name)
 
-    def update_tabs_for_level(self, user_level):
+    def has_tab(self, name):
+        """Indica si existe la pestaña, construida o no"""
+        return name in self.screens or name in self.screen_factories
+
+    def is_built(self, name):
+        """Indica si la pantalla de la pestaña ya fue construida"""
+        return name in self.screens
+
+    def get_screen(self, name):
         """
-        Actualiza las pestañas visibles según el nivel del usuario
+        Obtiene la pantalla de una pestaña, construyéndola si hace falta
 
         Args:
-            user_level (str): Nivel del usuario ('admin', 'moderador', 'obrero')
+            name (str): Nombre de la pestaña
+
+        Returns:
+            Widget de la pantalla o None si la pestaña no existe
+        """
+        if name in self.screens:
+            return self.screens[name]
+
+        factory = self.screen_factories.get(name)
+        if factory is None:
+            return None
+
+        with metrics.timer(f"screen_build.{name}"):
+            screen_widget = factory()
+        self.screens[name] = screen_widget
+        if self.on_screen_created:
+            self.on_screen_created(name, screen_widget)
+        return screen_widget
+
+    def release_screen(self, name):
+        """
+        Descarta la pantalla construida de una pestaña para liberar memoria;
+        se reconstruye con su fábrica la próxima vez que se muestre
+
+        Returns:
+            Widget descartado o None si no estaba construida o no tiene fábrica
+        """
+        if name not in self.screen_factories:
+            return None
+        if name == 'personal':
+            # La pantalla nueva debe reconfigurarse aunque el usuario sea el mismo
+            self._personal_configured_for = None
+        return self.screens.pop(name, None)
+
+    def tabs_for_level(self, user_level):
+        """
+        Pestañas visibles para un nivel; se calculan una sola vez para todos
+        los niveles y se recalculan solo si se agregan pestañas
+
+        Returns:
+            tuple: Nombres de pestaña en orden
         """
-        # Limpiar navegación
-        self.clear_widgets()
-        visible_tabs = []
+        if self._tabs_by_level is None:
+            self._tabs_by_level = {level: self._compute_tabs(level) for level in USER_LEVELS}
+        tabs = self._tabs_by_level.get(user_level)
+        return tabs if tabs is not None else self._compute_tabs(user_level)
+
+    def _compute_tabs(self, user_level):
+        return tuple(
+            name for name, tab_info in self.tab_containers.items()
+            if user_level in tab_info['required_levels']
+        )
 
-        # Agregar solo las pestañas permitidas para este nivel
-        for tab_name, tab_info in self.tab_containers.items():
-            required_levels = tab_info['required_levels']
+    def update_tabs_for_level(self, user_level):
+        """
+        Actualiza las pestañas visibles según el nivel del usuario. Solo se
+        quitan o agregan los contenedores que difieren de los actuales
 
-            if user_level in required_levels:
-                self.add_widget(tab_info['container'])
-                visible_tabs.append(tab_name)
+        Args:
+            user_level (str): Nivel del usuario ('admin', 'moderador', 'obrero')
+        """
+        visible_tabs = list(self.tabs_for_level(user_level))
+
+        if visible_tabs != self.visible_tabs:
+            # Quitar las pestañas que ya no corresponden
+            for tab_name in self.visible_tabs:
+                if tab_name not in visible_tabs:
+                    self.remove_widget(self.tab_containers[tab_name]['container'])
+
+            # Insertar las que faltan en su posición (los children de Kivy
+            # están en orden inverso al visual)
+            mostradas = set(self.visible_tabs)
+            for posicion, tab_name in enumerate(visible_tabs):
+                if tab_name not in mostradas:
+                    self.add_widget(
+                        self.tab_containers[tab_name]['container'],
+                        index=len(self.children) - posicion
+                    )
+            self.visible_tabs = visible_tabs
 
         # Si hay pestañas visibles, preservar la pestaña actual o activar la primera
         if visible_tabs:
@@ -145,33 +284,104 @@ class CustomBottomNav(MDBoxLayout):
 
         return visible_tabs
     
+    def set_active_button(self, tab_name):
+        """
+        Resalta el botón de una pestaña. Solo se repintan el botón que deja
+        de estar activo y el nuevo
+        """
+        if tab_name == self.active_tab:
+            return
+        if self.active_tab in self.buttons:
+            button, label = self.buttons[self.active_tab]
+            button.icon_color = INACTIVE_TAB_COLOR
+            label.text_color = INACTIVE_TAB_COLOR
+        if tab_name in self.buttons:
+            button, label = self.buttons[tab_name]
+            button.icon_color = ACTIVE_TAB_COLOR
+            label.text_color = ACTIVE_TAB_COLOR
+        self.active_tab = tab_name
+
     def switch_tab(self, tab_name):
         """Cambiar a una pestaña específica"""
-        if tab_name not in self.screens:
+        if not self.has_tab(tab_name):
             return
 
         # Actualizar colores de botones
-        for name, (button, label) in self.buttons.items():
-            if name == tab_name:
-                # Pestaña activa - naranja
-                button.icon_color = [1, 0.6, 0, 1]
-                label.text_color = [1, 0.6, 0, 1]
-            else:
-                # Pestaña inactiva - blanco
-                button.icon_color = [1, 1, 1, 0.7]
-                label.text_color = [1, 1, 1, 0.7]
-
-        # Lógica específica para pestaña Personal: reconfigurar dinámicamente
-        if tab_name == 'personal' and hasattr(self, 'screens') and 'personal' in self.screens:
-            personal_screen = self.screens['personal']
-            if hasattr(personal_screen, 'reconfigure_cards_for_current_user'):
+        self.set_active_button(tab_name)
+
+        # Lógica específica para pestaña Personal: reconfigurar dinámicamente,
+        # solo si cambió la pantalla o el usuario desde la última vez (evita
+        # recargas al alternar pestañas rápidamente)
+        if tab_name == 'personal' and self.has_tab('personal'):
+            personal_screen = self.get_screen('personal')
+            app = MDApp.get_running_app()
+            usuario = (getattr(app, 'nombre_usuario', ''), getattr(app, 'nivel_usuario', ''))
+            # Referencia débil y no id(): una pantalla nueva puede reutilizar
+            # el id de otra ya recogida
+            anterior = self._personal_configured_for
+            configurada = (
+                anterior is not None
+                and anterior[0]() is personal_screen
+                and anterior[1:] == usuario
+            )
+            if hasattr(personal_screen, 'reconfigure_cards_for_current_user') and not configurada:
                 personal_screen.reconfigure_cards_for_current_user()
+                self._personal_configured_for = (weakref.ref(personal_screen),) + usuario
 
         # Notificar cambio de pantalla al padre
         if hasattr(self.parent, 'switch_screen'):
             self.parent.switch_screen(tab_name)
 
 
+class TabStateRetention:
+    """
+    Presupuesto de memoria de las pestañas que conservan su estado ocultas
+
+    El tamaño de cada pestaña se estima por su número de widgets; al
+    superar el presupuesto se expulsa la usada hace más tiempo.
+    """
+
+    def __init__(self, budget_bytes, widget_bytes):
+        self.budget_bytes = budget_bytes
+        self.widget_bytes = widget_bytes
+        self._sizes = OrderedDict()  # Pestaña -> bytes estimados, de menos a más reciente
+
+    def estimate(self, screen_widget):
+        """Bytes estimados del árbol de widgets de una pantalla"""
+        return sum(1 for _ in screen_widget.walk(restrict=True)) * self.widget_bytes
+
+    def touch(self, name, screen_widget):
+        """Registra el uso de una pestaña y actualiza su tamaño"""
+        self._sizes[name] = self.estimate(screen_widget)
+        self._sizes.move_to_end(name)
+
+    def forget(self, name):
+        self._sizes.pop(name, None)
+
+    def clear(self):
+        self._sizes.clear()
+
+    def hidden_bytes(self, active):
+        """Bytes estimados de las pestañas retenidas distintas de la activa"""
+        return sum(size for name, size in self._sizes.items() if name != active)
+
+    def victims(self, active):
+        """
+        Pestañas a expulsar, de la menos reciente a la más, hasta volver al
+        presupuesto. La pestaña activa nunca se expulsa
+        """
+        total = self.hidden_bytes(active)
+        expulsar = []
+        for name, size in self._sizes.items():
+            if total <= self.budget_bytes:
+                break
+            if name == active:
+                continue
+            expulsar.append(name)
+            total -= size
+        return expulsar
+
+
 class MainLayout(MDBoxLayout):
     """Layout principal con navegación de pestañas y control de autenticación v8.0"""
 
@@ -179,6 +389,11 @@ class MainLayout(MDBoxLayout):
         super().__init__(**kwargs)
         self.orientation = "vertical"
         self.current_tab = "chat"
+        self._configured_for = None  # (nivel, usuario) de la última configuración
+        self.retain_tab_state = config.TAB_RETAIN_STATE
+        self.tab_retention = TabStateRetention(
+            config.TAB_STATE_MEMORY_BUDGET, config.TAB_STATE_WIDGET_BYTES
+        )
         self.setup_ui()
 
     def setup_ui(self):
@@ -189,29 +404,25 @@ class MainLayout(MDBoxLayout):
         # Navegación inferior personalizada
         self.bottom_nav = CustomBottomNav()
 
-        # Agregar pestañas CON CONTROL DE NIVELES
-        self.chat_screen = ChatScreen()
-        self.personal_screen = PersonalScreen()
-        self.reportes_screen = ReportesScreen()
-        self.info_personal_screen = InfoPersonalScreen()
-
-        # Configurar referencia al layout principal en cada pantalla
-        self.chat_screen.main_layout = self
-        self.personal_screen.main_layout = self
-        self.reportes_screen.main_layout = self
-        self.info_personal_screen.main_layout = self
+        # Las pantallas se construyen al primer uso; cada una recibe la
+        # referencia al layout principal al crearse
+        self.bottom_nav.on_screen_created = self._on_screen_created
+        self._info_personal_screen = None
 
         # Agregar pestañas con niveles requeridos
         self.bottom_nav.add_tab(
-            "chat", "Chat", "chat-processing", self.chat_screen,
+            "chat", "Chat", "chat-processing",
+            lazy_screen('screens.chat_screen', 'ChatScreen'),
             required_levels=['admin', 'moderador', 'obrero']  # Todos pueden ver chat
         )
         self.bottom_nav.add_tab(
-            "personal", "Personal", "account-group", self.personal_screen,
+            "personal", "Personal", "account-group",
+            lazy_screen('screens.personal_screen', 'PersonalScreen'),
             required_levels=['admin', 'moderador']  # Solo admin y moderador
         )
         self.bottom_nav.add_tab(
-            "reportes", "Reportes", "file-document-multiple", self.reportes_screen,
+            "reportes", "Reportes", "file-document-multiple",
+            lazy_screen('screens.reportes_screen', 'ReportesScreen'),
             required_levels=['admin', 'moderador']  # Solo admin y moderador
         )
 
@@ -222,6 +433,68 @@ class MainLayout(MDBoxLayout):
         # Configurar pestañas según el nivel del usuario
         self.configurar_para_nivel_usuario()
 
+    def _on_screen_created(self, name, screen_widget):
+        """Configura una pantalla recién construida"""
+        screen_widget.main_layout = self
+
+    @property
+    def chat_screen(self):
+        return self.bottom_nav.get_screen('chat')
+
+    @property
+    def personal_screen(self):
+        return self.bottom_nav.get_screen('personal')
+
+    @property
+    def reportes_screen(self):
+        return self.bottom_nav.get_screen('reportes')
+
+    @property
+    def info_personal_screen(self):
+        """Pantalla de información personal (no es pestaña, se crea al primer uso)"""
+        if self._info_personal_screen is None:
+            self._info_personal_screen = lazy_screen(
+                'screens.info_personal_screen', 'InfoPersonalScreen'
+            )()
+            self._info_personal_screen.main_layout = self
+        return self._info_personal_screen
+
+    def prewarm_tabs(self, delay=None):
+        """
+        Construye en segundo plano las pestañas visibles que aún no existen,
+        una por frame, para que el primer cambio de pestaña sea inmediato
+
+        Args:
+            delay (float): Segundos de espera antes de empezar
+        """
+        if not config.TAB_PREWARM_ENABLED:
+            return
+
+        app = MDApp.get_running_app()
+        user_level = getattr(app, 'nivel_usuario', 'obrero')
+        pendientes = [
+            name for name, tab_info in self.bottom_nav.tab_containers.items()
+            if user_level in tab_info['required_levels'] and not self.bottom_nav.is_built(name)
+        ]
+
+        def construir_siguiente(dt):
+            if not pendientes:
+                return
+            try:
+                self.bottom_nav.get_screen(pendientes.pop(0))
+            except Exception as e:
+                print(f"❌ Error precargando pestaña: {e}")
+                metrics.error('prewarm_tabs', e)
+            if pendientes:
+                Clock.schedule_once(construir_siguiente, config.TAB_PREWARM_INTERVAL)
+
+        if pendientes:
+            Clock.schedule_once(
+                construir_siguiente,
+                config.TAB_PREWARM_DELAY if delay is None else delay
+            )
+
+    @metrics.timed('role_config')
     def configurar_para_nivel_usuario(self):
         """
         Configura las pestañas visibles según el nivel del usuario
@@ -230,6 +503,12 @@ class MainLayout(MDBoxLayout):
             app = MDApp.get_running_app()
             user_level = getattr(app, 'nivel_usuario', 'obrero')
 
+            # Un mismo login llama aquí desde navegar_a_principal_segun_nivel y
+            # desde MainScreen.on_enter: si nada cambió no hay nada que rehacer
+            configuracion = (user_level, getattr(app, 'nombre_usuario', ''))
+            if configuracion == self._configured_for and self.content_container.children:
+                return
+
             # Actualizar pestañas visibles
             visible_tabs = self.bottom_nav.update_tabs_for_level(user_level)
 
@@ -246,14 +525,16 @@ class MainLayout(MDBoxLayout):
                     self.switch_screen(visible_tabs[0])
                 else:
                     # Mantener pestaña actual pero asegurar que esté visible
-                    if self.current_tab in self.bottom_nav.screens and self.current_tab not in [w.name for w in self.content_container.children if hasattr(w, 'name')]:
+                    if self.bottom_nav.has_tab(self.current_tab) and self.current_tab not in [w.name for w in self.content_container.children if hasattr(w, 'name')]:
                         self.switch_screen(self.current_tab)
 
             # Actualizar UI de todas las pantallas según el nivel de usuario
             self.update_all_screens_for_user_level()
+            self._configured_for = configuracion
 
         except Exception as e:
             print(f"❌ Error configurando nivel de usuario: {e}")
+            metrics.error('configurar_para_nivel_usuario', e)
 
     def update_all_screens_for_user_level(self):
         """
@@ -261,9 +542,10 @@ class MainLayout(MDBoxLayout):
         Se ejecuta después del login para aplicar permisos y visibilidad
         """
         try:
-            # Actualizar ChatScreen
-            if hasattr(self, 'chat_screen') and hasattr(self.chat_screen, 'update_ui_for_user_level'):
-                self.chat_screen.update_ui_for_user_level()
+            # Actualizar ChatScreen (solo si ya fue construida; al crearse ya lee el nivel)
+            chat_screen = self.bottom_nav.screens.get('chat')
+            if chat_screen is not None and hasattr(chat_screen, 'update_ui_for_user_level'):
+                chat_screen.update_ui_for_user_level()
 
             # Aquí se pueden agregar más pantallas en el futuro
             # if hasattr(self, 'personal_screen') and hasattr(self.personal_screen, 'update_ui_for_user_level'):
@@ -271,55 +553,124 @@ class MainLayout(MDBoxLayout):
 
         except Exception as e:
             print(f"❌ Error actualizando UI de pantallas: {e}")
+            metrics.error('update_all_screens_for_user_level', e)
 
+    @metrics.timed('tab_switch')
     def switch_screen(self, screen_name):
-        """Cambiar la pantalla visible"""
+        """
+        Cambiar la pantalla visible
+
+        Por defecto la pestaña vuelve a su pantalla principal. Con
+        retain_tab_state (config.TAB_RETAIN_STATE) se vuelve a enganchar tal
+        como se dejó: scroll, listas cargadas y subnavegación
+        """
         self.content_container.clear_widgets()
-        if screen_name in self.bottom_nav.screens:
+        if self.bottom_nav.has_tab(screen_name):
+            anterior = self.current_tab
+            if anterior and anterior != screen_name:
+                if self.retain_tab_state and self.bottom_nav.is_built(anterior):
+                    # Medir la pestaña que queda oculta con el estado que acumuló
+                    self.tab_retention.touch(anterior, self.bottom_nav.screens[anterior])
+                else:
+                    # Descartar las peticiones que dejó en vuelo la pestaña anterior
+                    get_network_executor().cancel_group(f"tab:{anterior}")
             self.current_tab = screen_name
 
-            # Siempre resetear a pantalla principal al cambiar de pestaña
-            screen_widget = self.bottom_nav.screens[screen_name]
-            if hasattr(screen_widget, 'show_main_screen'):
-                screen_widget.show_main_screen()
-            elif hasattr(screen_widget, 'mostrar_menu_reportes'):
-                screen_widget.mostrar_menu_reportes()
-            elif hasattr(screen_widget, 'reset_to_main'):
-                screen_widget.reset_to_main()
+            recien_creada = not self.bottom_nav.is_built(screen_name)
+            screen_widget = self.bottom_nav.get_screen(screen_name)
+            if not self.retain_tab_state:
+                # Siempre resetear a pantalla principal al cambiar de pestaña
+                self.reset_screen_to_main(screen_widget)
+            elif not recien_creada:
+                self.tab_retention.touch(screen_name, screen_widget)
 
             self.content_container.add_widget(screen_widget)
 
+            if self.retain_tab_state:
+                self.evict_retained_tabs()
+
             # Actualizar también los colores de los botones sin crear bucle recursivo
             if hasattr(self, 'bottom_nav'):
                 self.update_navigation_buttons_only(screen_name)
 
+    @metrics.timed('screen_reset')
+    def reset_screen_to_main(self, screen_widget):
+        """Lleva una pantalla de pestaña a su vista principal"""
+        if hasattr(screen_widget, 'show_main_screen'):
+            screen_widget.show_main_screen()
+        elif hasattr(screen_widget, 'mostrar_menu_reportes'):
+            screen_widget.mostrar_menu_reportes()
+        elif hasattr(screen_widget, 'reset_to_main'):
+            screen_widget.reset_to_main()
+
+    def evict_retained_tabs(self):
+        """Libera las pestañas ocultas menos recientes si se supera el presupuesto"""
+        for name in self.tab_retention.victims(self.current_tab):
+            self.release_tab_state(name)
+
+    def release_tab_state(self, name):
+        """
+        Libera el estado retenido de una pestaña oculta: se descarta la
+        pantalla si puede reconstruirse o, si no, vuelve a su vista principal
+        """
+        self.tab_retention.forget(name)
+        get_network_executor().cancel_group(f"tab:{name}")
+        screen_widget = self.bottom_nav.release_screen(name)
+        if screen_widget is None and self.bottom_nav.is_built(name):
+            self.reset_screen_to_main(self.bottom_nav.screens[name])
+
+    def release_retained_tabs(self):
+        """Libera el estado retenido de todas las pestañas (p. ej. al cerrar sesión)"""
+        for name in list(self.bottom_nav.screens):
+            self.release_tab_state(name)
+        self.tab_retention.clear()
+
+    def release_user_screens(self):
+        """
+        Libera lo que las pantallas cargaron para el usuario que cierra sesión
+
+        Una pantalla que implemente release_user_data() vacía sus listas
+        (devolviendo tarjetas y filas a la reserva de widgets) y se conserva;
+        las demás se descartan y se reconstruyen con su fábrica en el
+        siguiente login. Los contenedores de las pestañas se conservan.
+        """
+        self.current_tab = "chat"
+        self.content_container.clear_widgets()
+        for name in list(self.bottom_nav.screens):
+            screen_widget = self.bottom_nav.screens[name]
+            if hasattr(screen_widget, 'release_user_data'):
+                self.tab_retention.forget(name)
+                screen_widget.release_user_data()
+                self.reset_screen_to_main(screen_widget)
+            else:
+                self.release_tab_state(name)
+        self.tab_retention.clear()
+        self._info_personal_screen = None
+        self._configured_for = None
+        self.bottom_nav._personal_configured_for = None
+
     def update_navigation_buttons_only(self, active_tab):
         """Actualiza solo los colores de los botones de navegación sin cambiar pantallas"""
         # Actualizar colores de botones directamente sin recursión
-        for name, (button, label) in self.bottom_nav.buttons.items():
-            if name == active_tab:
-                # Pestaña activa - naranja
-                button.icon_color = [1, 0.6, 0, 1]
-                label.text_color = [1, 0.6, 0, 1]
-            else:
-                # Pestaña inactiva - blanco
-                button.icon_color = [1, 1, 1, 0.7]
-                label.text_color = [1, 1, 1, 0.7]
+        self.bottom_nav.set_active_button(active_tab)
             
     def go_back_to_main(self, tab_name):
         """Volver a la pantalla principal de una pestaña"""
-        if hasattr(self.bottom_nav.screens[tab_name], 'show_main_screen'):
-            self.bottom_nav.screens[tab_name].show_main_screen()
+        screen_widget = self.bottom_nav.screens.get(tab_name)
+        if hasattr(screen_widget, 'show_main_screen'):
+            screen_widget.show_main_screen()
             
     def show_channel_list(self):
         """Método de compatibilidad para chat screen"""
-        if hasattr(self.chat_screen, 'show_main_screen'):
-            self.chat_screen.show_main_screen()
+        chat_screen = self.bottom_nav.screens.get('chat')
+        if hasattr(chat_screen, 'show_main_screen'):
+            chat_screen.show_main_screen()
             
     def load_channels(self):
         """Método de compatibilidad para recargar canales"""
-        if hasattr(self.chat_screen, 'load_channels'):
-            self.chat_screen.load_channels()
+        chat_screen = self.bottom_nav.screens.get('chat')
+        if hasattr(chat_screen, 'load_channels'):
+            chat_screen.load_channels()
 
 
 class MainScreen(MDScreen):
@@ -344,44 +695,103 @@ class EmpresaLimpiezaApp(MDApp):
     nivel_usuario = StringProperty('')
     token_sesion = StringProperty('')
     nombre_usuario = StringProperty('')
-    user_data = DictProperty({})
+    # Perfil del usuario (UserProfile, admite get() como el dict de la API);
+    # vacío sin sesión. Las pantallas de login asignan el dict de la API y
+    # on_user_data lo convierte
+    user_data = ObjectProperty(UserProfile(), allownone=True)
 
     # Configuración del servidor
-    base_url = StringProperty('https://chat-cv1i.onrender.com')
+    base_url = StringProperty(config.API_BASE_URL)
+
+    def on_user_data(self, instance, valor):
+        perfil = UserProfile.coerce(valor)
+        if perfil is None:
+            perfil = UserProfile()
+        # Un perfil vacío es falso como el dict vacío: comparar identidad
+        if perfil is not valor:
+            self.user_data = perfil
 
     def build(self):
-        # Configurar tema
-        self.theme_cls.theme_style = "Light"
-        self.theme_cls.primary_palette = "Blue"
-        self.theme_cls.accent_palette = "Orange"
-        self.title = "CORPOTACHIRA v8.0"
+        # Despertar el backend (Render) mientras se construye la interfaz y
+        # el usuario elige rol; el login encuentra la instancia ya activa
+        get_health_monitor().start()
 
-        # Configurar ventana móvil
-        Window.size = (360, 640)
-        Window.minimum_width = 300
-        Window.minimum_height = 500
+        # Configurar tema
+        with profiler.phase('build_theme'):
+            self.theme_cls.theme_style = "Light"
+            self.theme_cls.primary_palette = "Blue"
+            self.theme_cls.accent_palette = "Orange"
+            self.title = "CORPOTACHIRA v8.0"
+
+        # Simular la ventana móvil solo en escritorio; en el teléfono o la
+        # tableta la app ocupa la pantalla
+        if platform in ('win', 'linux', 'macosx'):
+            Window.size = (config.MOBILE_WINDOW_WIDTH, config.MOBILE_WINDOW_HEIGHT)
+            Window.minimum_width = 300
+            Window.minimum_height = 500
 
         # Crear Screen Manager con todas las pantallas
         screen_manager = MDScreenManager()
+        if not config.UI_ANIMATIONS:
+            screen_manager.transition = NoTransition()
 
         # Pantallas de autenticación
-        screen_manager.add_widget(RoleSelectionScreen())
-        screen_manager.add_widget(LoginScreen())
-        screen_manager.add_widget(LoginObreroScreen())
+        with profiler.phase('build_auth_screens'):
+            screen_manager.add_widget(RoleSelectionScreen())
+            screen_manager.add_widget(LoginScreen())
+            screen_manager.add_widget(LoginObreroScreen())
 
         # Pantalla principal
-        screen_manager.add_widget(MainScreen())
+        with profiler.phase('build_main_screen'):
+            screen_manager.add_widget(MainScreen())
 
         # Crear contenedor root
         root_screen = MDScreen()
         root_screen.screen_manager = screen_manager
         root_screen.add_widget(screen_manager)
 
-        # Iniciar en pantalla de selección de rol
-        screen_manager.current = 'role_selection'
+        # Con una sesión guardada vigente se entra directo a la pantalla
+        # principal; si no, se inicia en la selección de rol
+        # (al construir la app aún no hay sesión en memoria)
+        self.restaurar_sesion()
+        if self.verificar_sesion_activa():
+            screen_manager.current = 'main'
+            Clock.schedule_once(self.reanudar_sesion, 0)
+        else:
+            screen_manager.current = 'role_selection'
+
+        # Bandeja de salida: envía en segundo plano lo que quedó pendiente
+        get_outbox().start(headers_provider=self.get_auth_headers)
+
+        profiler.watch_first_frame()
+        watch_frame_time(on_change=self.aplicar_perfil)
+
+        # Instrumentación opcional (config.METRICS_ENABLED / CORPOTACHIRA_METRICS=1)
+        if metrics.enabled:
+            metrics.watch_frames()
+            Clock.schedule_once(lambda dt: self.mostrar_metricas(), 0)
 
         return root_screen
 
+    def aplicar_perfil(self, profile):
+        """Ajusta la UI ya construida tras bajar el perfil de rendimiento"""
+        if not config.UI_ANIMATIONS:
+            self.root.screen_manager.transition = NoTransition()
+        if not self.root.screen_manager.has_screen('main'):
+            return
+        main_screen = self.root.screen_manager.get_screen('main')
+        if hasattr(main_screen, 'main_layout'):
+            layout = main_screen.main_layout
+            layout.tab_retention.budget_bytes = config.TAB_STATE_MEMORY_BUDGET
+            layout.evict_retained_tabs()
+
+    def mostrar_metricas(self):
+        """Muestra la superposición de rendimiento (un toque exporta el JSON)"""
+        from widgets.perf_overlay import PerfOverlay
+        if getattr(self, 'perf_overlay', None) is None:
+            self.perf_overlay = PerfOverlay()
+        self.perf_overlay.show()
+
     def verificar_sesion_activa(self):
         """
         Verifica si hay una sesión activa válida
@@ -393,12 +803,59 @@ class EmpresaLimpiezaApp(MDApp):
             print("❌ No hay sesión activa")
             return False
 
-    def navegar_a_principal_segun_nivel(self):
+    def restaurar_sesion(self):
+        """
+        Carga la sesión guardada (si existe y no expiró) en las variables de sesión
+
+        Returns:
+            bool: True si se restauró una sesión
+        """
+        sesion = get_session_store().load()
+        if sesion is None:
+            return False
+
+        self.token_sesion = sesion['token']
+        self.nivel_usuario = intern_value(sesion['nivel'])
+        self.nombre_usuario = sesion.get('nombre') or ''
+        self.user_data = UserProfile.coerce(sesion.get('user_data') or {})
+        return True
+
+    def reanudar_sesion(self, dt=None):
+        """
+        Entra con la sesión restaurada y revalida el token en segundo plano;
+        si el backend lo rechaza se cierra la sesión
+        """
+        token = self.token_sesion
+        self.navegar_a_principal_segun_nivel(guardar=False)
+
+        def on_invalid():
+            # Solo si el usuario no volvió a iniciar sesión entretanto
+            if self.token_sesion == token:
+                print("❌ La sesión guardada ya no es válida")
+                self.logout()
+
+        get_session_store().revalidate(self.get_auth_headers(), on_invalid=on_invalid)
+
+    def navegar_a_principal_segun_nivel(self, guardar=True):
         """
         Navega a la pantalla principal y configura según el nivel del usuario
         SIEMPRE inicia en Chat después del login
+
+        Args:
+            guardar (bool): Guardar la sesión en el dispositivo para el
+                próximo arranque (False al reanudar una sesión ya guardada)
         """
         try:
+            if guardar and self.token_sesion:
+                get_session_store().save(
+                    self.token_sesion, self.nivel_usuario,
+                    self.nombre_usuario, self.user_data
+                )
+
+            # Reanudar el envío de los mensajes pendientes de este usuario
+            get_outbox().set_owner(self.nombre_usuario)
+            get_local_cache().set_owner(self.nombre_usuario, self.nivel_usuario)
+
             self.root.screen_manager.current = 'main'
 
             # Configurar el layout para el nivel actual
@@ -410,36 +867,44 @@ class EmpresaLimpiezaApp(MDApp):
 
                 main_screen.main_layout.configurar_para_nivel_usuario()
 
+                # Precargar el resto de pestañas en frames posteriores
+                main_screen.main_layout.prewarm_tabs()
+
         except Exception as e:
             print(f"❌ Error navegando a principal: {e}")
+            metrics.error('navegar_a_principal_segun_nivel', e)
 
+    @metrics.timed('logout')
     def logout(self):
         """
         Método público para cerrar sesión
         """
         try:
-            # Limpiar variables de sesión
-            self.nivel_usuario = ''
-            self.token_sesion = ''
-            self.user_data = {}
-            self.nombre_usuario = ''
-
-            # Resetear MainLayout para próximo login
+            # Liberar las pantallas del usuario anterior antes que sus datos
             if hasattr(self.root, 'screen_manager'):
                 try:
                     main_screen = self.root.screen_manager.get_screen('main')
                     if hasattr(main_screen, 'main_layout'):
-                        # Resetear a Chat para próximo login
-                        main_screen.main_layout.current_tab = "chat"
-                        main_screen.main_layout.content_container.clear_widgets()
-                except:
-                    pass
+                        main_screen.main_layout.release_user_screens()
+                except Exception as e:
+                    print(f"❌ Error liberando pantallas: {e}")
+                    metrics.error('release_user_screens', e)
+
+            # Trabajo en curso, sincronización, cachés en memoria y sesión guardada
+            release_user_state()
+
+            # Limpiar variables de sesión
+            self.nivel_usuario = ''
+            self.token_sesion = ''
+            self.user_data = UserProfile()
+            self.nombre_usuario = ''
 
             # Navegar a selección de rol
             self.root.screen_manager.current = 'role_selection'
 
         except Exception as e:
             print(f"❌ Error en logout: {e}")
+            metrics.error('logout', e)
 
     def get_auth_headers(self):
         """
@@ -448,13 +913,94 @@ class EmpresaLimpiezaApp(MDApp):
         Returns:
             dict: Headers con token de autorización
         """
-        if self.token_sesion:
-            return {
-                'Authorization': f'Bearer {self.token_sesion}',
-                'Content-Type': 'application/json'
-            }
-        else:
-            return {'Content-Type': 'application/json'}
+        return get_api_client().auth_headers(self.token_sesion)
+
+    @property
+    def chat_repository(self):
+        """
+        Repositorio de chat para las pantallas: pinta canales y mensajes
+        desde la caché local y los revalida en segundo plano
+        """
+        return get_chat_repository()
+
+    @property
+    def message_sync(self):
+        """
+        Sincronización incremental del canal abierto: las pantallas llaman a
+        seed() con lo ya cargado y a start()/stop() al entrar y salir
+        """
+        return get_message_sync()
+
+    @property
+    def health_monitor(self):
+        """
+        Monitor de salud del backend: las pantallas pueden consultar
+        snapshot() o registrarse con add_listener() para mostrar el estado
+        """
+        return get_health_monitor()
+
+    @property
+    def image_cache(self):
+        """
+        Caché de imágenes remotas (avatares, adjuntos); los widgets usan
+        widgets.cached_image.CachedImage
+        """
+        return get_image_cache()
+
+    @property
+    def personnel_repository(self):
+        """
+        Repositorio de personal: las pantallas buscan y filtran con
+        store.search() y store.by_cuadrilla(), y se registran con
+        store.add_listener() para actualizar solo la tarjeta que cambia
+        """
+        return get_personnel_repository()
+
+    @property
+    def report_repository(self):
+        """
+        Repositorio de reportes: las pantallas piden load() con el rango de
+        fechas y los filtros, pintan las filas con on_rows a medida que
+        llegan y los agregados con on_done
+        """
+        return get_report_repository()
+
+    @property
+    def ui_scheduler(self):
+        """
+        Planificador de UI: las pantallas crean las listas largas (tarjetas
+        de empleados, filas de reportes) con populate() para no congelar
+        la interfaz; las filas visibles se crean primero
+        """
+        return get_ui_scheduler()
+
+    @property
+    def widget_pool(self):
+        """
+        Reserva de widgets de lista: populate(..., pool_kind=...) del
+        planificador de UI reutiliza tarjetas y filas entre cargas y logins
+        """
+        return get_widget_pool()
+
+    @property
+    def outbox(self):
+        """
+        Bandeja de salida: las pantallas encolan con enqueue() y pintan el
+        estado pendiente/enviado con messages() y add_listener()
+        """
+        return get_outbox()
+
+    def on_stop(self):
+        if metrics.enabled:
+            try:
+                print(f"📊 Métricas exportadas: {metrics.export()}")
+            except OSError as e:
+                print(f"❌ Error exportando métricas: {e}")
+        get_health_monitor().stop()
+        get_message_sync().stop_all()
+        get_outbox().stop()
+        # Cerrar las conexiones keep-alive del cliente compartido
+        get_api_client().close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+"""
+Servicios de la aplicación móvil
+Lógica de red y datos independiente de la interfaz
+"""
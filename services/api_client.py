@@ -0,0 +1,308 @@
+"""
+Cliente HTTP compartido
+Una sola sesión keep-alive contra el backend, con reintentos,
+timeouts por endpoint definidos en config.py y respuestas comprimidas
+(MessagePack en los endpoints de listas si está disponible)
+"""
+
+import random
+import time
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from services.metrics import metrics
+from services.single_flight import SingleFlight
+from services.startup_profiler import profiler
+from services.wire_format import accept_header, is_compact_path
+
+# Render responde 502/503/504 mientras la instancia despierta
+RETRY_STATUS_CODES = (502, 503, 504)
+
+# Métodos que pueden repetirse sin efectos duplicados
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+def endpoint_label(method, path):
+    """
+    Nombre de métrica de una petición, con los ids sustituidos para no
+    crear una serie por recurso
+
+    Args:
+        method (str): Método HTTP
+        path (str): Ruta relativa, p. ej. '/api/personnel/empleados/42'
+
+    Returns:
+        str: p. ej. 'DELETE /api/personnel/empleados/:id'
+    """
+    path = path.split('?', 1)[0]
+    if path.startswith('/mensajes/'):
+        return f"{method} /mensajes/:canal"
+    segmentos = [
+        ':id' if segmento.isdigit() or len(segmento) >= 24 else segmento
+        for segmento in path.split('/')
+    ]
+    return f"{method} {'/'.join(segmentos)}"
+
+
+def invalidated_paths(path, payload=None):
+    """
+    Prefijos de las lecturas que deja obsoletas una escritura correcta
+
+    Args:
+        path (str): Ruta de la escritura, p. ej. '/enviar'
+        payload (dict): Cuerpo JSON enviado (para saber el canal)
+
+    Returns:
+        list: Prefijos de ruta GET a olvidar; nunca '' (que olvidaría todo)
+    """
+    path = path.split('?', 1)[0].rstrip('/')
+    if path == '/enviar':
+        canal = payload.get('canal') if isinstance(payload, dict) else None
+        return [f"/mensajes/{quote(str(canal), safe='')}" if canal else '/mensajes/']
+    if path == '/crear_canal':
+        return ['/canales']
+    if path.startswith('/api/personnel/'):
+        # Los reportes agregan el personal: también quedan obsoletos
+        coleccion = '/'.join(path.split('/')[:4])
+        return [coleccion, '/api/reports/']
+    padre = path.rsplit('/', 1)[0]
+    return [padre or path] if path else []
+
+
+class ApiClient:
+    """Cliente del backend con pool de conexiones y reintentos"""
+
+    def __init__(self, base_url=None, timeout=None, max_retries=None,
+                 endpoint_timeouts=None, session=None):
+        """
+        Args:
+            base_url (str): URL del backend (por defecto config.API_BASE_URL)
+            timeout (float): Timeout por defecto en segundos
+            max_retries (int): Reintentos tras el primer intento fallido
+            endpoint_timeouts (dict): Prefijo de ruta -> timeout en segundos
+            session (requests.Session): Sesión a reutilizar (opcional)
+        """
+        self.base_url = (base_url or config.API_BASE_URL).rstrip('/')
+        self.timeout = timeout if timeout is not None else config.REQUEST_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else config.MAX_RETRIES
+        self.endpoint_timeouts = endpoint_timeouts if endpoint_timeouts is not None else config.ENDPOINT_TIMEOUTS
+        self.session = session or self._crear_sesion()
+        self.flights = SingleFlight(ttl=config.GET_MEMO_TTL)
+
+    def _crear_sesion(self):
+        session = requests.Session()
+        self._montar_adaptador(session, config.HTTP_POOL_MAXSIZE)
+        # requests descomprime de forma transparente, también en iter_content
+        session.headers['Accept-Encoding'] = config.WIRE_ENCODINGS
+        return session
+
+    @staticmethod
+    def _montar_adaptador(session, pool_maxsize):
+        # Los reintentos los gestiona el cliente para aplicar jitter
+        adapter = HTTPAdapter(
+            pool_connections=config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize,
+            max_retries=0
+        )
+        anterior = session.adapters.get('https://')
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return anterior
+
+    def resize_pool(self, pool_maxsize):
+        """
+        Cambia las conexiones keep-alive por host (p. ej. al cambiar de
+        perfil). Las peticiones en curso terminan con el adaptador anterior
+        """
+        anterior = self._montar_adaptador(self.session, pool_maxsize)
+        if anterior is not None:
+            anterior.close()
+
+    def url(self, path):
+        """Construye la URL absoluta de una ruta del backend"""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def timeout_for(self, path):
+        """
+        Obtiene el timeout para una ruta
+
+        Args:
+            path (str): Ruta relativa, p. ej. '/mensajes/general'
+
+        Returns:
+            float: Timeout del prefijo más largo que coincida o el de por defecto
+        """
+        mejor = None
+        for prefijo in self.endpoint_timeouts:
+            if path.startswith(prefijo) and (mejor is None or len(prefijo) > len(mejor)):
+                mejor = prefijo
+        return self.endpoint_timeouts[mejor] if mejor is not None else self.timeout
+
+    def auth_headers(self, token=None):
+        """
+        Headers para las peticiones API
+
+        Args:
+            token (str): Token de sesión (opcional)
+
+        Returns:
+            dict: Headers con token de autorización si existe
+        """
+        if token:
+            return {
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/json'
+            }
+        return {'Content-Type': 'application/json'}
+
+    def backoff_delay(self, intento):
+        """
+        Espera antes del siguiente reintento (backoff exponencial con full jitter)
+
+        Args:
+            intento (int): Número de intento fallido, empezando en 0
+
+        Returns:
+            float: Segundos a esperar
+        """
+        tope = min(config.RETRY_BACKOFF_MAX, config.RETRY_BACKOFF_BASE * (2 ** intento))
+        return random.uniform(0, tope)
+
+    def request(self, method, path, retry=None, coalesce=None, **kwargs):
+        """
+        Realiza una petición con reintentos
+
+        Args:
+            method (str): Método HTTP
+            path (str): Ruta relativa o URL absoluta
+            retry (bool): Forzar o desactivar reintentos. Por defecto solo se
+                reintentan los métodos idempotentes
+            coalesce (bool): Compartir un GET idéntico en vuelo y reutilizar su
+                respuesta durante config.GET_MEMO_TTL. Activo por defecto en
+                GET; nunca con stream=True
+            **kwargs: Argumentos de requests (params, json, headers, timeout...)
+
+        Returns:
+            requests.Response: Respuesta final
+
+        Raises:
+            requests.RequestException: Si todos los intentos fallan por red
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        if coalesce is None:
+            coalesce = method == 'GET'
+        kwargs.setdefault('timeout', self.timeout_for(path))
+        if method == 'GET' and is_compact_path(path):
+            # Las respuestas se decodifican con services.wire_format
+            headers = dict(kwargs.get('headers') or {})
+            headers.setdefault('Accept', accept_header())
+            kwargs['headers'] = headers
+
+        clave = self._flight_key(path, kwargs) if coalesce and method == 'GET' else None
+        if clave is not None:
+            return self.flights.do(
+                clave,
+                lambda: self._send(method, path, retry, kwargs),
+                cacheable=lambda response: response.ok
+            )
+
+        response = self._send(method, path, retry, kwargs)
+        if method not in ('GET', 'HEAD', 'OPTIONS') and response.ok:
+            # Una escritura invalida las lecturas memorizadas que cambia
+            for prefijo in invalidated_paths(path, kwargs.get('json')):
+                self.flights.forget(prefijo)
+        return response
+
+    def _flight_key(self, path, kwargs):
+        # Una respuesta en streaming se consume una sola vez: nunca se comparte
+        if kwargs.get('stream'):
+            return None
+        params = kwargs.get('params') or {}
+        if hasattr(params, 'items'):
+            params = params.items()
+        headers = kwargs.get('headers') or {}
+        return (
+            path,
+            tuple(sorted((str(k), str(v)) for k, v in params)),
+            tuple(sorted((str(k), str(v)) for k, v in headers.items()))
+        )
+
+    def _send(self, method, path, retry, kwargs):
+        with metrics.timer(f"http {endpoint_label(method, path)}"):
+            response = self._send_con_reintentos(method, path, retry, kwargs)
+        if metrics.enabled:
+            # Bytes transferidos (comprimidos) según el servidor
+            longitud = response.headers.get('Content-Length')
+            if longitud and longitud.isdigit():
+                metrics.count('http.wire_bytes', int(longitud))
+        return response
+
+    def _send_con_reintentos(self, method, path, retry, kwargs):
+        intentos = self.max_retries + 1 if retry else 1
+        url = self.url(path)
+
+        for intento in range(intentos):
+            ultimo = intento == intentos - 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if ultimo:
+                    raise
+            else:
+                if not response.ok:
+                    metrics.count(f"http_status.{response.status_code}")
+                if ultimo or response.status_code not in RETRY_STATUS_CODES:
+                    if response.ok:
+                        profiler.mark('first_api_response')
+                    return response
+                response.close()
+            time.sleep(self.backoff_delay(intento))
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        """Cierra las conexiones del pool"""
+        self.session.close()
+
+
+_client = None
+
+
+def get_api_client():
+    """
+    Obtiene el cliente HTTP compartido por toda la aplicación
+
+    Returns:
+        ApiClient: Instancia única
+    """
+    global _client
+    if _client is None:
+        _client = ApiClient()
+    return _client
+
+
+def peek_api_client():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        ApiClient: Instancia única o None
+    """
+    return _client
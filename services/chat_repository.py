@@ -0,0 +1,77 @@
+"""
+Repositorio de chat
+Canales y mensajes servidos desde la caché local y revalidados contra
+el backend en segundo plano
+"""
+
+from urllib.parse import quote
+
+from services.api_client import get_api_client
+from services.local_cache import StaleWhileRevalidate, get_local_cache
+from services.models import Message, channel_name, parse_channels
+from services.network_executor import get_network_executor
+
+
+def messages_path(canal):
+    """Ruta del endpoint de mensajes de un canal (nombre o Channel)"""
+    return f"/mensajes/{quote(channel_name(canal), safe='')}"
+
+
+class ChatRepository:
+    """Acceso a canales y mensajes con caché offline-first"""
+
+    def __init__(self, client=None, cache=None, executor=None):
+        self.client = client or get_api_client()
+        self.cache = cache or get_local_cache()
+        self.executor = executor or get_network_executor()
+        self._swr = StaleWhileRevalidate(self.client, self.cache, self.executor)
+
+    def load_channels(self, on_data, on_error=None, headers=None, group='tab:chat'):
+        """
+        Carga la lista de canales (GET /canales)
+
+        Args:
+            on_data (callable): on_data(canales, from_cache) en el hilo de la
+                UI; cada canal es su nombre o un Channel
+            on_error (callable): Recibe la excepción si falla la red
+            headers (dict): Headers de autenticación
+        """
+        return self._swr.load(
+            '/canales', lambda datos, from_cache: on_data(parse_channels(datos), from_cache),
+            headers=headers, on_error=on_error,
+            tag='canales', group=group
+        )
+
+    def load_messages(self, canal, on_data, on_error=None, headers=None, group='tab:chat'):
+        """
+        Carga los mensajes de un canal (GET /mensajes/{canal})
+
+        Args:
+            canal (str): Nombre del canal
+            on_data (callable): on_data(mensajes, from_cache) en el hilo de
+                la UI, con los mensajes como Message
+            on_error (callable): Recibe la excepción si falla la red
+            headers (dict): Headers de autenticación
+        """
+        return self._swr.load(
+            messages_path(canal),
+            lambda datos, from_cache: on_data(Message.parse_list(datos), from_cache),
+            headers=headers, on_error=on_error,
+            tag=f"mensajes:{channel_name(canal)}", group=group
+        )
+
+
+_repository = None
+
+
+def get_chat_repository():
+    """
+    Obtiene el repositorio de chat compartido por toda la aplicación
+
+    Returns:
+        ChatRepository: Instancia única
+    """
+    global _repository
+    if _repository is None:
+        _repository = ChatRepository()
+    return _repository
@@ -0,0 +1,276 @@
+"""
+Perfil de rendimiento del dispositivo
+Elige al arrancar un perfil ('low', 'medium' o 'high') según los núcleos
+y la RAM del dispositivo, o el indicado en CORPOTACHIRA_PROFILE, y
+sustituye con sus valores las constantes de config.py (tamaños de página,
+presupuestos de caché, intervalos de sondeo, precarga, concurrencia,
+animaciones). Con 'auto', si los primeros frames son lentos se baja un
+nivel y se ajustan también los servicios ya creados.
+
+Debe aplicarse antes de crear los servicios: la mayoría lee config al
+construirse.
+"""
+
+import os
+import statistics
+
+import config
+from services.metrics import metrics
+
+LEVELS = ('low', 'medium', 'high')
+
+
+def cpu_count():
+    """Núcleos disponibles para el proceso"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def total_ram_mb():
+    """
+    RAM total del dispositivo (Linux y Android por /proc/meminfo)
+
+    Returns:
+        int: Megabytes, o None si no se puede saber
+    """
+    try:
+        with open('/proc/meminfo', encoding='ascii') as f:
+            for linea in f:
+                if linea.startswith('MemTotal:'):
+                    return int(linea.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def classify(cpus, ram_mb):
+    """
+    Nivel del dispositivo por núcleos y RAM (la RAM desconocida no limita)
+
+    Returns:
+        str: 'low', 'medium' o 'high'
+    """
+    if cpus <= config.PROFILE_LOW_MAX_CPUS or (ram_mb is not None and ram_mb <= config.PROFILE_LOW_MAX_RAM_MB):
+        return 'low'
+    if cpus >= config.PROFILE_HIGH_MIN_CPUS and (ram_mb is None or ram_mb >= config.PROFILE_HIGH_MIN_RAM_MB):
+        return 'high'
+    return 'medium'
+
+
+class DeviceProfile:
+    """Perfil elegido y los datos con que se eligió"""
+
+    def __init__(self, name, source, cpus=None, ram_mb=None):
+        """
+        Args:
+            name (str): 'low', 'medium' o 'high'
+            source (str): 'env' (forzado), 'auto' (núcleos y RAM) o 'frames'
+            cpus (int): Núcleos detectados
+            ram_mb (int): RAM detectada en megabytes
+        """
+        self.name = name
+        self.source = source
+        self.cpus = cpus
+        self.ram_mb = ram_mb
+        self.frame_ms = None
+        self.applied = {}
+
+    @property
+    def level(self):
+        return LEVELS.index(self.name)
+
+    def __repr__(self):
+        return f"DeviceProfile({self.name!r}, source={self.source!r}, cpus={self.cpus}, ram_mb={self.ram_mb})"
+
+
+def detect_profile():
+    """
+    Elige el perfil: el de config.PERFORMANCE_PROFILE si es válido, si no
+    por núcleos y RAM
+
+    Returns:
+        DeviceProfile: Perfil sin aplicar
+    """
+    cpus = cpu_count()
+    ram_mb = total_ram_mb()
+    forzado = (config.PERFORMANCE_PROFILE or 'auto').strip().lower()
+    if forzado in LEVELS:
+        return DeviceProfile(forzado, 'env', cpus, ram_mb)
+    if forzado != 'auto':
+        print(f"⚠️ Perfil de rendimiento desconocido: {forzado!r}, se detecta automáticamente")
+    return DeviceProfile(classify(cpus, ram_mb), 'auto', cpus, ram_mb)
+
+
+# Valores de config antes de aplicar ningún perfil (los de 'medium')
+_defaults = {}
+
+VERDADEROS = ('1', 'true', 'yes', 'si', 'sí', 'on')
+FALSOS = ('0', 'false', 'no', 'off', '')
+
+
+def env_value(texto, ejemplo):
+    """
+    Convierte el texto de una variable de entorno al tipo de la constante
+
+    Args:
+        texto (str): Valor de la variable
+        ejemplo: Valor por defecto de la constante (da el tipo)
+
+    Returns:
+        Valor convertido
+
+    Raises:
+        ValueError: Si el texto no es del tipo de la constante
+    """
+    if isinstance(ejemplo, bool):
+        texto = texto.strip().lower()
+        if texto in VERDADEROS:
+            return True
+        if texto in FALSOS:
+            return False
+        raise ValueError(f"no es un booleano: {texto!r}")
+    if isinstance(ejemplo, int):
+        return int(texto)
+    if isinstance(ejemplo, float):
+        return float(texto)
+    if isinstance(ejemplo, str):
+        return texto
+    raise ValueError(f"tipo no configurable por entorno: {type(ejemplo).__name__}")
+
+
+def apply_profile(profile):
+    """
+    Sustituye las constantes de config con las del perfil
+
+    Las constantes que no define el perfil vuelven a su valor por defecto,
+    así que se puede aplicar otro perfil después. Una variable de entorno
+    con el nombre de la constante tiene prioridad sobre el perfil y se
+    convierte a su tipo; si no es válida se usa el valor del perfil.
+
+    Returns:
+        dict: Constante -> valor aplicado
+    """
+    claves = set()
+    for valores in config.PERFORMANCE_PROFILES.values():
+        claves.update(valores)
+    for clave in claves:
+        _defaults.setdefault(clave, getattr(config, clave))
+
+    ajustes = config.PERFORMANCE_PROFILES.get(profile.name, {})
+    aplicados = {}
+    for clave in sorted(claves):
+        valor = ajustes.get(clave, _defaults[clave])
+        if clave in os.environ:
+            try:
+                valor = env_value(os.environ[clave], _defaults[clave])
+            except ValueError as e:
+                print(f"⚠️ {clave} del entorno ignorada: {e}")
+        setattr(config, clave, valor)
+        aplicados[clave] = valor
+
+    # El registro de métricas se crea al importar, antes que el perfil
+    metrics.resize(config.METRICS_WINDOW)
+    metrics.gauge('device.profile_level', profile.level)
+    profile.applied = aplicados
+    print(f"📱 Perfil de rendimiento: {profile.name} ({profile.source}, "
+          f"{profile.cpus} núcleos, {profile.ram_mb or '?'} MB)")
+    return aplicados
+
+
+def retune_services():
+    """
+    Lleva los valores de config a los servicios ya creados (tras cambiar
+    de perfil con la aplicación en marcha)
+
+    Solo se ajustan las instancias que existen: las demás leerán config
+    al crearse. Las constantes que no se ajustan aquí se leen en cada uso
+    o al construir la pantalla que las usa; el presupuesto de pestañas
+    ocultas (TAB_STATE_MEMORY_BUDGET) lo aplica la UI en on_change.
+    """
+    from services.api_client import peek_api_client
+    from services.image_cache import peek_image_cache
+    from services.message_sync import peek_message_sync
+    from services.network_executor import peek_network_executor
+    from services.report_repository import peek_report_repository
+    from services.ui_scheduler import peek_ui_scheduler
+    from services.widget_pool import peek_widget_pool
+
+    scheduler = peek_ui_scheduler()
+    if scheduler is not None:
+        scheduler.budget_ms = config.UI_FRAME_BUDGET_MS
+    images = peek_image_cache()
+    if images is not None:
+        images.retune(config.IMAGE_MEMORY_BUDGET, config.IMAGE_DISK_BUDGET, config.IMAGE_WORKERS)
+    sync = peek_message_sync()
+    if sync is not None:
+        sync.poll_interval = config.SYNC_POLL_INTERVAL
+    pool = peek_widget_pool()
+    if pool is not None:
+        pool.max_per_kind = config.WIDGET_POOL_MAX_PER_KIND
+        pool.trim(keep=pool.max_per_kind)
+    executor = peek_network_executor()
+    if executor is not None:
+        executor.resize(config.NETWORK_WORKERS)
+    client = peek_api_client()
+    if client is not None:
+        client.resize_pool(config.HTTP_POOL_MAXSIZE)
+    reports = peek_report_repository()
+    if reports is not None:
+        reports.store.max_ranges = config.REPORT_MAX_RANGES
+
+
+_profile = None
+
+
+def get_device_profile():
+    """
+    Obtiene el perfil del dispositivo, eligiéndolo y aplicándolo la
+    primera vez
+
+    Returns:
+        DeviceProfile: Instancia única
+    """
+    global _profile
+    if _profile is None:
+        _profile = detect_profile()
+        apply_profile(_profile)
+    return _profile
+
+
+def watch_frame_time(on_change=None):
+    """
+    Mide los primeros frames tras el arranque y, si la mediana pasa de
+    config.PROFILE_SLOW_FRAME_MS, baja un nivel el perfil automático
+
+    Args:
+        on_change (callable): on_change(profile) tras cambiar de perfil
+            (p. ej. para desactivar animaciones en la UI ya construida)
+    """
+    from kivy.clock import Clock
+
+    profile = get_device_profile()
+    muestras = []
+
+    def medir(dt):
+        muestras.append(dt * 1000)
+        if len(muestras) < config.PROFILE_FRAME_SAMPLES:
+            return True
+        profile.frame_ms = statistics.median(muestras)
+        metrics.gauge('device.frame_ms', round(profile.frame_ms, 2))
+        if profile.source == 'env' or profile.level == 0 or profile.frame_ms <= config.PROFILE_SLOW_FRAME_MS:
+            return False
+        print(f"🐢 Frames lentos ({profile.frame_ms:.0f} ms): se baja el perfil de rendimiento")
+        profile.name = LEVELS[profile.level - 1]
+        profile.source = 'frames'
+        apply_profile(profile)
+        retune_services()
+        if on_change is not None:
+            on_change(profile)
+        return False
+
+    Clock.schedule_once(lambda dt: Clock.schedule_interval(medir, 0), config.PROFILE_FRAME_DELAY)
@@ -0,0 +1,200 @@
+"""
+Monitor de salud del backend
+Despierta la instancia de Render mientras se muestra el presplash y la
+selección de rol, y luego sigue midiendo la disponibilidad y la latencia
+con un intervalo adaptativo
+"""
+
+import threading
+import time
+from collections import deque
+
+import requests
+
+import config
+from services.api_client import get_api_client
+from services.metrics import percentile
+from services.network_executor import despachar_con_clock
+
+# Límites superiores (ms) de las barras del histograma de latencia
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class HealthMonitor:
+    """
+    Sondeo periódico de GET / en un hilo propio
+
+    Con el servidor respondiendo, el intervalo crece desde
+    HEALTH_INTERVAL_MIN hasta HEALTH_INTERVAL_MAX (por debajo del tiempo de
+    inactividad tras el que Render duerme la instancia). Tras un fallo se
+    vuelve a probar pronto, con backoff exponencial.
+    """
+
+    def __init__(self, client=None, dispatcher=None, path='/'):
+        self.client = client or get_api_client()
+        self.dispatcher = dispatcher or despachar_con_clock
+        self.path = path
+        self.reachable = None  # None = aún sin comprobar
+        self.status_code = None
+        self.last_rtt_ms = None
+        self.last_checked = None
+        self.last_error = None
+        self.failures = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._samples = deque(maxlen=config.HEALTH_SAMPLE_WINDOW)
+        self._interval = config.HEALTH_INTERVAL_MIN
+        self._listeners = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """Registra un callback(snapshot) que recibe cada medición en el hilo de la UI"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        """
+        Arranca el monitor; el primer sondeo sale de inmediato y sirve de
+        calentamiento del servidor
+        """
+        self._stop.clear()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='health', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def check_now(self, callback=None):
+        """
+        Adelanta el siguiente sondeo. Si ya hay uno en vuelo no se lanza
+        otro: el callback recibe el resultado de ese
+
+        Args:
+            callback (callable): callback(snapshot) una sola vez, en el hilo de la UI
+        """
+        if callback is not None:
+            with self._lock:
+                self._callbacks.append(callback)
+        self.start()
+        self._wake.set()
+
+    def snapshot(self):
+        """
+        Estado actual para la UI
+
+        Returns:
+            dict: reachable, status_code, rtt_ms, p50_ms, p90_ms, failures,
+                checked_at, error e histogram [(límite_ms, cuenta), ...]
+        """
+        with self._lock:
+            muestras = list(self._samples)
+            histograma = list(self.histogram)
+            return {
+                'reachable': self.reachable,
+                'status_code': self.status_code,
+                'rtt_ms': self.last_rtt_ms,
+                'p50_ms': percentile(muestras, 50),
+                'p90_ms': percentile(muestras, 90),
+                'failures': self.failures,
+                'checked_at': self.last_checked,
+                'error': self.last_error,
+                'histogram': list(zip(LATENCY_BUCKETS_MS + (None,), histograma))
+            }
+
+    def probe(self):
+        """
+        Realiza un sondeo (bloqueante) y actualiza las estadísticas
+
+        Mientras el servidor no se haya visto disponible se usa el timeout
+        largo de calentamiento, porque despertar la instancia tarda
+
+        Returns:
+            dict: Snapshot tras la medición
+        """
+        timeout = config.HEALTH_CHECK_TIMEOUT if self.reachable else config.HEALTH_WARMUP_TIMEOUT
+        inicio = time.monotonic()
+        try:
+            response = self.client.get(self.path, timeout=timeout, retry=False, coalesce=False)
+        except requests.RequestException as e:
+            self._record(False, None, None, str(e))
+        else:
+            rtt_ms = (time.monotonic() - inicio) * 1000
+            response.close()
+            self._record(response.status_code < 500, response.status_code, rtt_ms, None)
+        return self.snapshot()
+
+    def _record(self, reachable, status_code, rtt_ms, error):
+        with self._lock:
+            self.reachable = reachable
+            self.status_code = status_code
+            self.last_checked = time.time()
+            self.last_error = error
+            if rtt_ms is not None:
+                self.last_rtt_ms = round(rtt_ms, 1)
+                self._samples.append(rtt_ms)
+                self.histogram[self._bucket(rtt_ms)] += 1
+            if reachable:
+                self.failures = 0
+                self._interval = min(self._interval * 2, config.HEALTH_INTERVAL_MAX)
+            else:
+                self.failures += 1
+                self._interval = config.HEALTH_INTERVAL_MIN
+
+    @staticmethod
+    def _bucket(rtt_ms):
+        for indice, limite in enumerate(LATENCY_BUCKETS_MS):
+            if rtt_ms <= limite:
+                return indice
+        return len(LATENCY_BUCKETS_MS)
+
+    def next_delay(self):
+        """Segundos hasta el siguiente sondeo según el estado actual"""
+        with self._lock:
+            if self.failures:
+                return min(
+                    config.HEALTH_INTERVAL_MAX,
+                    config.HEALTH_INTERVAL_MIN * (2 ** (self.failures - 1))
+                )
+            return self._interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            snapshot = self.probe()
+            # Las peticiones de check_now() llegadas durante el sondeo quedan atendidas
+            self._wake.clear()
+
+            with self._lock:
+                callbacks = self._callbacks
+                self._callbacks = []
+            for callback in list(self._listeners) + callbacks:
+                self.dispatcher(lambda callback=callback: callback(snapshot))
+
+            with self._lock:
+                pendientes = bool(self._callbacks)
+            if not pendientes:
+                self._wake.wait(self.next_delay())
+
+
+_monitor = None
+
+
+def get_health_monitor():
+    """
+    Obtiene el monitor de salud compartido por toda la aplicación
+
+    Returns:
+        HealthMonitor: Instancia única
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = HealthMonitor()
+    return _monitor
@@ -0,0 +1,519 @@
+"""
+Caché de imágenes remotas
+Avatares, fotos y adjuntos de reportes se descargan una sola vez: un LRU
+de texturas en memoria y un LRU de archivos en disco, ambos con
+presupuesto en bytes. La descarga y la decodificación se hacen en
+segundo plano; la textura se crea en el hilo de la UI (OpenGL) y se
+entrega a los widgets con el Clock. Las peticiones simultáneas de la
+misma URL comparten una sola carga.
+
+Las imágenes descargadas con autorización (adjuntos del backend) se
+guardan aparte, con nombres que dependen del token, y se borran al
+cerrar sesión: el siguiente usuario del teléfono no las ve.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import config
+from services.metrics import metrics
+from services.network_executor import NetworkExecutor, despachar_con_clock
+from services.paths import data_dir
+
+# Extensiones que los cargadores de imágenes de Kivy reconocen por el nombre
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp')
+CONTENT_TYPE_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/bmp': '.bmp',
+}
+
+
+def image_key(url, credential=None):
+    """Nombre de archivo estable para una URL (y la credencial con que se pidió)"""
+    if credential:
+        url = f"{url}\0{credential}"
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def authorization(headers):
+    """Valor del header Authorization, o None si la petición es pública"""
+    for clave, valor in (headers or {}).items():
+        if clave.lower() == 'authorization' and valor:
+            return valor
+    return None
+
+
+def url_extension(url, content_type=None):
+    """
+    Extensión del archivo en disco, por la URL o por el Content-Type
+
+    Returns:
+        str: p. ej. '.png' (por defecto '.png')
+    """
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return extension
+    tipo = (content_type or '').split(';', 1)[0].strip().lower()
+    return CONTENT_TYPE_EXTENSIONS.get(tipo, '.png')
+
+
+def texture_bytes(texture):
+    """Memoria aproximada de una textura RGBA"""
+    ancho, alto = getattr(texture, 'size', (0, 0))
+    return int(ancho) * int(alto) * 4
+
+
+class MemoryLRU:
+    """
+    LRU con presupuesto en bytes
+
+    Solo se usa desde el hilo de la UI (las texturas pertenecen a él), así
+    que no usa bloqueos
+    """
+
+    def __init__(self, budget_bytes, size_of=texture_bytes):
+        """
+        Args:
+            budget_bytes (int): Bytes máximos retenidos
+            size_of (callable): size_of(valor) -> bytes
+        """
+        self.budget_bytes = budget_bytes
+        self.size_of = size_of
+        self.total_bytes = 0
+        self._items = OrderedDict()  # clave -> (valor, bytes)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        """Valor de la clave, marcándolo como usado recientemente"""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, value):
+        """
+        Guarda un valor y expulsa los menos usados si se pasa del presupuesto
+
+        Returns:
+            list: Claves expulsadas
+        """
+        self.pop(key)
+        tamano = self.size_of(value)
+        if tamano > self.budget_bytes:
+            # No cabe: se entrega pero no se retiene
+            return []
+        self._items[key] = (value, tamano)
+        self.total_bytes += tamano
+        return self.resize(self.budget_bytes)
+
+    def resize(self, budget_bytes):
+        """
+        Cambia el presupuesto, expulsando los menos usados si ya no caben
+
+        Returns:
+            list: Claves expulsadas
+        """
+        self.budget_bytes = budget_bytes
+        expulsadas = []
+        while self.total_bytes > self.budget_bytes:
+            clave, (_, bytes_libres) = self._items.popitem(last=False)
+            self.total_bytes -= bytes_libres
+            expulsadas.append(clave)
+        return expulsadas
+
+    def pop(self, key):
+        item = self._items.pop(key, None)
+        if item is None:
+            return None
+        self.total_bytes -= item[1]
+        return item[0]
+
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+
+class DiskLRU:
+    """
+    Archivos en un directorio con presupuesto en bytes, seguro entre hilos
+
+    El orden de uso se reconstruye al arrancar con la fecha de modificación,
+    que se actualiza en cada acierto
+    """
+
+    def __init__(self, directory, budget_bytes):
+        """
+        Args:
+            directory (str): Directorio de los archivos
+            budget_bytes (int): Bytes máximos en disco
+        """
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._items = OrderedDict()  # nombre -> bytes, del menos al más reciente
+        self._indexar()
+
+    def _indexar(self):
+        archivos = []
+        for nombre in os.listdir(self.directory):
+            ruta = os.path.join(self.directory, nombre)
+            if nombre.endswith('.tmp'):
+                # Escritura interrumpida
+                self._borrar(ruta)
+                continue
+            try:
+                estado = os.stat(ruta)
+            except OSError:
+                continue
+            archivos.append((estado.st_mtime, nombre, estado.st_size))
+        for _, nombre, tamano in sorted(archivos):
+            self._items[nombre] = tamano
+            self.total_bytes += tamano
+        self._expulsar()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, name):
+        """
+        Returns:
+            str: Ruta del archivo si está en la caché (y lo marca como usado), o None
+        """
+        with self._lock:
+            if name not in self._items:
+                return None
+            self._items.move_to_end(name)
+        ruta = self.path(name)
+        try:
+            os.utime(ruta, None)
+        except OSError:
+            with self._lock:
+                self._quitar(name)
+            return None
+        return ruta
+
+    def put(self, name, chunks):
+        """
+        Escribe un archivo de forma atómica
+
+        Args:
+            name (str): Nombre del archivo
+            chunks (iterable): Fragmentos de bytes
+
+        Returns:
+            str: Ruta del archivo escrito
+        """
+        ruta = self.path(name)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        tamano = 0
+        try:
+            with open(temporal, 'wb') as archivo:
+                for chunk in chunks:
+                    archivo.write(chunk)
+                    tamano += len(chunk)
+            os.replace(temporal, ruta)
+        except BaseException:
+            self._borrar(temporal)
+            raise
+
+        with self._lock:
+            self._quitar(name)
+            self._items[name] = tamano
+            self.total_bytes += tamano
+            self._expulsar(conservar=name)
+        return ruta
+
+    def resize(self, budget_bytes):
+        """Cambia el presupuesto, borrando los archivos menos usados si ya no caben"""
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._expulsar()
+
+    def remove(self, name):
+        with self._lock:
+            self._quitar(name)
+        self._borrar(self.path(name))
+
+    def clear(self):
+        with self._lock:
+            nombres = list(self._items)
+            self._items.clear()
+            self.total_bytes = 0
+        for nombre in nombres:
+            self._borrar(self.path(nombre))
+
+    def _quitar(self, name):
+        tamano = self._items.pop(name, None)
+        if tamano is not None:
+            self.total_bytes -= tamano
+
+    def _expulsar(self, conservar=None):
+        while self.total_bytes > self.budget_bytes and self._items:
+            nombre = next(iter(self._items))
+            if nombre == conservar and len(self._items) == 1:
+                break
+            self._quitar(nombre)
+            self._borrar(self.path(nombre))
+
+    @staticmethod
+    def _borrar(ruta):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+def decodificar_con_kivy(path):
+    """
+    Decodifica la imagen en el hilo de trabajo: los píxeles quedan en
+    memoria y la textura se crea después, en el hilo de la UI, al leer
+    .texture
+
+    Returns:
+        ImageLoaderBase: Imagen decodificada
+    """
+    from kivy.core.image import ImageLoader
+    return ImageLoader.load(path, keep_data=False, nocache=True)
+
+
+def crear_textura_con_kivy(decodificada):
+    """Crea la textura OpenGL (solo en el hilo de la UI)"""
+    return decodificada.texture
+
+
+class ImageCache:
+    """Carga de imágenes remotas con caché en memoria y en disco"""
+
+    def __init__(self, client=None, memory_budget=None, disk_budget=None,
+                 directory=None, executor=None, dispatcher=None,
+                 decoder=None, texture_factory=None):
+        """
+        Args:
+            client (ApiClient): Cliente HTTP (se usa su sesión keep-alive)
+            memory_budget (int): Bytes de texturas en memoria
+                (por defecto config.IMAGE_MEMORY_BUDGET)
+            disk_budget (int): Bytes de archivos en disco (por defecto config.IMAGE_DISK_BUDGET)
+            directory (str): Directorio de la caché en disco
+            executor (NetworkExecutor): Hilos de descarga y decodificación
+            dispatcher (callable): Entrega callbacks al hilo de la UI
+            decoder (callable): decoder(ruta) en segundo plano
+            texture_factory (callable): texture_factory(decodificada) en el hilo de la UI
+        """
+        self._client = client
+        self.dispatcher = dispatcher or despachar_con_clock
+        self.memory = MemoryLRU(
+            config.IMAGE_MEMORY_BUDGET if memory_budget is None else memory_budget
+        )
+        directory = directory or data_dir(config.IMAGE_CACHE_DIR)
+        disk_budget = config.IMAGE_DISK_BUDGET if disk_budget is None else disk_budget
+        self.disk = DiskLRU(directory, disk_budget)
+        # Adjuntos descargados con autorización: solo de la sesión actual
+        self.private_disk = DiskLRU(f"{directory.rstrip(os.sep)}-private", disk_budget)
+        # Un ejecutor indicado es de quien lo pasa: retune() no lo toca
+        self._executor_propio = executor is None
+        self.executor = executor or NetworkExecutor(
+            max_workers=config.IMAGE_WORKERS, dispatcher=self.dispatcher
+        )
+        self.decoder = decoder or decodificar_con_kivy
+        self.texture_factory = texture_factory or crear_textura_con_kivy
+        self._esperando = {}  # url -> callbacks de las cargas en curso
+        self._privadas = set()  # URLs en memoria cargadas con autorización
+
+    @property
+    def client(self):
+        if self._client is None:
+            from services.api_client import get_api_client
+            self._client = get_api_client()
+        return self._client
+
+    def get(self, url):
+        """
+        Textura ya cargada en memoria, sin tocar disco ni red
+
+        Returns:
+            Texture: Textura o None
+        """
+        return self.memory.get(url)
+
+    def load(self, url, callback, on_error=None, headers=None):
+        """
+        Obtiene la textura de una imagen (llamar desde el hilo de la UI)
+
+        Si está en memoria callback se llama de inmediato; si no, se busca
+        en disco o se descarga y decodifica en segundo plano y callback
+        se llama en el hilo de la UI. Las cargas simultáneas de la misma
+        URL comparten una sola descarga.
+
+        Args:
+            url (str): URL de la imagen
+            callback (callable): callback(texture)
+            on_error (callable): on_error(excepción) si no se pudo cargar
+            headers (dict): Headers de autenticación para adjuntos del backend
+
+        Returns:
+            Texture: La textura si ya estaba en memoria, o None
+        """
+        textura = self.memory.get(url)
+        if textura is not None:
+            metrics.count('image_cache.memory_hit')
+            callback(textura)
+            return textura
+
+        esperando = self._esperando.get(url)
+        if esperando is not None:
+            metrics.count('image_cache.coalesced')
+            esperando.append((callback, on_error))
+            return None
+
+        self._esperando[url] = [(callback, on_error)]
+        if authorization(headers):
+            self._privadas.add(url)
+        self.executor.submit(
+            self._obtener, url, headers,
+            on_success=lambda decodificada: self._entregar(url, decodificada),
+            on_error=lambda error: self._fallar(url, error),
+            group='images'
+        )
+        return None
+
+    def prefetch(self, urls):
+        """Carga en segundo plano las imágenes que se van a mostrar pronto"""
+        for url in urls:
+            if url and url not in self.memory and url not in self._esperando:
+                self.load(url, lambda textura: None)
+
+    def _obtener(self, url, headers=None):
+        """Ruta en disco (descargando si hace falta) y decodificación; en segundo plano"""
+        credencial = authorization(headers)
+        disco = self.private_disk if credencial else self.disk
+        nombre = image_key(url, credencial)
+        ruta = self._buscar_en_disco(disco, nombre)
+        if ruta is not None:
+            metrics.count('image_cache.disk_hit')
+        else:
+            ruta = self._descargar(disco, url, nombre, headers)
+        with metrics.timer('image_cache.decode'):
+            try:
+                return self.decoder(ruta)
+            except Exception:
+                # Archivo corrupto: que la próxima vez se descargue de nuevo
+                disco.remove(os.path.basename(ruta))
+                raise
+
+    @staticmethod
+    def _buscar_en_disco(disco, nombre):
+        for extension in IMAGE_EXTENSIONS:
+            ruta = disco.get(nombre + extension)
+            if ruta is not None:
+                return ruta
+        return None
+
+    def _descargar(self, disco, url, nombre, headers):
+        metrics.count('image_cache.download')
+        with metrics.timer('image_cache.download'):
+            response = self.client.session.get(
+                self.client.url(url), headers=headers, stream=True,
+                timeout=config.IMAGE_TIMEOUT
+            )
+            try:
+                response.raise_for_status()
+                extension = url_extension(url, response.headers.get('Content-Type'))
+                return disco.put(
+                    nombre + extension, response.iter_content(config.IMAGE_CHUNK_SIZE)
+                )
+            finally:
+                response.close()
+
+    def _entregar(self, url, decodificada):
+        esperando = self._esperando.pop(url, [])
+        try:
+            textura = self.texture_factory(decodificada)
+        except Exception as e:
+            return self._notificar_error(url, esperando, e)
+        self.memory.put(url, textura)
+        for callback, _ in esperando:
+            callback(textura)
+
+    def _fallar(self, url, error):
+        self._notificar_error(url, self._esperando.pop(url, []), error)
+
+    def _notificar_error(self, url, esperando, error):
+        print(f"❌ Error cargando imagen {url}: {error}")
+        metrics.error('image_cache', error)
+        for _, on_error in esperando:
+            if on_error is not None:
+                on_error(error)
+
+    def retune(self, memory_budget, disk_budget, workers):
+        """Aplica nuevos presupuestos y número de hilos (cambio de perfil)"""
+        self.memory.resize(memory_budget)
+        self.disk.resize(disk_budget)
+        self.private_disk.resize(disk_budget)
+        if self._executor_propio:
+            self.executor.resize(workers)
+
+    def trim_memory(self):
+        """Libera todas las texturas en memoria (p. ej. con poca memoria)"""
+        self.memory.clear()
+        self._privadas.clear()
+
+    def forget_private(self):
+        """
+        Olvida las imágenes cargadas con autorización (al cerrar sesión):
+        cancela sus cargas y las borra de memoria y de disco
+        """
+        self.executor.cancel_group('images')
+        self._esperando.clear()
+        for url in self._privadas:
+            self.memory.pop(url)
+        self._privadas.clear()
+        self.private_disk.clear()
+
+    def clear(self):
+        """Cancela las cargas en curso y vacía las cachés"""
+        self.executor.cancel_group('images')
+        self._esperando.clear()
+        self._privadas.clear()
+        self.memory.clear()
+        self.disk.clear()
+        self.private_disk.clear()
+
+
+_cache = None
+
+
+def get_image_cache():
+    """
+    Obtiene la caché de imágenes compartida por toda la aplicación
+
+    Returns:
+        ImageCache: Instancia única
+    """
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
+
+
+def peek_image_cache():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        ImageCache: Instancia única o None
+    """
+    return _cache
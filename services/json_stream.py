@@ -0,0 +1,141 @@
+"""
+Decodificación incremental de JSON
+Extrae los elementos de un array JSON a medida que llegan los bytes,
+sin esperar a tener la respuesta completa en memoria
+"""
+
+import codecs
+import json
+
+_ESPACIOS = ' \t\n\r'
+_SEPARADORES = ',]' + _ESPACIOS
+
+
+class JsonArrayStream:
+    """
+    Decodificador incremental de un array JSON de primer nivel
+
+    Uso:
+        stream = JsonArrayStream()
+        for chunk in response.iter_content(16384):
+            for item in stream.feed(chunk):
+                ...
+        stream.close()
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._abierto = False
+        self._cerrado = False
+
+    @property
+    def finished(self):
+        """Indica si ya se leyó el ']' final"""
+        return self._cerrado
+
+    def feed(self, chunk):
+        """
+        Añade bytes (o texto) recibidos
+
+        Args:
+            chunk (bytes | str): Fragmento de la respuesta
+
+        Returns:
+            list: Elementos completos decodificados con este fragmento
+
+        Raises:
+            ValueError: Si el contenido no es un array JSON válido
+        """
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        if self._pos:
+            # Descartar lo ya consumido para no recorrer el buffer entero
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+        return self._extraer(final=False)
+
+    def close(self):
+        """
+        Termina la lectura
+
+        Returns:
+            list: Elementos pendientes (p. ej. un número al final del buffer)
+
+        Raises:
+            ValueError: Si el array quedó incompleto
+        """
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b'', final=True)
+        self._pos = 0
+        items = self._extraer(final=True)
+        if not self._cerrado:
+            raise ValueError('Array JSON incompleto')
+        return items
+
+    def _saltar_espacios(self):
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _ESPACIOS:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _extraer(self, final):
+        items = []
+        while not self._cerrado:
+            if not self._saltar_espacios():
+                break
+
+            caracter = self._buffer[self._pos]
+            if not self._abierto:
+                if caracter != '[':
+                    raise ValueError('Se esperaba un array JSON')
+                self._abierto = True
+                self._pos += 1
+                continue
+            if caracter == ']':
+                self._cerrado = True
+                self._pos += 1
+                break
+            if caracter == ',':
+                self._pos += 1
+                continue
+
+            try:
+                item, fin = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if final:
+                    raise
+                break  # Elemento incompleto: esperar más datos
+
+            # Un número puede continuar en el siguiente fragmento ('-500' + '.0');
+            # solo se acepta el elemento cuando ya llegó su separador
+            if fin < len(self._buffer) and self._buffer[fin] not in _SEPARADORES:
+                if final:
+                    raise ValueError(f'Separador inesperado en la posición {fin}')
+                break
+            if fin >= len(self._buffer) and not final:
+                break
+            items.append(item)
+            self._pos = fin
+        return items
+
+
+def iter_json_array(chunks):
+    """
+    Recorre los elementos de un array JSON recibido por fragmentos
+
+    Args:
+        chunks (iterable): Fragmentos en bytes o texto
+
+    Yields:
+        Elementos del array en orden
+    """
+    stream = JsonArrayStream()
+    for chunk in chunks:
+        if chunk:
+            yield from stream.feed(chunk)
+    yield from stream.close()
@@ -0,0 +1,284 @@
+"""
+Caché local offline-first
+Guarda las respuestas del backend en SQLite por usuario, endpoint y
+parámetros, y las revalida con peticiones condicionales (ETag /
+Last-Modified). Un usuario nunca ve lo que se guardó para otro, aunque
+compartan el teléfono.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+import config
+from services.paths import data_dir
+from services.wire_format import decode_body, decode_response
+
+
+def cache_key(path, params=None):
+    """
+    Clave de caché de una petición GET
+
+    Args:
+        path (str): Ruta del endpoint, p. ej. '/mensajes/general'
+        params (dict): Parámetros de consulta
+
+    Returns:
+        str: Ruta más parámetros ordenados
+    """
+    if not params:
+        return path
+    return f"{path}?{urlencode(sorted(params.items()))}"
+
+
+class CacheEntry:
+    """Respuesta almacenada"""
+
+    __slots__ = ('key', 'body', 'etag', 'last_modified', 'fetched_at')
+
+    def __init__(self, key, body, etag, last_modified, fetched_at):
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        """Segundos desde la última validación con el servidor"""
+        return time.time() - self.fetched_at
+
+    def json(self):
+        """Datos de la respuesta (JSON o MessagePack)"""
+        return decode_body(self.body)
+
+
+def cache_owner(usuario, nivel=None):
+    """
+    Dueño de las entradas de caché de una sesión
+
+    Returns:
+        str: p. ej. 'admin:maria'; '' sin sesión
+    """
+    if not usuario:
+        return ''
+    return f"{nivel or ''}:{usuario}"
+
+
+class LocalCache:
+    """Caché HTTP en SQLite, segura para usar desde varios hilos"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Archivo SQLite (por defecto en el directorio de datos)
+        """
+        self.path = path or os.path.join(data_dir(), config.CACHE_DB_NAME)
+        self.owner = ''
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            columnas = [fila[1] for fila in self._conn.execute('PRAGMA table_info(http_cache)')]
+            if columnas and 'owner' not in columnas:
+                # Caché de una versión sin dueño: no se sabe de quién es cada entrada
+                self._conn.execute('DROP TABLE http_cache')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS http_cache ('
+                ' owner TEXT NOT NULL,'
+                ' key TEXT NOT NULL,'
+                ' body BLOB NOT NULL,'
+                ' etag TEXT,'
+                ' last_modified TEXT,'
+                ' fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (owner, key))'
+            )
+            self._conn.commit()
+
+    def set_owner(self, usuario, nivel=None):
+        """
+        Cambia el usuario de la sesión activa; solo se leen y guardan sus
+        entradas (None: sin sesión)
+        """
+        self.owner = cache_owner(usuario, nivel)
+
+    def get(self, key):
+        """
+        Returns:
+            CacheEntry: Entrada del usuario actual o None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT key, body, etag, last_modified, fetched_at FROM http_cache'
+                ' WHERE owner = ? AND key = ?',
+                (self.owner, key)
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def put(self, key, body, etag=None, last_modified=None, owner=None):
+        """
+        Guarda o reemplaza una respuesta
+
+        Args:
+            owner (str): Dueño de la entrada (por defecto el usuario actual);
+                la revalidación lo fija al empezar por si la sesión cambia
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO http_cache (owner, key, body, etag, last_modified, fetched_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (self.owner if owner is None else owner, key, body, etag, last_modified, time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, key, owner=None):
+        """Marca una entrada como revalidada (respuesta 304)"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE http_cache SET fetched_at = ? WHERE owner = ? AND key = ?',
+                (time.time(), self.owner if owner is None else owner, key)
+            )
+            self._conn.commit()
+
+    def invalidate(self, prefix):
+        """Elimina las entradas cuya clave empieza por prefix (de todos los usuarios)"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM http_cache WHERE key LIKE ? ESCAPE '\\'",
+                (prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%',)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def conditional_get(client, cache, path, params=None, headers=None):
+    """
+    GET condicional: envía los validadores de la entrada en caché y solo
+    transfiere el cuerpo si cambió
+
+    Args:
+        client (ApiClient): Cliente HTTP
+        cache (LocalCache): Caché local
+        path (str): Ruta del endpoint
+        params (dict): Parámetros de consulta
+        headers (dict): Headers adicionales (p. ej. autorización)
+
+    Returns:
+        tuple: (datos JSON, True si cambiaron respecto a la caché)
+
+    Raises:
+        requests.HTTPError: Si el servidor responde con error
+    """
+    key = cache_key(path, params)
+    # Una respuesta que llega tras un cambio de sesión se guarda para quien la pidió
+    owner = cache.owner
+    entry = cache.get(key)
+
+    headers = dict(headers or {})
+    if entry is not None:
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+    response = client.get(path, params=params, headers=headers)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(key, owner=owner)
+        return entry.json(), False
+
+    response.raise_for_status()
+    data = decode_response(response)
+    cache.put(
+        key, response.content,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+        owner=owner
+    )
+    return data, True
+
+
+class StaleWhileRevalidate:
+    """
+    Carga con datos en caché al instante y revalidación en segundo plano
+
+    on_data se llama primero con lo que haya en caché y otra vez solo si el
+    servidor devuelve algo distinto.
+    """
+
+    def __init__(self, client, cache, executor):
+        self.client = client
+        self.cache = cache
+        self.executor = executor
+
+    def load(self, path, on_data, params=None, headers=None, on_error=None,
+             max_age=None, tag=None, group=None):
+        """
+        Args:
+            path (str): Ruta del endpoint
+            on_data (callable): on_data(datos, from_cache) en el hilo de la UI
+            params (dict): Parámetros de consulta
+            headers (dict): Headers adicionales
+            on_error (callable): Recibe la excepción si la revalidación falla
+            max_age (float): Segundos en los que la caché se da por fresca y no
+                se revalida (por defecto config.CACHE_FRESH_SECONDS)
+            tag (str): Etiqueta del ejecutor; una carga nueva reemplaza a la anterior
+            group (str): Grupo del ejecutor para cancelarla al cambiar de pestaña
+
+        Returns:
+            NetworkTask: Revalidación en curso, o None si la caché estaba fresca
+        """
+        max_age = config.CACHE_FRESH_SECONDS if max_age is None else max_age
+        entry = self.cache.get(cache_key(path, params))
+        if entry is not None:
+            on_data(entry.json(), True)
+            if entry.age < max_age:
+                return None
+
+        def on_success(resultado):
+            data, changed = resultado
+            if changed or entry is None:
+                on_data(data, False)
+
+        return self.executor.submit(
+            conditional_get, self.client, self.cache, path,
+            params=params, headers=headers,
+            on_success=on_success, on_error=on_error,
+            tag=tag or cache_key(path, params), group=group
+        )
+
+
+_cache = None
+
+
+def get_local_cache():
+    """
+    Obtiene la caché local compartida por toda la aplicación
+
+    Returns:
+        LocalCache: Instancia única
+    """
+    global _cache
+    if _cache is None:
+        _cache = LocalCache()
+    return _cache
+
+
+def peek_local_cache():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        LocalCache: Instancia única o None
+    """
+    return _cache
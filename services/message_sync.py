@@ -0,0 +1,334 @@
+"""
+Sincronización incremental de mensajes
+Guarda un cursor (último id o timestamp visto) por canal y pide al
+backend solo los mensajes posteriores, con long-polling y retroceso a
+sondeo periódico si el servidor no retiene la petición. Si el servidor
+ignora el cursor y reenvía el historial, se sondea con GET condicional
+(la caché local guarda el historial y sus validadores) y con un
+intervalo que crece mientras no haya mensajes nuevos
+"""
+
+import bisect
+import threading
+import time
+
+import config
+from services.api_client import get_api_client
+from services.chat_repository import messages_path
+from services.local_cache import conditional_get, get_local_cache
+from services.models import Message
+from services.network_executor import despachar_con_clock
+from services.wire_format import decode_response
+
+# Campos posibles del identificador y la fecha de un mensaje
+MESSAGE_ID_FIELDS = ('id', '_id')
+MESSAGE_TIME_FIELDS = ('timestamp', 'fecha', 'created_at')
+
+
+def _first_field(mensaje, campos):
+    for campo in campos:
+        valor = mensaje.get(campo)
+        if valor is not None:
+            return valor
+    return None
+
+
+def message_id(mensaje):
+    """Identificador de un mensaje o None si el backend no lo envía"""
+    return _first_field(mensaje, MESSAGE_ID_FIELDS)
+
+
+def message_time(mensaje):
+    """Fecha de un mensaje tal como la envía el backend"""
+    return _first_field(mensaje, MESSAGE_TIME_FIELDS)
+
+
+def _comparable(valor):
+    # Los ids numéricos se comparan como números ('10' va después de '9')
+    if isinstance(valor, (int, float)):
+        return (0, valor, '')
+    texto = str(valor or '')
+    if texto.isdigit():
+        return (0, int(texto), '')
+    return (1, 0, texto)
+
+
+def message_sort_key(mensaje):
+    """Orden cronológico: fecha y, a igualdad, identificador"""
+    return (_comparable(message_time(mensaje)), _comparable(message_id(mensaje)))
+
+
+def message_identity(mensaje):
+    """Clave para descartar duplicados aunque el backend no envíe id"""
+    ident = message_id(mensaje)
+    if ident is not None:
+        return ident
+    return (message_time(mensaje), mensaje.get('usuario'), mensaje.get('texto'))
+
+
+class ChannelState:
+    """Mensajes conocidos y cursor de un canal"""
+
+    def __init__(self):
+        self.messages = []
+        self.sort_keys = []
+        self.seen = set()
+        self.last_id = None
+        self.last_time = None
+        # El servidor contestó a un cursor reenviando mensajes ya vistos
+        self.ignores_cursor = False
+        self.lock = threading.Lock()
+
+    def cursor_params(self):
+        """Parámetros para pedir solo lo posterior al cursor"""
+        if self.last_id is not None:
+            return {'since_id': self.last_id}
+        if self.last_time is not None:
+            return {'since': self.last_time}
+        return {}
+
+    def merge(self, mensajes, con_cursor=False):
+        """
+        Incorpora mensajes en orden cronológico descartando los ya vistos
+
+        Si el servidor ignora el cursor y devuelve el historial completo,
+        el resultado sigue siendo correcto: solo se añaden los nuevos
+
+        Args:
+            mensajes (list): Dicts de la API o Message
+            con_cursor (bool): La respuesta se pidió con cursor; si repite
+                mensajes anteriores al último se marca ignores_cursor
+
+        Returns:
+            list: Mensajes realmente nuevos (Message), en orden
+        """
+        with self.lock:
+            return self._merge(mensajes, con_cursor)
+
+    def _merge(self, mensajes, con_cursor=False):
+        # Un cursor inclusivo puede repetir el último mensaje; cualquier
+        # otro repetido indica que el servidor no filtró
+        ultimo = message_identity(self.messages[-1]) if self.messages else None
+        nuevos = []
+        for mensaje in mensajes:
+            mensaje = Message.coerce(mensaje)
+            if mensaje is None:
+                continue
+            ident = message_identity(mensaje)
+            if ident in self.seen:
+                if con_cursor and ident != ultimo:
+                    self.ignores_cursor = True
+                continue
+            self.seen.add(ident)
+            nuevos.append(mensaje)
+
+        nuevos.sort(key=message_sort_key)
+        for mensaje in nuevos:
+            clave = message_sort_key(mensaje)
+            if not self.sort_keys or clave >= self.sort_keys[-1]:
+                # Caso habitual: llegan después del último conocido
+                self.sort_keys.append(clave)
+                self.messages.append(mensaje)
+            else:
+                posicion = bisect.bisect_right(self.sort_keys, clave)
+                self.sort_keys.insert(posicion, clave)
+                self.messages.insert(posicion, mensaje)
+
+        if self.messages:
+            ultimo = self.messages[-1]
+            self.last_id = message_id(ultimo)
+            self.last_time = message_time(ultimo)
+        return nuevos
+
+
+class MessageSync:
+    """
+    Motor de sincronización por canal
+
+    sync_once() es bloqueante y sirve para pruebas o para el ejecutor de
+    red; start() lanza un hilo por canal que hace long-polling y entrega
+    los mensajes nuevos a la UI con on_new(canal, nuevos).
+    """
+
+    def __init__(self, client=None, dispatcher=None, long_poll_wait=None,
+                 poll_interval=None, cache=None):
+        """
+        Args:
+            client (ApiClient): Cliente HTTP
+            dispatcher (callable): Entrega callbacks al hilo de la UI
+            long_poll_wait (float): Segundos que se pide al servidor retener la petición
+            poll_interval (float): Intervalo de sondeo si no hay long-polling
+            cache (LocalCache): Caché para los GET condicionales cuando el
+                servidor ignora el cursor
+        """
+        self.client = client or get_api_client()
+        self.cache = cache or get_local_cache()
+        self.dispatcher = dispatcher or despachar_con_clock
+        self.long_poll_wait = config.SYNC_LONG_POLL_WAIT if long_poll_wait is None else long_poll_wait
+        self.poll_interval = config.SYNC_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._channels = {}
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def state(self, canal):
+        """Estado de un canal, creado si no existe"""
+        with self._lock:
+            if canal not in self._channels:
+                self._channels[canal] = ChannelState()
+            return self._channels[canal]
+
+    def messages(self, canal):
+        """Copia de los mensajes conocidos de un canal, en orden"""
+        estado = self.state(canal)
+        with estado.lock:
+            return list(estado.messages)
+
+    def seed(self, canal, mensajes):
+        """
+        Inicializa un canal con mensajes ya cargados (p. ej. de la caché)
+
+        Returns:
+            list: Mensajes incorporados
+        """
+        return self.state(canal).merge(mensajes)
+
+    def sync_once(self, canal, wait=0, headers=None):
+        """
+        Pide al backend los mensajes posteriores al cursor
+
+        Args:
+            canal (str): Nombre del canal
+            wait (float): Segundos de long-polling (0 = respuesta inmediata)
+            headers (dict): Headers de autenticación
+
+        Returns:
+            list: Mensajes nuevos en orden
+
+        Raises:
+            requests.RequestException: Si falla la red o el servidor
+        """
+        estado = self.state(canal)
+        with estado.lock:
+            params = estado.cursor_params()
+            ignora = estado.ignores_cursor
+        if ignora:
+            # Historial completo, pero sin cuerpo si no cambió (304)
+            datos, cambiaron = conditional_get(
+                self.client, self.cache, messages_path(canal), headers=headers
+            )
+            return estado.merge(datos) if cambiaron else []
+
+        timeout = self.client.timeout_for(messages_path(canal))
+        if wait:
+            params['wait'] = int(wait)
+            timeout += wait
+
+        response = self.client.get(
+            messages_path(canal), params=params, headers=headers,
+            timeout=timeout, retry=False, coalesce=False
+        )
+        response.raise_for_status()
+        return estado.merge(decode_response(response), con_cursor=bool(params))
+
+    def start(self, canal, on_new, headers=None, on_error=None):
+        """
+        Inicia la sincronización continua de un canal en segundo plano
+
+        Args:
+            canal (str): Nombre del canal
+            on_new (callable): on_new(canal, nuevos) en el hilo de la UI
+            headers (dict): Headers de autenticación
+            on_error (callable): Recibe la excepción de cada fallo de red
+        """
+        self.stop(canal)
+        detener = threading.Event()
+        hilo = threading.Thread(
+            target=self._run, args=(canal, on_new, headers, on_error, detener),
+            name=f"sync-{canal}", daemon=True
+        )
+        with self._lock:
+            self._workers[canal] = detener
+        hilo.start()
+
+    def stop(self, canal):
+        """Detiene la sincronización de un canal"""
+        with self._lock:
+            detener = self._workers.pop(canal, None)
+        if detener is not None:
+            detener.set()
+
+    def stop_all(self):
+        with self._lock:
+            eventos = list(self._workers.values())
+            self._workers.clear()
+        for detener in eventos:
+            detener.set()
+
+    def clear(self):
+        """Detiene todo y olvida los mensajes y cursores (p. ej. al cerrar sesión)"""
+        self.stop_all()
+        with self._lock:
+            self._channels.clear()
+
+    def _run(self, canal, on_new, headers, on_error, detener):
+        fallos = 0
+        long_poll = self.long_poll_wait > 0
+        estado = self.state(canal)
+        intervalo = self.poll_interval
+        while not detener.is_set():
+            inicio = time.monotonic()
+            try:
+                nuevos = self.sync_once(
+                    canal, wait=self.long_poll_wait if long_poll else 0, headers=headers
+                )
+            except Exception as e:
+                fallos += 1
+                if on_error is not None and not detener.is_set():
+                    self.dispatcher(lambda e=e: on_error(e))
+                detener.wait(min(config.RETRY_BACKOFF_MAX, self.poll_interval * (2 ** (fallos - 1))))
+                continue
+
+            fallos = 0
+            if nuevos and not detener.is_set():
+                self.dispatcher(lambda nuevos=nuevos: on_new(canal, nuevos))
+
+            # Si el servidor contestó vacío sin retener la petición no soporta
+            # long-polling: pasar a sondeo periódico. Si además ignora el
+            # cursor, cada sondeo trae el historial: espaciarlos mientras
+            # no haya mensajes nuevos
+            if estado.ignores_cursor:
+                long_poll = False
+                if nuevos:
+                    intervalo = self.poll_interval
+                else:
+                    intervalo = min(config.SYNC_MAX_POLL_INTERVAL, intervalo * 2)
+            elif long_poll and not nuevos and time.monotonic() - inicio < self.long_poll_wait / 2:
+                long_poll = False
+            if not long_poll:
+                detener.wait(intervalo)
+
+
+_sync = None
+
+
+def get_message_sync():
+    """
+    Obtiene el motor de sincronización compartido por toda la aplicación
+
+    Returns:
+        MessageSync: Instancia única
+    """
+    global _sync
+    if _sync is None:
+        _sync = MessageSync()
+    return _sync
+
+
+def peek_message_sync():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        MessageSync: Instancia única o None
+    """
+    return _sync
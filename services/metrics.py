@@ -0,0 +1,303 @@
+"""
+Instrumentación en tiempo de ejecución (opcional)
+Mide rutas críticas (cambio de pestaña, reseteo de pantallas, llamadas a
+la API, reconfiguración por rol), frames y memoria con percentiles sobre
+una ventana móvil, guarda los últimos errores y exporta todo a JSON.
+
+Se activa con METRICS_ENABLED en config.py o con CORPOTACHIRA_METRICS=1.
+Desactivada, cada medición cuesta una comprobación de un booleano.
+"""
+
+import json
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import config
+
+
+def percentile(values, pct):
+    """
+    Percentil por rango más cercano
+
+    Args:
+        values (iterable): Muestras
+        pct (float): Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil o None si no hay muestras
+    """
+    ordenados = sorted(values)
+    if not ordenados:
+        return None
+    indice = max(0, math.ceil(pct / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def memory_usage():
+    """
+    Memoria del proceso
+
+    Returns:
+        dict: rss_bytes (actual, Linux/Android) y max_rss_bytes si están disponibles
+    """
+    datos = {}
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        datos['rss_bytes'] = paginas * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux la da en KiB y macOS en bytes
+        datos['max_rss_bytes'] = max_rss if sys.platform == 'darwin' else max_rss * 1024
+    except (ImportError, OSError):
+        pass
+    return datos
+
+
+def count_widgets(root):
+    """Cuenta los widgets del árbol que cuelga de root (incluido)"""
+    total = 0
+    pendientes = [root]
+    while pendientes:
+        widget = pendientes.pop()
+        total += 1
+        pendientes.extend(getattr(widget, 'children', ()))
+    return total
+
+
+class _Serie:
+    """Ventana móvil de duraciones de una métrica"""
+
+    __slots__ = ('samples', 'count', 'total', 'max')
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, valor):
+        self.samples.append(valor)
+        self.count += 1
+        self.total += valor
+        if valor > self.max:
+            self.max = valor
+
+    def resumen(self):
+        muestras = list(self.samples)
+        return {
+            'count': self.count,
+            'last_ms': round(muestras[-1], 2) if muestras else None,
+            'mean_ms': round(self.total / self.count, 2) if self.count else None,
+            'p50_ms': _redondear(percentile(muestras, 50)),
+            'p90_ms': _redondear(percentile(muestras, 90)),
+            'p99_ms': _redondear(percentile(muestras, 99)),
+            'max_ms': round(self.max, 2),
+        }
+
+
+def _redondear(valor):
+    return round(valor, 2) if valor is not None else None
+
+
+class Metrics:
+    """Registro de tiempos, contadores, valores y errores; seguro entre hilos"""
+
+    def __init__(self, enabled=False, window=200, max_errors=50):
+        """
+        Args:
+            enabled (bool): Activa la instrumentación
+            window (int): Muestras por métrica para los percentiles
+            max_errors (int): Errores recientes que se conservan
+        """
+        self.enabled = enabled
+        self.window = window
+        self._series = {}
+        self._counters = {}
+        self._gauges = {}
+        self._errors = deque(maxlen=max_errors)
+        self._lock = threading.Lock()
+        self._t0 = time.time()
+        self._frames_evento = None
+
+    def resize(self, window):
+        """Cambia las muestras por métrica, también de las series ya creadas"""
+        with self._lock:
+            self.window = window
+            for serie in self._series.values():
+                serie.samples = deque(serie.samples, maxlen=window)
+
+    def record(self, name, ms):
+        """Registra una duración en milisegundos"""
+        if not self.enabled:
+            return
+        with self._lock:
+            serie = self._series.get(name)
+            if serie is None:
+                serie = self._series[name] = _Serie(self.window)
+            serie.add(ms)
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Mide la duración de un bloque
+
+        Args:
+            name (str): Nombre de la métrica, p. ej. 'tab_switch'
+        """
+        if not self.enabled:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - inicio) * 1000)
+
+    def timed(self, name):
+        """Decorador equivalente a timer() para una función entera"""
+        def decorador(func):
+            @wraps(func)
+            def envoltura(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def count(self, name, delta=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + delta
+
+    def gauge(self, name, value):
+        """Guarda el último valor de una magnitud (p. ej. número de widgets)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def error(self, where, exc):
+        """
+        Registra un error capturado
+
+        Args:
+            where (str): Lugar, p. ej. 'switch_screen'
+            exc (Exception): Excepción capturada
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._errors.append({
+                'where': where,
+                'type': type(exc).__name__,
+                'message': str(exc)[:200],
+                'at': round(time.time() - self._t0, 3),
+            })
+            self._counters[f"errors.{where}"] = self._counters.get(f"errors.{where}", 0) + 1
+
+    def watch_frames(self):
+        """Mide el tiempo entre frames con el Clock de Kivy (métrica 'frame')"""
+        if not self.enabled or self._frames_evento is not None:
+            return
+        from kivy.clock import Clock
+        self._frames_evento = Clock.schedule_interval(lambda dt: self.record('frame', dt * 1000), 0)
+
+    def sample_runtime(self, root=None):
+        """
+        Actualiza los valores de memoria y, si se indica, de widgets
+
+        Args:
+            root (Widget): Raíz del árbol de widgets a contar
+        """
+        if not self.enabled:
+            return
+        for nombre, valor in memory_usage().items():
+            self.gauge(f"memory.{nombre}", valor)
+        if root is not None:
+            self.gauge('widgets', count_widgets(root))
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Series con percentiles, contadores, valores y errores recientes
+        """
+        with self._lock:
+            return {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'uptime_s': round(time.time() - self._t0, 1),
+                'python': platform.python_version(),
+                'platform': sys.platform,
+                'machine': platform.machine(),
+                'timings': {nombre: serie.resumen() for nombre, serie in sorted(self._series.items())},
+                'counters': dict(sorted(self._counters.items())),
+                'gauges': dict(sorted(self._gauges.items())),
+                'errors': list(self._errors),
+            }
+
+    def summary_lines(self, limit=8):
+        """
+        Líneas cortas para la superposición en pantalla: primero frames y
+        memoria, después las métricas con el p90 más alto
+        """
+        datos = self.snapshot()
+        lineas = []
+        frame = datos['timings'].get('frame')
+        if frame:
+            lineas.append(f"frame p50 {frame['p50_ms']:.1f} p99 {frame['p99_ms']:.1f} ms")
+        gauges = datos['gauges']
+        if 'memory.rss_bytes' in gauges or 'widgets' in gauges:
+            rss = gauges.get('memory.rss_bytes')
+            lineas.append(
+                f"rss {rss / 1048576:.1f} MB · widgets {gauges.get('widgets', '-')}"
+                if rss is not None else f"widgets {gauges.get('widgets', '-')}"
+            )
+
+        otras = [(n, s) for n, s in datos['timings'].items() if n != 'frame']
+        otras.sort(key=lambda par: -(par[1]['p90_ms'] or 0))
+        for nombre, serie in otras[:limit]:
+            lineas.append(f"{nombre} ×{serie['count']} p50 {serie['p50_ms']:.0f} p90 {serie['p90_ms']:.0f} ms")
+        if datos['errors']:
+            ultimo = datos['errors'][-1]
+            lineas.append(f"⚠ {len(datos['errors'])} errores · {ultimo['where']}: {ultimo['type']}")
+        return lineas
+
+    def export(self, path=None):
+        """
+        Escribe el snapshot JSON
+
+        Args:
+            path (str): Ruta destino (por defecto config.METRICS_EXPORT_NAME
+                en el directorio de datos)
+
+        Returns:
+            str: Ruta escrita
+        """
+        if path is None:
+            from services.paths import data_dir
+            path = os.path.join(data_dir(), config.METRICS_EXPORT_NAME)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._errors.clear()
+
+
+metrics = Metrics(enabled=config.METRICS_ENABLED, window=config.METRICS_WINDOW)
@@ -0,0 +1,244 @@
+"""
+Modelos compactos de datos
+Registros con __slots__ para mensajes, canales, empleados, cuadrillas y
+el perfil del usuario de la sesión. Cada instancia guarda sus valores en
+ranuras fijas en lugar de un dict propio, y los campos con pocos valores
+distintos (usuario, canal, rol, estado...) se internan para que todas
+las instancias compartan la misma cadena.
+
+Los registros se comportan como los dicts de la API (get, [], in, len,
+keys, items, iteración) con los nombres de campo del backend, así que el
+código escrito para esos dicts sigue funcionando sin cambios. Un campo
+que el backend envía como null está presente con valor None; uno que no
+envía está ausente.
+"""
+
+import sys
+
+# Niveles de usuario
+ROLE_ADMIN = sys.intern('admin')
+ROLE_MODERADOR = sys.intern('moderador')
+ROLE_OBRERO = sys.intern('obrero')
+ROLES = (ROLE_ADMIN, ROLE_MODERADOR, ROLE_OBRERO)
+
+
+def intern_value(valor):
+    """Interna las cadenas (cualquier otro valor se devuelve tal cual)"""
+    if type(valor) is str:
+        return sys.intern(valor)
+    return valor
+
+
+# Marca de campo ausente (distinto de un campo presente con valor None)
+_AUSENTE = object()
+
+
+class Record:
+    """
+    Base de los registros
+
+    Las subclases declaran FIELDS (campos del backend, que son también sus
+    __slots__) e INTERNED (los que se internan). Los campos que el backend
+    envíe y el modelo no declare se conservan en extra, que solo ocupa
+    memoria si existen. Los campos declarados que no llegaron dejan su
+    ranura vacía: como atributo valen None, pero para get(), [] e in están
+    ausentes.
+    """
+
+    __slots__ = ('extra',)
+    FIELDS = ()
+    INTERNED = ()
+
+    def __init__(self, **campos):
+        self._cargar(campos)
+
+    @classmethod
+    def from_dict(cls, datos):
+        """
+        Crea el registro a partir de un dict de la API
+
+        Args:
+            datos (dict): Objeto JSON del backend
+
+        Returns:
+            Record: Registro con los mismos datos
+        """
+        registro = cls.__new__(cls)
+        registro._cargar(datos)
+        return registro
+
+    @classmethod
+    def coerce(cls, item):
+        """
+        Registro a partir de un dict o de un registro ya creado
+
+        Returns:
+            Record: Registro, o None si item no es ni una cosa ni otra
+        """
+        if isinstance(item, cls):
+            return item
+        if isinstance(item, dict):
+            return cls.from_dict(item)
+        return None
+
+    @classmethod
+    def parse_list(cls, datos):
+        """Lista de registros a partir de una lista JSON (ignora lo que no sea objeto)"""
+        if not isinstance(datos, list):
+            return []
+        registros = []
+        for item in datos:
+            registro = cls.coerce(item)
+            if registro is not None:
+                registros.append(registro)
+        return registros
+
+    def _cargar(self, datos):
+        internados = self.INTERNED
+        for campo in self.FIELDS:
+            if campo in datos:
+                valor = datos[campo]
+                setattr(self, campo, intern_value(valor) if campo in internados else valor)
+        extra = {clave: valor for clave, valor in datos.items() if clave not in self.FIELDS}
+        self.extra = extra or None
+
+    def __getattr__(self, nombre):
+        # Solo se llama si la ranura está vacía: campo que no llegó
+        if nombre in type(self).FIELDS:
+            return None
+        raise AttributeError(nombre)
+
+    def _valor(self, campo):
+        """Valor de un campo, o _AUSENTE si el backend no lo envió"""
+        if campo in self.FIELDS:
+            try:
+                return object.__getattribute__(self, campo)
+            except AttributeError:
+                return _AUSENTE
+        if self.extra is not None:
+            return self.extra.get(campo, _AUSENTE)
+        return _AUSENTE
+
+    def get(self, campo, default=None):
+        """Valor de un campo como en dict.get (un null del backend es None)"""
+        valor = self._valor(campo)
+        return default if valor is _AUSENTE else valor
+
+    def __getitem__(self, campo):
+        valor = self._valor(campo)
+        if valor is _AUSENTE:
+            raise KeyError(campo)
+        return valor
+
+    def __contains__(self, campo):
+        return self._valor(campo) is not _AUSENTE
+
+    def keys(self):
+        """Campos presentes, en el orden de FIELDS y después los de extra"""
+        claves = [campo for campo in self.FIELDS if self._valor(campo) is not _AUSENTE]
+        if self.extra:
+            claves.extend(self.extra)
+        return claves
+
+    def values(self):
+        return [self._valor(campo) for campo in self.keys()]
+
+    def items(self):
+        return [(campo, self._valor(campo)) for campo in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        # Un registro vacío es falso, como el dict vacío
+        return len(self.keys())
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Objeto JSON equivalente (con los null que envió el backend)
+        """
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Message(Record):
+    """Mensaje de un canal de chat"""
+
+    FIELDS = ('id', 'canal', 'usuario', 'texto', 'timestamp')
+    INTERNED = ('canal', 'usuario')
+    __slots__ = FIELDS
+
+
+class Channel(Record):
+    """Canal de chat cuando el backend lo envía como objeto"""
+
+    FIELDS = ('nombre', 'descripcion')
+    INTERNED = ('nombre',)
+    __slots__ = FIELDS
+
+    def __str__(self):
+        return self.nombre or ''
+
+
+class Employee(Record):
+    """Empleado"""
+
+    FIELDS = ('id', 'nombre', 'apellido', 'cedula', 'cuadrilla_id', 'rol', 'estado')
+    # Nombres y apellidos se repiten mucho en listas grandes
+    INTERNED = ('nombre', 'apellido', 'rol', 'estado')
+    __slots__ = FIELDS
+
+
+class Cuadrilla(Record):
+    """Cuadrilla de trabajo"""
+
+    FIELDS = ('id', 'nombre', 'descripcion', 'estado')
+    INTERNED = ('estado',)
+    __slots__ = FIELDS
+
+
+class UserProfile(Record):
+    """Datos del usuario devueltos por el login (user_data de la sesión)"""
+
+    FIELDS = ('id', 'usuario', 'nombre', 'email', 'nivel', 'rol', 'cuadrilla_id')
+    INTERNED = ('nivel', 'rol')
+    __slots__ = FIELDS
+
+
+def parse_channels(datos):
+    """
+    Canales de la respuesta de GET /canales
+
+    El backend los envía como nombres; se internan y se dejan como
+    cadenas, que ya es su forma más compacta. Los que lleguen como objeto
+    se convierten en Channel.
+
+    Returns:
+        list: Nombres (str) o Channel
+    """
+    if not isinstance(datos, list):
+        return []
+    canales = []
+    for item in datos:
+        if isinstance(item, str):
+            canales.append(sys.intern(item))
+        else:
+            canal = Channel.coerce(item)
+            if canal is not None:
+                canales.append(canal)
+    return canales
+
+
+def channel_name(canal):
+    """Nombre de un canal, sea cadena o Channel"""
+    return canal.nombre if isinstance(canal, Channel) else canal
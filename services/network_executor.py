@@ -0,0 +1,235 @@
+"""
+Ejecutor de red en segundo plano
+Ejecuta el trabajo HTTP fuera del hilo principal de Kivy y entrega
+los resultados a la interfaz a través de Clock
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+
+def despachar_con_clock(callback):
+    """
+    Entrega un callback al hilo principal de Kivy en el próximo frame
+
+    Args:
+        callback (callable): Función sin argumentos a ejecutar en la UI
+    """
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(), 0)
+
+
+class NetworkTask:
+    """Tarea de red en curso que puede cancelarse desde la UI"""
+
+    def __init__(self, tag=None, group=None):
+        self.tag = tag
+        self.group = group
+        self.future = None
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelled(self):
+        """Indica si la tarea fue cancelada o reemplazada"""
+        return self._cancelada.is_set()
+
+    def cancel(self):
+        """
+        Cancela la tarea. Si aún no empezó no llega a ejecutarse; si ya
+        está en vuelo su resultado se descarta y no se entrega a la UI
+        """
+        self._cancelada.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class NetworkExecutor:
+    """
+    Pool de hilos para peticiones HTTP
+
+    Cada tarea puede llevar una etiqueta (tag): al enviar una nueva tarea
+    con la misma etiqueta, la anterior se cancela. Así, pulsar de nuevo un
+    botón reemplaza la petición en vuelo en lugar de acumularlas.
+    """
+
+    def __init__(self, max_workers=2, dispatcher=None):
+        """
+        Args:
+            max_workers (int): Número máximo de peticiones simultáneas
+            dispatcher (callable): Función que ejecuta un callback en el hilo
+                de la UI. Por defecto usa kivy.clock.Clock
+        """
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='red'
+        )
+        self._dispatcher = dispatcher or despachar_con_clock
+        self._tareas = {}
+        self._grupos = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, on_success=None, on_error=None, tag=None,
+               group=None, **kwargs):
+        """
+        Ejecuta func(*args, **kwargs) en segundo plano
+
+        Args:
+            func (callable): Trabajo bloqueante (p. ej. requests.get)
+            on_success (callable): Recibe el resultado en el hilo de la UI
+            on_error (callable): Recibe la excepción en el hilo de la UI
+            tag (str): Etiqueta; una tarea nueva cancela la anterior con la misma
+            group (str): Grupo (p. ej. 'tab:personal') para cancelar en bloque
+                con cancel_group() todo lo que pidió una pestaña
+
+        Returns:
+            NetworkTask: Tarea creada
+        """
+        task = NetworkTask(tag, group)
+        anterior = None
+        with self._lock:
+            if tag is not None:
+                anterior = self._tareas.get(tag)
+                self._tareas[tag] = task
+            if group is not None:
+                self._grupos.setdefault(group, set()).add(task)
+        if anterior is not None:
+            anterior.cancel()
+
+        # Con el lock: resize() no puede cerrar el pool entre leerlo y usarlo
+        with self._lock:
+            task.future = self._pool.submit(
+                self._ejecutar, task, func, args, kwargs, on_success, on_error
+            )
+        return task
+
+    def cancel(self, tag):
+        """
+        Cancela la tarea en curso con la etiqueta indicada
+
+        Returns:
+            bool: True si había una tarea que cancelar
+        """
+        with self._lock:
+            task = self._tareas.pop(tag, None)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def cancel_group(self, group):
+        """
+        Cancela todas las tareas de un grupo (p. ej. al salir de una pestaña)
+
+        Returns:
+            int: Tareas canceladas
+        """
+        with self._lock:
+            tareas = self._grupos.pop(group, set())
+            for task in tareas:
+                if task.tag is not None and self._tareas.get(task.tag) is task:
+                    del self._tareas[task.tag]
+        for task in tareas:
+            task.cancel()
+        return len(tareas)
+
+    def cancel_all(self):
+        """Cancela todas las tareas etiquetadas o agrupadas"""
+        with self._lock:
+            tareas = set(self._tareas.values())
+            for grupo in self._grupos.values():
+                tareas.update(grupo)
+            self._tareas.clear()
+            self._grupos.clear()
+        for task in tareas:
+            task.cancel()
+
+    def is_running(self, tag):
+        """Indica si hay una tarea en vuelo con la etiqueta indicada"""
+        with self._lock:
+            return tag in self._tareas
+
+    def resize(self, max_workers):
+        """
+        Cambia el número de peticiones simultáneas
+
+        Las tareas nuevas van a un pool del tamaño indicado; las ya
+        enviadas terminan en el anterior, que se libera al acabar
+        """
+        with self._lock:
+            if max_workers == self.max_workers:
+                return
+            anterior = self._pool
+            self.max_workers = max_workers
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='red'
+            )
+        anterior.shutdown(wait=False)
+
+    def shutdown(self):
+        """Cancela lo pendiente y libera los hilos sin bloquear la UI"""
+        self.cancel_all()
+        self._pool.shutdown(wait=False)
+
+    def _ejecutar(self, task, func, args, kwargs, on_success, on_error):
+        if task.cancelled:
+            self._olvidar(task)
+            return
+        try:
+            resultado = func(*args, **kwargs)
+        except Exception as e:
+            self._entregar(task, on_error, e)
+        else:
+            self._entregar(task, on_success, resultado)
+
+    def _entregar(self, task, callback, valor):
+        def entregar():
+            # La cancelación se comprueba en el hilo de la UI para que un
+            # resultado reemplazado nunca llegue a pintarse
+            self._olvidar(task)
+            if task.cancelled:
+                return
+            if callback is not None:
+                callback(valor)
+
+        self._dispatcher(entregar)
+
+    def _olvidar(self, task):
+        with self._lock:
+            if task.tag is not None and self._tareas.get(task.tag) is task:
+                del self._tareas[task.tag]
+            if task.group is not None:
+                grupo = self._grupos.get(task.group)
+                if grupo is not None:
+                    grupo.discard(task)
+                    if not grupo:
+                        del self._grupos[task.group]
+
+
+_executor = None
+
+
+def get_network_executor():
+    """
+    Obtiene el ejecutor de red compartido por toda la aplicación
+
+    Returns:
+        NetworkExecutor: Instancia única
+    """
+    global _executor
+    if _executor is None:
+        _executor = NetworkExecutor(max_workers=config.NETWORK_WORKERS)
+    return _executor
+
+
+def peek_network_executor():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        NetworkExecutor: Instancia única o None
+    """
+    return _executor
@@ -0,0 +1,393 @@
+"""
+Bandeja de salida persistente
+Los mensajes se aceptan al instante, se guardan en SQLite y un hilo en
+segundo plano los envía a POST /enviar por lotes, con reintentos y
+claves de idempotencia para que un reenvío no los duplique
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import requests
+
+import config
+from services.api_client import get_api_client
+from services.network_executor import despachar_con_clock
+from services.paths import data_dir
+
+# Estados de un mensaje en la bandeja
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+# Respuestas 4xx que sí merecen reintento
+RETRYABLE_CLIENT_ERRORS = (408, 425, 429)
+
+# Mensajes pendientes de la sesión que no tienen delante, en su canal, uno
+# fallido o uno que aún espera su reintento
+ENVIABLES = (
+    ' FROM outbox o WHERE status = ? AND owner = ?'
+    ' AND NOT EXISTS (SELECT 1 FROM outbox p WHERE p.owner = o.owner AND p.canal = o.canal'
+    ' AND p.seq < o.seq AND (p.status = ? OR (p.status = ? AND p.next_attempt_at > ?)))'
+)
+
+
+class OutboxMessage:
+    """Mensaje guardado en la bandeja"""
+
+    __slots__ = ('key', 'canal', 'payload', 'status', 'attempts', 'created_at', 'last_error')
+
+    def __init__(self, key, canal, payload, status, attempts, created_at, last_error):
+        self.key = key
+        self.canal = canal
+        self.payload = json.loads(payload) if isinstance(payload, str) else payload
+        self.status = status
+        self.attempts = attempts
+        self.created_at = created_at
+        self.last_error = last_error
+
+
+class Outbox:
+    """
+    Cola de envío durable
+
+    Se mantiene el orden por canal: mientras un mensaje espera su
+    reintento o está fallido (hasta retry() o discard()), los siguientes
+    del mismo canal esperan detrás. Cada reintento espera un backoff según
+    los intentos de ese mensaje. Cada mensaje pertenece al usuario que lo
+    escribió y solo se envía mientras esa sesión esté activa.
+    """
+
+    def __init__(self, path=None, client=None, dispatcher=None,
+                 batch_size=None, max_retries=None):
+        """
+        Args:
+            path (str): Archivo SQLite (por defecto en el directorio de datos)
+            client (ApiClient): Cliente HTTP
+            dispatcher (callable): Entrega callbacks al hilo de la UI
+            batch_size (int): Mensajes enviados por ronda
+            max_retries (int): Intentos fallidos antes de marcar como fallido
+        """
+        self.path = path or os.path.join(data_dir(), config.OUTBOX_DB_NAME)
+        self.client = client or get_api_client()
+        self.dispatcher = dispatcher or despachar_con_clock
+        self.batch_size = batch_size or config.OUTBOX_BATCH_SIZE
+        self.max_retries = config.MAX_RETRIES if max_retries is None else max_retries
+        self.headers_provider = None
+        self.owner = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS outbox ('
+                ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' key TEXT UNIQUE NOT NULL,'
+                ' owner TEXT,'
+                ' canal TEXT NOT NULL,'
+                ' payload TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' attempts INTEGER NOT NULL DEFAULT 0,'
+                ' created_at REAL NOT NULL,'
+                ' sent_at REAL,'
+                ' last_error TEXT,'
+                ' next_attempt_at REAL NOT NULL DEFAULT 0)'
+            )
+            columnas = [fila[1] for fila in self._conn.execute('PRAGMA table_info(outbox)')]
+            if 'next_attempt_at' not in columnas:
+                self._conn.execute('ALTER TABLE outbox ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, owner, seq)'
+            )
+            self._conn.commit()
+
+    # --- API para la UI -------------------------------------------------
+
+    def add_listener(self, callback):
+        """
+        Registra un callback(key, canal, status) que se llama en el hilo de
+        la UI cada vez que un mensaje cambia de estado
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def enqueue(self, canal, usuario, texto, key=None, **extra):
+        """
+        Acepta un mensaje para enviar; vuelve de inmediato
+
+        Args:
+            canal (str): Canal de destino
+            usuario (str): Autor
+            texto (str): Contenido
+            key (str): Clave de idempotencia (se genera si no se indica).
+                Encolar dos veces la misma clave no duplica el mensaje
+            **extra: Campos adicionales del cuerpo de /enviar
+
+        Returns:
+            str: Clave de idempotencia del mensaje
+
+        Raises:
+            RuntimeError: Si no hay sesión activa (el mensaje no tendría dueño)
+        """
+        if not self.owner:
+            raise RuntimeError('No hay sesión activa: el mensaje no se guarda')
+        key = key or uuid.uuid4().hex
+        payload = dict(extra, canal=canal, usuario=usuario, texto=texto)
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO outbox (key, owner, canal, payload, status, created_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (key, self.owner, canal, json.dumps(payload, ensure_ascii=False), PENDING, time.time())
+            )
+            self._conn.commit()
+            nuevo = cursor.rowcount > 0
+
+        if nuevo:
+            self._notify(key, canal, PENDING)
+            self._wake.set()
+        return key
+
+    def messages(self, canal=None, statuses=(PENDING, FAILED)):
+        """
+        Mensajes de la bandeja del usuario de la sesión para pintarlos con
+        su estado
+
+        Args:
+            canal (str): Filtrar por canal (opcional)
+            statuses (tuple): Estados a incluir
+
+        Returns:
+            list: OutboxMessage en orden de envío
+        """
+        consulta = (
+            'SELECT key, canal, payload, status, attempts, created_at, last_error FROM outbox'
+            f" WHERE owner = ? AND status IN ({','.join('?' * len(statuses))})"
+        )
+        params = [self.owner, *statuses]
+        if canal is not None:
+            consulta += ' AND canal = ?'
+            params.append(canal)
+        consulta += ' ORDER BY seq'
+        with self._lock:
+            rows = self._conn.execute(consulta, params).fetchall()
+        return [OutboxMessage(*row) for row in rows]
+
+    def retry(self, key):
+        """Vuelve a poner en cola un mensaje fallido"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE outbox SET status = ?, attempts = 0, last_error = NULL, next_attempt_at = 0'
+                ' WHERE key = ? AND owner = ? AND status = ?',
+                (PENDING, key, self.owner, FAILED)
+            )
+            self._conn.commit()
+        self._wake.set()
+
+    def discard(self, key):
+        """Descarta un mensaje fallido, desbloqueando los siguientes de su canal"""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM outbox WHERE key = ? AND owner = ? AND status = ?',
+                (key, self.owner, FAILED)
+            )
+            self._conn.commit()
+        self._wake.set()
+
+    def prune_sent(self, older_than=None):
+        """Elimina los mensajes enviados hace más de older_than segundos"""
+        older_than = config.OUTBOX_KEEP_SENT_SECONDS if older_than is None else older_than
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM outbox WHERE status = ? AND sent_at < ?',
+                (SENT, time.time() - older_than)
+            )
+            self._conn.commit()
+
+    def set_owner(self, owner):
+        """
+        Cambia el usuario de la sesión activa. Solo se envían sus mensajes;
+        los de otros usuarios esperan a su siguiente login
+        """
+        self.owner = owner or None
+        if self.owner:
+            self._wake.set()
+
+    # --- Hilo de envío --------------------------------------------------
+
+    def start(self, headers_provider=None):
+        """
+        Arranca el hilo de envío
+
+        Args:
+            headers_provider (callable): Devuelve los headers de autenticación
+                en el momento de enviar
+        """
+        self.headers_provider = headers_provider
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='outbox', daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def flush(self):
+        """
+        Envía una ronda de mensajes pendientes (bloqueante)
+
+        Returns:
+            tuple: (enviados, fallidos en esta ronda)
+        """
+        if not self.owner:
+            return 0, 0
+
+        enviados = fallidos = 0
+        bloqueados = set()
+        for mensaje in self._enviables(time.time(), self.batch_size):
+            # Orden por canal: no adelantar a un mensaje que acaba de fallar
+            if mensaje.canal in bloqueados:
+                continue
+            if self._send(mensaje):
+                enviados += 1
+            else:
+                bloqueados.add(mensaje.canal)
+                fallidos += 1
+        return enviados, fallidos
+
+    def _enviables(self, ahora, limite):
+        """
+        Mensajes que pueden enviarse ya, en orden de envío
+
+        El límite se aplica después de descartar los que esperan, así que
+        un canal en backoff no ocupa la ronda de los demás
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, canal, payload, status, attempts, created_at, last_error'
+                + ENVIABLES + ' AND next_attempt_at <= ? ORDER BY seq LIMIT ?',
+                (PENDING, self.owner, FAILED, PENDING, ahora, ahora, limite)
+            ).fetchall()
+        return [OutboxMessage(*row) for row in rows]
+
+    def _send(self, mensaje):
+        headers = dict(self.headers_provider() if self.headers_provider else {})
+        headers['Idempotency-Key'] = mensaje.key
+        try:
+            response = self.client.post(
+                '/enviar', json=mensaje.payload, headers=headers, retry=False
+            )
+        except requests.RequestException as e:
+            self._mark_failure(mensaje, str(e), definitivo=False)
+            return False
+
+        if response.ok:
+            with self._lock:
+                self._conn.execute(
+                    'UPDATE outbox SET status = ?, sent_at = ?, last_error = NULL WHERE key = ?',
+                    (SENT, time.time(), mensaje.key)
+                )
+                self._conn.commit()
+            self._notify(mensaje.key, mensaje.canal, SENT)
+            return True
+
+        definitivo = 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_CLIENT_ERRORS
+        self._mark_failure(mensaje, f"HTTP {response.status_code}", definitivo)
+        return False
+
+    def _mark_failure(self, mensaje, error, definitivo):
+        intentos = mensaje.attempts + 1
+        estado = FAILED if definitivo or intentos > self.max_retries else PENDING
+        # Backoff por mensaje según sus intentos, no por ronda
+        siguiente = time.time() + self.client.backoff_delay(intentos - 1)
+        with self._lock:
+            self._conn.execute(
+                'UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?'
+                ' WHERE key = ?',
+                (estado, intentos, error, siguiente, mensaje.key)
+            )
+            self._conn.commit()
+        if estado == FAILED:
+            self._notify(mensaje.key, mensaje.canal, FAILED)
+
+    def _run(self):
+        espera = None
+        while not self._stop.is_set():
+            # Hasta que toque el siguiente reintento, o hasta un aviso
+            # (mensaje nuevo, retry, login)
+            self._wake.wait(espera)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            try:
+                self.flush()
+                espera = self._next_wait()
+            except Exception as e:
+                print(f"❌ Error en bandeja de salida: {e}")
+                espera = config.RETRY_BACKOFF_MAX
+
+    def _next_wait(self):
+        """
+        Segundos hasta que flush() tenga algo que enviar (0 si ya lo tiene),
+        o None si no hay nada pendiente
+        """
+        if not self.owner:
+            return None
+        ahora = time.time()
+        if self._enviables(ahora, 1):
+            return 0.0
+        # Lo siguiente enviable es la cabeza de un canal que espera su
+        # reintento
+        with self._lock:
+            siguiente = self._conn.execute(
+                'SELECT MIN(next_attempt_at)' + ENVIABLES,
+                (PENDING, self.owner, FAILED, PENDING, ahora)
+            ).fetchone()[0]
+        if siguiente is None:
+            return None
+        return max(0.0, siguiente - ahora)
+
+    def _notify(self, key, canal, status):
+        for callback in list(self._listeners):
+            self.dispatcher(lambda callback=callback: callback(key, canal, status))
+
+
+_outbox = None
+
+
+def get_outbox():
+    """
+    Obtiene la bandeja de salida compartida por toda la aplicación
+
+    Returns:
+        Outbox: Instancia única
+    """
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
+
+
+def peek_outbox():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        Outbox: Instancia única o None
+    """
+    return _outbox
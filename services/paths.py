@@ -0,0 +1,33 @@
+"""
+Rutas de almacenamiento local
+"""
+
+import os
+
+
+def data_dir(*parts):
+    """
+    Directorio privado de datos de la app, creado si no existe
+
+    En el dispositivo es App.user_data_dir (almacenamiento interno de la
+    aplicación); fuera de Kivy se usa CORPOTACHIRA_DATA_DIR o ~/.corpotachira
+
+    Args:
+        *parts (str): Subdirectorios opcionales
+
+    Returns:
+        str: Ruta absoluta del directorio
+    """
+    base = os.getenv('CORPOTACHIRA_DATA_DIR')
+    if not base:
+        try:
+            from kivy.app import App
+            app = App.get_running_app()
+            base = app.user_data_dir if app else None
+        except ImportError:
+            base = None
+    base = base or os.path.join(os.path.expanduser('~'), '.corpotachira')
+
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,195 @@
+"""
+Repositorio de personal
+Carga empleados y cuadrillas en el almacén en memoria y aplica cada
+alta, edición o baja sobre él sin volver a descargar la lista
+"""
+
+from urllib.parse import quote
+
+from services.api_client import get_api_client
+from services.local_cache import StaleWhileRevalidate, get_local_cache
+from services.network_executor import get_network_executor
+from services.personnel_store import PersonnelStore, item_id
+
+EMPLEADOS_PATH = '/api/personnel/empleados'
+CUADRILLAS_PATH = '/api/personnel/cuadrillas'
+
+
+def _lista(datos, clave):
+    """Lista de la respuesta, venga sola o dentro de {clave: [...]}"""
+    if isinstance(datos, dict):
+        datos = datos.get(clave, [])
+    return datos if isinstance(datos, list) else []
+
+
+def _elemento(datos, clave):
+    """Elemento de la respuesta, venga solo o dentro de {clave: {...}}"""
+    if isinstance(datos, dict) and isinstance(datos.get(clave), dict):
+        return datos[clave]
+    return datos if isinstance(datos, dict) else None
+
+
+class PersonnelRepository:
+    """Acceso a empleados y cuadrillas con actualizaciones en el sitio"""
+
+    def __init__(self, client=None, cache=None, executor=None, store=None):
+        self.client = client or get_api_client()
+        self.cache = cache or get_local_cache()
+        self.executor = executor or get_network_executor()
+        self.store = store or PersonnelStore()
+        self._swr = StaleWhileRevalidate(self.client, self.cache, self.executor)
+
+    def load(self, on_done=None, on_error=None, headers=None, group='tab:personal'):
+        """
+        Carga empleados y cuadrillas (desde la caché y revalidando)
+
+        Args:
+            on_done (callable): on_done(store) cada vez que llegan datos
+            on_error (callable): Recibe la excepción si falla la red
+            headers (dict): Headers de autenticación
+        """
+        def on_empleados(datos, from_cache):
+            self.store.load_employees(_lista(datos, 'empleados'))
+            if on_done:
+                on_done(self.store)
+
+        def on_cuadrillas(datos, from_cache):
+            self.store.load_cuadrillas(_lista(datos, 'cuadrillas'))
+            if on_done:
+                on_done(self.store)
+
+        self._swr.load(
+            CUADRILLAS_PATH, on_cuadrillas, headers=headers, on_error=on_error,
+            tag='cuadrillas', group=group
+        )
+        return self._swr.load(
+            EMPLEADOS_PATH, on_empleados, headers=headers, on_error=on_error,
+            tag='empleados', group=group
+        )
+
+    # Las escrituras no llevan grupo: salir de la pestaña no debe impedir
+    # que su resultado llegue al almacén
+
+    def create_employee(self, datos, on_done=None, on_error=None, headers=None):
+        """POST /api/personnel/empleados y alta en el almacén"""
+        return self._escribir(
+            'POST', EMPLEADOS_PATH, datos, headers, on_error,
+            lambda respuesta: self._guardar_empleado(_elemento(respuesta, 'empleado'), datos, on_done)
+        )
+
+    def update_employee(self, emp_id, cambios, on_done=None, on_error=None, headers=None):
+        """PUT /api/personnel/empleados/{id} y actualización en el almacén"""
+        def aplicar(respuesta):
+            actual = self.store.get(emp_id)
+            base = actual.to_dict() if actual is not None else {'id': emp_id}
+            base.update(cambios)
+            self._guardar_empleado(_elemento(respuesta, 'empleado'), base, on_done)
+
+        return self._escribir(
+            'PUT', f"{EMPLEADOS_PATH}/{quote(str(emp_id), safe='')}", cambios,
+            headers, on_error, aplicar
+        )
+
+    def delete_employee(self, emp_id, on_done=None, on_error=None, headers=None):
+        """DELETE /api/personnel/empleados/{id} y baja en el almacén"""
+        def aplicar(respuesta):
+            empleado = self.store.remove_employee(emp_id)
+            if on_done:
+                on_done(empleado)
+
+        return self._escribir(
+            'DELETE', f"{EMPLEADOS_PATH}/{quote(str(emp_id), safe='')}", None,
+            headers, on_error, aplicar
+        )
+
+    def create_cuadrilla(self, datos, on_done=None, on_error=None, headers=None):
+        """POST /api/personnel/cuadrillas y alta en el almacén"""
+        return self._escribir(
+            'POST', CUADRILLAS_PATH, datos, headers, on_error,
+            lambda respuesta: self._guardar_cuadrilla(_elemento(respuesta, 'cuadrilla'), datos, on_done)
+        )
+
+    def update_cuadrilla(self, cuadrilla_id, cambios, on_done=None, on_error=None, headers=None):
+        """PUT /api/personnel/cuadrillas/{id} y actualización en el almacén"""
+        def aplicar(respuesta):
+            actual = self.store.get_cuadrilla(cuadrilla_id)
+            base = actual.to_dict() if actual is not None else {'id': cuadrilla_id}
+            base.update(cambios)
+            self._guardar_cuadrilla(_elemento(respuesta, 'cuadrilla'), base, on_done)
+
+        return self._escribir(
+            'PUT', f"{CUADRILLAS_PATH}/{quote(str(cuadrilla_id), safe='')}", cambios,
+            headers, on_error, aplicar
+        )
+
+    def delete_cuadrilla(self, cuadrilla_id, on_done=None, on_error=None, headers=None):
+        """DELETE /api/personnel/cuadrillas/{id} y baja en el almacén"""
+        def aplicar(respuesta):
+            cuadrilla = self.store.remove_cuadrilla(cuadrilla_id)
+            if on_done:
+                on_done(cuadrilla)
+
+        return self._escribir(
+            'DELETE', f"{CUADRILLAS_PATH}/{quote(str(cuadrilla_id), safe='')}", None,
+            headers, on_error, aplicar
+        )
+
+    def _escribir(self, method, path, datos, headers, on_error, on_success):
+        return self.executor.submit(
+            self._enviar, method, path, datos, headers,
+            on_success=on_success, on_error=on_error
+        )
+
+    def _enviar(self, method, path, datos, headers):
+        """Envía la escritura (en segundo plano) y devuelve el JSON de respuesta"""
+        response = self.client.request(method, path, json=datos, headers=headers)
+        response.raise_for_status()
+        # La lista guardada en disco ya no coincide; el almacén en memoria sí
+        coleccion = EMPLEADOS_PATH if path.startswith(EMPLEADOS_PATH) else CUADRILLAS_PATH
+        self.cache.invalidate(coleccion)
+        if not response.content:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def _guardar_empleado(self, respuesta, enviado, on_done):
+        # Si el backend no devuelve el empleado completo se usa lo enviado; sin
+        # id no puede indexarse y aparecerá en la próxima revalidación
+        empleado = respuesta if respuesta and item_id(respuesta) else enviado
+        empleado = self.store.upsert_employee(empleado) or empleado
+        if on_done:
+            on_done(empleado)
+
+    def _guardar_cuadrilla(self, respuesta, enviado, on_done):
+        cuadrilla = respuesta if respuesta and item_id(respuesta) else enviado
+        cuadrilla = self.store.upsert_cuadrilla(cuadrilla) or cuadrilla
+        if on_done:
+            on_done(cuadrilla)
+
+
+_repository = None
+
+
+def get_personnel_repository():
+    """
+    Obtiene el repositorio de personal compartido por toda la aplicación
+
+    Returns:
+        PersonnelRepository: Instancia única
+    """
+    global _repository
+    if _repository is None:
+        _repository = PersonnelRepository()
+    return _repository
+
+
+def peek_personnel_repository():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        PersonnelRepository: Instancia única o None
+    """
+    return _repository
@@ -0,0 +1,302 @@
+"""
+Almacén de personal en memoria
+Empleados y cuadrillas indexados por id, por cuadrilla y por prefijo de
+nombre normalizado, para buscar y filtrar sin tocar la red
+"""
+
+import unicodedata
+from bisect import bisect_left, insort
+
+from services.models import Cuadrilla, Employee
+
+# Campos del backend, en orden de preferencia
+ID_FIELDS = ('id', '_id')
+CUADRILLA_FIELDS = ('cuadrilla_id', 'cuadrilla')
+NAME_FIELDS = ('nombre', 'apellido')
+EXTRA_SEARCH_FIELDS = ('cedula',)
+
+
+def normalize_name(texto):
+    """
+    Normaliza un texto para buscar: minúsculas, sin acentos y con los
+    espacios colapsados
+
+    Args:
+        texto (str): Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    descompuesto = unicodedata.normalize('NFKD', str(texto or ''))
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.lower().split())
+
+
+def _primer_campo(item, campos):
+    for campo in campos:
+        valor = item.get(campo)
+        if valor is not None and valor != '':
+            return valor
+    return None
+
+
+def item_id(item):
+    """Id de un empleado o cuadrilla como texto (None si no tiene)"""
+    valor = _primer_campo(item, ID_FIELDS)
+    return str(valor) if valor is not None else None
+
+
+def employee_cuadrilla(empleado):
+    """Id de la cuadrilla de un empleado como texto (None si no tiene)"""
+    valor = _primer_campo(empleado, CUADRILLA_FIELDS)
+    if isinstance(valor, dict):
+        valor = item_id(valor)
+    return str(valor) if valor is not None else None
+
+
+def employee_name(empleado):
+    """Nombre completo de un empleado"""
+    partes = [str(empleado[campo]) for campo in NAME_FIELDS if empleado.get(campo)]
+    return ' '.join(partes)
+
+
+class PersonnelStore:
+    """
+    Índices en memoria del personal
+
+    Se modifica desde el hilo de la UI (los resultados de red llegan ahí),
+    así que no usa bloqueos. Guarda Employee y Cuadrilla (acepta también
+    los dicts de la API). Los listeners reciben (evento, item) con
+    evento en 'reset', 'empleado', 'empleado_eliminado', 'cuadrilla' y
+    'cuadrilla_eliminada', para actualizar solo la tarjeta afectada.
+    """
+
+    def __init__(self):
+        self._empleados = {}  # id -> empleado
+        self._cuadrillas = {}  # id -> cuadrilla
+        self._por_cuadrilla = {}  # id de cuadrilla -> set de ids de empleado
+        self._indice = []  # (token normalizado, id) ordenado, para búsqueda por prefijo
+        self._tokens = {}  # id -> tokens indexados del empleado
+        self._orden = {}  # id -> clave de orden alfabético
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Registra un callback(evento, item)"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notificar(self, evento, item=None):
+        for callback in list(self._listeners):
+            callback(evento, item)
+
+    def __len__(self):
+        return len(self._empleados)
+
+    @property
+    def loaded(self):
+        """Indica si ya se cargó alguna lista de empleados"""
+        return bool(self._empleados) or bool(self._cuadrillas)
+
+    # Empleados
+
+    def get(self, emp_id):
+        return self._empleados.get(str(emp_id))
+
+    def employees(self):
+        """Todos los empleados en orden alfabético"""
+        return [self._empleados[i] for i in sorted(self._empleados, key=self._orden.get)]
+
+    def by_cuadrilla(self, cuadrilla_id):
+        """Empleados de una cuadrilla en orden alfabético"""
+        ids = self._por_cuadrilla.get(str(cuadrilla_id), ())
+        return [self._empleados[i] for i in sorted(ids, key=self._orden.get)]
+
+    def search(self, texto='', cuadrilla_id=None, limit=None):
+        """
+        Búsqueda mientras se escribe
+
+        Cada palabra de la consulta debe ser prefijo de alguna palabra del
+        nombre (o de la cédula) del empleado; no distingue acentos ni
+        mayúsculas
+
+        Args:
+            texto (str): Consulta, p. ej. 'jo pe' encuentra a 'José Pérez'
+            cuadrilla_id: Limitar a una cuadrilla (opcional)
+            limit (int): Número máximo de resultados
+
+        Returns:
+            list: Empleados en orden alfabético
+        """
+        candidatos = None
+        if cuadrilla_id is not None:
+            candidatos = set(self._por_cuadrilla.get(str(cuadrilla_id), ()))
+
+        for token in normalize_name(texto).split():
+            ids = self._ids_con_prefijo(token)
+            candidatos = ids if candidatos is None else candidatos & ids
+            if not candidatos:
+                return []
+
+        if candidatos is None:
+            candidatos = self._empleados.keys()
+        ordenados = sorted(candidatos, key=self._orden.get)
+        if limit is not None:
+            ordenados = ordenados[:limit]
+        return [self._empleados[i] for i in ordenados]
+
+    def _ids_con_prefijo(self, prefijo):
+        ids = set()
+        indice = self._indice
+        pos = bisect_left(indice, (prefijo, ''))
+        while pos < len(indice) and indice[pos][0].startswith(prefijo):
+            ids.add(indice[pos][1])
+            pos += 1
+        return ids
+
+    def load_employees(self, empleados):
+        """
+        Reemplaza la lista de empleados
+
+        Si ya había datos solo se notifican las diferencias, de modo que
+        la revalidación en segundo plano no reconstruye toda la lista
+
+        Args:
+            empleados (list): Empleados recibidos del backend
+        """
+        nuevos = {}
+        for empleado in empleados:
+            empleado = Employee.coerce(empleado)
+            if empleado is None:
+                continue
+            emp_id = item_id(empleado)
+            if emp_id is not None:
+                nuevos[emp_id] = empleado
+
+        if not self._empleados:
+            for emp_id, empleado in nuevos.items():
+                self._indexar(emp_id, empleado)
+            self._notificar('reset')
+            return
+
+        for emp_id in [i for i in self._empleados if i not in nuevos]:
+            self.remove_employee(emp_id)
+        for emp_id, empleado in nuevos.items():
+            if self._empleados.get(emp_id) != empleado:
+                self.upsert_employee(empleado)
+
+    def upsert_employee(self, empleado):
+        """
+        Agrega o actualiza un empleado en todos los índices
+
+        Args:
+            empleado (dict | Employee): Datos del empleado
+
+        Returns:
+            Employee: Empleado almacenado o None si no tiene id
+        """
+        empleado = Employee.coerce(empleado)
+        emp_id = item_id(empleado) if empleado is not None else None
+        if emp_id is None:
+            return None
+        if emp_id in self._empleados:
+            self._desindexar(emp_id)
+        self._indexar(emp_id, empleado)
+        self._notificar('empleado', empleado)
+        return empleado
+
+    def remove_employee(self, emp_id):
+        """
+        Returns:
+            Employee: Empleado eliminado o None si no existía
+        """
+        emp_id = str(emp_id)
+        if emp_id not in self._empleados:
+            return None
+        empleado = self._empleados[emp_id]
+        self._desindexar(emp_id)
+        self._notificar('empleado_eliminado', empleado)
+        return empleado
+
+    def _indexar(self, emp_id, empleado):
+        self._empleados[emp_id] = empleado
+        cuadrilla = employee_cuadrilla(empleado)
+        if cuadrilla is not None:
+            self._por_cuadrilla.setdefault(cuadrilla, set()).add(emp_id)
+
+        nombre = normalize_name(employee_name(empleado))
+        tokens = set(nombre.split())
+        for campo in EXTRA_SEARCH_FIELDS:
+            if empleado.get(campo):
+                tokens.add(normalize_name(empleado[campo]))
+        for token in tokens:
+            insort(self._indice, (token, emp_id))
+        self._tokens[emp_id] = tokens
+        self._orden[emp_id] = (nombre, emp_id)
+
+    def _desindexar(self, emp_id):
+        empleado = self._empleados.pop(emp_id)
+        cuadrilla = employee_cuadrilla(empleado)
+        miembros = self._por_cuadrilla.get(cuadrilla)
+        if miembros is not None:
+            miembros.discard(emp_id)
+            if not miembros:
+                del self._por_cuadrilla[cuadrilla]
+
+        for token in self._tokens.pop(emp_id, ()):
+            pos = bisect_left(self._indice, (token, emp_id))
+            if pos < len(self._indice) and self._indice[pos] == (token, emp_id):
+                del self._indice[pos]
+        self._orden.pop(emp_id, None)
+
+    # Cuadrillas
+
+    def get_cuadrilla(self, cuadrilla_id):
+        return self._cuadrillas.get(str(cuadrilla_id))
+
+    def cuadrillas(self):
+        return list(self._cuadrillas.values())
+
+    def load_cuadrillas(self, cuadrillas):
+        """Reemplaza la lista de cuadrillas notificando solo las diferencias"""
+        nuevas = {}
+        for cuadrilla in cuadrillas:
+            cuadrilla = Cuadrilla.coerce(cuadrilla)
+            if cuadrilla is None:
+                continue
+            cuadrilla_id = item_id(cuadrilla)
+            if cuadrilla_id is not None:
+                nuevas[cuadrilla_id] = cuadrilla
+
+        for cuadrilla_id in [i for i in self._cuadrillas if i not in nuevas]:
+            self.remove_cuadrilla(cuadrilla_id)
+        for cuadrilla in nuevas.values():
+            if self._cuadrillas.get(item_id(cuadrilla)) != cuadrilla:
+                self.upsert_cuadrilla(cuadrilla)
+
+    def upsert_cuadrilla(self, cuadrilla):
+        cuadrilla = Cuadrilla.coerce(cuadrilla)
+        cuadrilla_id = item_id(cuadrilla) if cuadrilla is not None else None
+        if cuadrilla_id is None:
+            return None
+        self._cuadrillas[cuadrilla_id] = cuadrilla
+        self._notificar('cuadrilla', cuadrilla)
+        return cuadrilla
+
+    def remove_cuadrilla(self, cuadrilla_id):
+        cuadrilla = self._cuadrillas.pop(str(cuadrilla_id), None)
+        if cuadrilla is not None:
+            self._notificar('cuadrilla_eliminada', cuadrilla)
+        return cuadrilla
+
+    def clear(self):
+        """Vacía el almacén (p. ej. al cerrar sesión)"""
+        self._empleados.clear()
+        self._cuadrillas.clear()
+        self._por_cuadrilla.clear()
+        self._indice = []
+        self._tokens.clear()
+        self._orden.clear()
+        self._notificar('reset')
@@ -0,0 +1,605 @@
+"""
+Repositorio de reportes
+Descarga los reportes por páginas y los decodifica en streaming, guarda
+las filas en SQLite y calcula los agregados en el dispositivo, de modo
+que cambiar los filtros no vuelve a pedir nada al servidor
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import config
+from services.api_client import get_api_client
+from services.network_executor import despachar_con_clock, get_network_executor
+from services.paths import data_dir
+from services.wire_format import array_stream, decode_body, starts_array
+
+REPORTS = ('general', 'cuadrillas', 'actividad')
+
+# Campos por los que se cuentan las filas de cada reporte
+REPORT_GROUP_FIELDS = {
+    'general': ('estado',),
+    'cuadrillas': ('cuadrilla', 'estado'),
+    'actividad': ('cuadrilla', 'usuario', 'tipo'),
+}
+
+# Campos en los que se busca la fecha de una fila (se usan los 10 primeros caracteres)
+DATE_FIELDS = ('fecha', 'timestamp', 'created_at')
+
+
+def report_path(nombre):
+    """Ruta del endpoint de un reporte"""
+    return f"/api/reports/{nombre}"
+
+
+def row_date(row):
+    """
+    Fecha (YYYY-MM-DD) de una fila del reporte
+
+    Returns:
+        str: Fecha o None si la fila no tiene ninguna
+    """
+    if not isinstance(row, dict):
+        return None
+    for campo in DATE_FIELDS:
+        valor = row.get(campo)
+        if isinstance(valor, str) and len(valor) >= 10:
+            return valor[:10]
+    return None
+
+
+def row_identity(row):
+    """Id de una fila (o la fila entera si no tiene) para detectar páginas repetidas"""
+    if isinstance(row, dict) and row.get('id') is not None:
+        return row['id']
+    return row
+
+
+def page_rows(response, chunk_size):
+    """
+    Filas de una página del reporte
+
+    Un array se decodifica en streaming a medida que llegan los bytes. Un
+    objeto (p. ej. el resumen de /api/reports/general) no se puede
+    recorrer por elementos: se decodifica entero y cuenta como una fila.
+
+    Args:
+        response: Respuesta pedida con stream=True
+        chunk_size (int): Bytes por fragmento
+
+    Returns:
+        tuple: (True si es un array, iterable de filas)
+
+    Raises:
+        ValueError: Si el cuerpo no es JSON ni MessagePack válido
+    """
+    fragmentos = response.iter_content(chunk_size)
+    cabeza = b''
+    for fragmento in fragmentos:
+        cabeza += fragmento
+        if cabeza.strip():
+            break
+    if not starts_array(cabeza):
+        datos = decode_body(cabeza + b''.join(fragmentos))
+        return False, datos if isinstance(datos, list) else [datos]
+
+    stream = array_stream(response)
+
+    def filas():
+        for fragmento in itertools.chain((cabeza,), fragmentos):
+            yield from stream.feed(fragmento)
+        yield from stream.close()
+
+    return True, filas()
+
+
+def matches_filters(row, filtros):
+    """Indica si una fila cumple todos los filtros campo -> valor"""
+    if not filtros:
+        return True
+    if not isinstance(row, dict):
+        return False
+    return all(str(row.get(campo)) == str(valor) for campo, valor in filtros.items())
+
+
+def filters_key(filtros):
+    """Clave estable de un conjunto de filtros"""
+    return json.dumps(sorted((filtros or {}).items()), ensure_ascii=False)
+
+
+class ReportAggregate:
+    """Agregados calculados fila a fila, sin guardar las filas"""
+
+    def __init__(self, group_fields=()):
+        self.group_fields = tuple(group_fields)
+        self.total = 0
+        self.por_dia = {}
+        self.grupos = {campo: {} for campo in self.group_fields}
+        self.sumas = {}
+
+    def add(self, row):
+        self.total += 1
+        fecha = row_date(row)
+        if fecha is not None:
+            self.por_dia[fecha] = self.por_dia.get(fecha, 0) + 1
+        if not isinstance(row, dict):
+            return
+        for campo in self.group_fields:
+            valor = row.get(campo)
+            if valor is not None:
+                conteo = self.grupos[campo]
+                conteo[str(valor)] = conteo.get(str(valor), 0) + 1
+        for campo, valor in row.items():
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                self.sumas[campo] = self.sumas.get(campo, 0) + valor
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: total, por_dia, por_<campo> y sumas de los campos numéricos
+        """
+        datos = {
+            'total': self.total,
+            'por_dia': dict(sorted(self.por_dia.items())),
+            'sumas': dict(self.sumas),
+        }
+        for campo, conteo in self.grupos.items():
+            datos[f"por_{campo}"] = dict(sorted(conteo.items(), key=lambda par: -par[1]))
+        return datos
+
+
+class ReportStore:
+    """Filas y agregados de reportes en SQLite, seguro entre hilos"""
+
+    def __init__(self, path=None, max_ranges=None):
+        """
+        Args:
+            path (str): Archivo SQLite (por defecto en el directorio de datos)
+            max_ranges (int): Rangos descargados que se conservan como máximo
+        """
+        self.path = path or os.path.join(data_dir(), config.REPORTS_DB_NAME)
+        self.max_ranges = max_ranges or config.REPORT_MAX_RANGES
+        self._lock = threading.Lock()
+        # Descarga vigente de cada rango: las filas de una anterior
+        # (cancelada y aún en curso) se descartan
+        self._generaciones = {}
+        self._contador = itertools.count(1)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS report_ranges ('
+                ' report TEXT NOT NULL, desde TEXT NOT NULL, hasta TEXT NOT NULL,'
+                ' complete INTEGER NOT NULL DEFAULT 0,'
+                ' fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (report, desde, hasta))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS report_rows ('
+                ' report TEXT NOT NULL, desde TEXT NOT NULL, hasta TEXT NOT NULL,'
+                ' seq INTEGER NOT NULL, fecha TEXT, data TEXT NOT NULL,'
+                ' PRIMARY KEY (report, desde, hasta, seq))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS report_aggregates ('
+                ' report TEXT NOT NULL, desde TEXT NOT NULL, hasta TEXT NOT NULL,'
+                ' filtros TEXT NOT NULL, data TEXT NOT NULL,'
+                ' PRIMARY KEY (report, desde, hasta, filtros))'
+            )
+            self._conn.commit()
+
+    def begin_range(self, report, desde, hasta):
+        """
+        Descarta lo guardado de un rango antes de volver a descargarlo
+
+        Returns:
+            int: Generación de la descarga, para add_rows() y complete_range()
+        """
+        with self._lock:
+            self._borrar_rango(report, desde, hasta)
+            self._conn.execute(
+                'INSERT INTO report_ranges (report, desde, hasta, complete, fetched_at)'
+                ' VALUES (?, ?, ?, 0, ?)',
+                (report, desde, hasta, time.time())
+            )
+            self._conn.commit()
+            generacion = next(self._contador)
+            self._generaciones[(report, desde, hasta)] = generacion
+        return generacion
+
+    def add_rows(self, report, desde, hasta, start_seq, rows, generation=None):
+        """
+        Guarda un lote de filas a partir del índice start_seq
+
+        Args:
+            generation (int): La de begin_range(); si el rango se volvió a
+                empezar (o se borró) desde entonces el lote se descarta
+
+        Returns:
+            bool: Si se guardó
+        """
+        with self._lock:
+            if generation is not None and self._generaciones.get((report, desde, hasta)) != generation:
+                return False
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO report_rows (report, desde, hasta, seq, fecha, data)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (report, desde, hasta, start_seq + i, row_date(row),
+                     json.dumps(row, ensure_ascii=False))
+                    for i, row in enumerate(rows)
+                ]
+            )
+            self._conn.commit()
+        return True
+
+    def complete_range(self, report, desde, hasta, generation=None):
+        """Marca un rango como descargado entero y aplica el límite de rangos"""
+        with self._lock:
+            if generation is not None and self._generaciones.get((report, desde, hasta)) != generation:
+                return
+            self._conn.execute(
+                'UPDATE report_ranges SET complete = 1, fetched_at = ?'
+                ' WHERE report = ? AND desde = ? AND hasta = ?',
+                (time.time(), report, desde, hasta)
+            )
+            sobrantes = self._conn.execute(
+                'SELECT report, desde, hasta FROM report_ranges'
+                ' ORDER BY fetched_at DESC LIMIT -1 OFFSET ?',
+                (self.max_ranges,)
+            ).fetchall()
+            for rango in sobrantes:
+                self._borrar_rango(*rango)
+            self._conn.commit()
+
+    def covering_range(self, report, desde, hasta, max_age=None):
+        """
+        Busca un rango completo que contenga al pedido ('' = sin límite)
+
+        Args:
+            max_age (float): Antigüedad máxima en segundos; None acepta cualquiera
+
+        Returns:
+            tuple: (desde, hasta) guardados, prefiriendo el exacto, o None
+        """
+        limite = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            fila = self._conn.execute(
+                'SELECT desde, hasta FROM report_ranges'
+                ' WHERE report = ? AND complete = 1 AND fetched_at >= ?'
+                " AND (desde = '' OR (? != '' AND desde <= ?))"
+                " AND (hasta = '' OR (? != '' AND hasta >= ?))"
+                ' ORDER BY (desde = ? AND hasta = ?) DESC, fetched_at DESC LIMIT 1',
+                (report, limite, desde, desde, hasta, hasta, desde, hasta)
+            ).fetchone()
+        return tuple(fila) if fila else None
+
+    def iter_rows(self, report, rango, desde=None, hasta=None, page_size=500):
+        """
+        Recorre las filas guardadas de un rango, por páginas
+
+        Args:
+            report (str): Nombre del reporte
+            rango (tuple): (desde, hasta) del rango guardado
+            desde (str): Fecha mínima de las filas (si el rango pedido es menor)
+            hasta (str): Fecha máxima de las filas
+
+        Yields:
+            Filas decodificadas en el orden en que llegaron
+        """
+        condiciones = ''
+        extra = ()
+        if desde:
+            condiciones += ' AND fecha >= ?'
+            extra += (desde,)
+        if hasta:
+            condiciones += ' AND fecha <= ?'
+            extra += (hasta,)
+
+        ultimo = -1
+        while True:
+            with self._lock:
+                filas = self._conn.execute(
+                    'SELECT seq, data FROM report_rows'
+                    ' WHERE report = ? AND desde = ? AND hasta = ? AND seq > ?'
+                    + condiciones + ' ORDER BY seq LIMIT ?',
+                    (report, rango[0], rango[1], ultimo) + extra + (page_size,)
+                ).fetchall()
+            if not filas:
+                return
+            for seq, data in filas:
+                yield json.loads(data)
+            ultimo = filas[-1][0]
+
+    def get_aggregate(self, report, desde, hasta, filtros):
+        with self._lock:
+            fila = self._conn.execute(
+                'SELECT data FROM report_aggregates'
+                ' WHERE report = ? AND desde = ? AND hasta = ? AND filtros = ?',
+                (report, desde, hasta, filters_key(filtros))
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def put_aggregate(self, report, desde, hasta, filtros, datos):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO report_aggregates (report, desde, hasta, filtros, data)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (report, desde, hasta, filters_key(filtros), json.dumps(datos, ensure_ascii=False))
+            )
+            self._conn.commit()
+
+    def clear(self, report=None):
+        """Borra todo lo guardado (de un reporte o de todos)"""
+        with self._lock:
+            for tabla in ('report_ranges', 'report_rows', 'report_aggregates'):
+                if report is None:
+                    self._conn.execute(f'DELETE FROM {tabla}')
+                else:
+                    self._conn.execute(f'DELETE FROM {tabla} WHERE report = ?', (report,))
+            self._conn.commit()
+            # Las descargas en curso ya no guardan nada
+            for clave in [clave for clave in self._generaciones if report in (None, clave[0])]:
+                del self._generaciones[clave]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _borrar_rango(self, report, desde, hasta):
+        self._generaciones.pop((report, desde, hasta), None)
+        for tabla in ('report_ranges', 'report_rows'):
+            self._conn.execute(
+                f'DELETE FROM {tabla} WHERE report = ? AND desde = ? AND hasta = ?',
+                (report, desde, hasta)
+            )
+        # Solo los agregados del rango y de los contenidos en él, que se
+        # calcularon con estas filas; los de otros rangos siguen valiendo
+        self._conn.execute(
+            'DELETE FROM report_aggregates WHERE report = ?'
+            " AND (? = '' OR (desde != '' AND desde >= ?))"
+            " AND (? = '' OR (hasta != '' AND hasta <= ?))",
+            (report, desde, desde, hasta, hasta)
+        )
+
+
+class ReportRepository:
+    """
+    Carga de reportes con agregación local
+
+    La primera vez un rango se descarga por páginas: cada página se
+    decodifica en streaming y sus filas se entregan a la UI por lotes
+    mientras llegan. Después, cualquier filtro o subrango dentro de lo
+    descargado se agrega en el dispositivo sin tocar la red.
+    """
+
+    def __init__(self, client=None, store=None, executor=None, dispatcher=None):
+        self.client = client or get_api_client()
+        self.store = store or ReportStore()
+        self.executor = executor or get_network_executor()
+        self.dispatcher = dispatcher or despachar_con_clock
+
+    def load(self, nombre, on_done=None, on_rows=None, on_error=None, desde=None,
+             hasta=None, filtros=None, headers=None, refresh=False, group='tab:reportes'):
+        """
+        Carga un reporte en segundo plano
+
+        Args:
+            nombre (str): 'general', 'cuadrillas' o 'actividad'
+            on_done (callable): on_done(agregados) en el hilo de la UI
+            on_rows (callable): on_rows(filas) por lotes en el hilo de la UI,
+                para pintar la tabla a medida que llegan
+            on_error (callable): Recibe la excepción si falla la red
+            desde (str): Fecha inicial YYYY-MM-DD (opcional)
+            hasta (str): Fecha final YYYY-MM-DD (opcional)
+            filtros (dict): Campo -> valor que deben cumplir las filas
+            headers (dict): Headers de autenticación
+            refresh (bool): Ignorar lo guardado y volver a descargar
+            group (str): Grupo del ejecutor para cancelarla al cambiar de pestaña
+
+        Returns:
+            NetworkTask: Carga en curso; una nueva carga del mismo reporte la reemplaza
+        """
+        estado = {}
+
+        def cancelada():
+            task = estado.get('task')
+            return task is not None and task.cancelled
+
+        task = self.executor.submit(
+            self._cargar, nombre, desde or '', hasta or '', filtros or {}, headers,
+            refresh, on_rows, cancelada,
+            on_success=on_done, on_error=on_error,
+            tag=f"reporte:{nombre}", group=group
+        )
+        estado['task'] = task
+        return task
+
+    def rows(self, nombre, desde=None, hasta=None, filtros=None):
+        """
+        Filas ya descargadas de un rango, leídas por páginas desde SQLite
+
+        Yields:
+            Filas que cumplen los filtros (vacío si el rango no está descargado)
+        """
+        rango = self.store.covering_range(nombre, desde or '', hasta or '')
+        if rango is None:
+            return
+        for row in self._filas_guardadas(nombre, rango, desde or '', hasta or ''):
+            if matches_filters(row, filtros):
+                yield row
+
+    def invalidate(self, nombre=None):
+        """Olvida lo descargado para forzar una nueva descarga"""
+        self.store.clear(nombre)
+
+    def _cargar(self, nombre, desde, hasta, filtros, headers, refresh, on_rows, cancelada):
+        if not refresh:
+            rango = self.store.covering_range(nombre, desde, hasta, config.REPORT_CACHE_SECONDS)
+            if rango is not None:
+                datos = None if on_rows else self.store.get_aggregate(nombre, desde, hasta, filtros)
+                if datos is None:
+                    datos = self._agregar(
+                        nombre, self._filas_guardadas(nombre, rango, desde, hasta),
+                        desde, hasta, filtros, on_rows, cancelada
+                    )
+                return datos
+
+        generacion = self.store.begin_range(nombre, desde, hasta)
+        filas = self._descargar(nombre, desde, hasta, headers, cancelada, generacion)
+        try:
+            datos = self._agregar(nombre, filas, desde, hasta, filtros, on_rows, cancelada)
+        finally:
+            # Cierra la respuesta en curso si la carga se canceló a mitad
+            filas.close()
+        if not cancelada():
+            self.store.complete_range(nombre, desde, hasta, generacion)
+            self.store.put_aggregate(nombre, desde, hasta, filtros, datos)
+        return datos
+
+    def _filas_guardadas(self, nombre, rango, desde, hasta):
+        # Si el rango guardado es mayor que el pedido se filtra por fecha
+        return self.store.iter_rows(
+            nombre, rango,
+            desde=desde if desde != rango[0] else None,
+            hasta=hasta if hasta != rango[1] else None
+        )
+
+    def _agregar(self, nombre, filas, desde, hasta, filtros, on_rows, cancelada):
+        agregado = ReportAggregate(REPORT_GROUP_FIELDS.get(nombre, ()))
+        lote = []
+        for row in filas:
+            if cancelada():
+                break
+            if not matches_filters(row, filtros):
+                continue
+            agregado.add(row)
+            if on_rows is not None:
+                lote.append(row)
+                if len(lote) >= config.REPORT_UI_BATCH:
+                    self._entregar(on_rows, lote, cancelada)
+                    lote = []
+        if lote:
+            self._entregar(on_rows, lote, cancelada)
+
+        datos = agregado.to_dict()
+        if not cancelada():
+            self.store.put_aggregate(nombre, desde, hasta, filtros, datos)
+        return datos
+
+    def _entregar(self, on_rows, lote, cancelada):
+        def entregar():
+            if not cancelada():
+                on_rows(lote)
+
+        self.dispatcher(entregar)
+
+    def _descargar(self, nombre, desde, hasta, headers, cancelada, generacion=None):
+        """
+        Genera las filas de todas las páginas y las guarda por lotes
+
+        Solo se pide la página siguiente si el servidor pagina: lo indica
+        con X-Next-Page o, sin ella, devolviendo exactamente page_size
+        filas. Un servidor que ignora page (repite la primera fila de la
+        página anterior), un X-Next-Page que no avanza o una respuesta que
+        no es un array terminan la descarga, y nunca se pasa de
+        config.REPORT_MAX_PAGES. Si el rango se vuelve a empezar mientras
+        tanto, la descarga termina sin guardar más filas.
+        """
+        params = {'page_size': config.REPORT_PAGE_SIZE}
+        if desde:
+            params['desde'] = desde
+        if hasta:
+            params['hasta'] = hasta
+
+        pagina = 1
+        seq = 0
+        primera_anterior = None
+        for _ in range(config.REPORT_MAX_PAGES):
+            if cancelada():
+                return
+            params['page'] = pagina
+            response = self.client.get(
+                report_path(nombre), params=params, headers=headers,
+                stream=True, coalesce=False
+            )
+            recibidas = 0
+            primera = None
+            try:
+                response.raise_for_status()
+                es_array, filas = page_rows(response, config.REPORT_STREAM_CHUNK)
+                pendientes = []
+                for row in filas:
+                    if cancelada():
+                        return
+                    if primera is None:
+                        primera = row_identity(row)
+                        if pagina > 1 and primera == primera_anterior:
+                            # El servidor devolvió otra vez la misma página
+                            return
+                    pendientes.append(row)
+                    yield row
+                    if len(pendientes) >= config.REPORT_UI_BATCH:
+                        if not self.store.add_rows(nombre, desde, hasta, seq, pendientes, generacion):
+                            return
+                        seq += len(pendientes)
+                        recibidas += len(pendientes)
+                        pendientes = []
+                if pendientes:
+                    if not self.store.add_rows(nombre, desde, hasta, seq, pendientes, generacion):
+                        return
+                    seq += len(pendientes)
+                    recibidas += len(pendientes)
+                siguiente = response.headers.get('X-Next-Page')
+            finally:
+                response.close()
+
+            if not es_array:
+                # Un objeto no se pagina
+                return
+            primera_anterior = primera
+            if siguiente is not None:
+                try:
+                    siguiente = int(siguiente)
+                except ValueError:
+                    return
+                if siguiente <= pagina:
+                    return
+                pagina = siguiente
+            elif recibidas == config.REPORT_PAGE_SIZE:
+                # Sin cabecera: una página justo de page_size puede tener más
+                pagina += 1
+            else:
+                # Incompleta (última página) o mayor (el servidor no pagina)
+                return
+        print(f"⚠️ Reporte {nombre}: se alcanzó el máximo de {config.REPORT_MAX_PAGES} páginas")
+
+
+_repository = None
+
+
+def get_report_repository():
+    """
+    Obtiene el repositorio de reportes compartido por toda la aplicación
+
+    Returns:
+        ReportRepository: Instancia única
+    """
+    global _repository
+    if _repository is None:
+        _repository = ReportRepository()
+    return _repository
+
+
+def peek_report_repository():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        ReportRepository: Instancia única o None
+    """
+    return _repository
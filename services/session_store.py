@@ -0,0 +1,206 @@
+"""
+Sesión persistente
+Guarda la sesión iniciada en el almacenamiento privado de la app para
+reabrirla sin pasar por el login, y la revalida en segundo plano
+
+El token se guarda en JSON sin cifrar: solo lo protegen el modo 0600 y el
+directorio privado de la app (en Android, el sandbox de la aplicación).
+Un dispositivo rooteado o una copia de seguridad sin cifrar lo exponen;
+no se usa el Keystore de Android.
+"""
+
+import base64
+import binascii
+import json
+import os
+import time
+
+import config
+from services.api_client import get_api_client
+from services.metrics import metrics
+from services.models import Record
+from services.network_executor import get_network_executor
+from services.paths import data_dir
+
+# Respuestas con las que el backend rechaza el token
+INVALID_TOKEN_STATUS = (401, 403)
+
+# Respuestas de un backend sin el endpoint de verificación: no se puede
+# comprobar el token y la sesión dura hasta que expira
+UNVERIFIABLE_STATUS = (404, 405)
+
+
+def token_expiry(token):
+    """
+    Expiración declarada en un token JWT (claim 'exp'), sin verificar la firma
+
+    Args:
+        token (str): Token de sesión
+
+    Returns:
+        float: Marca de tiempo UNIX o None si el token no es un JWT con 'exp'
+    """
+    partes = str(token).split('.')
+    if len(partes) != 3:
+        return None
+    payload = partes[1] + '=' * (-len(partes[1]) % 4)
+    try:
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+    except (ValueError, binascii.Error, AttributeError):
+        return None
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        return None
+    return float(exp)
+
+
+class SessionStore:
+    """Sesión guardada en un archivo legible solo por la app (modo 0600, sin cifrar)"""
+
+    def __init__(self, path=None, ttl=None, client=None, executor=None):
+        """
+        Args:
+            path (str): Archivo de sesión (por defecto en el directorio de datos)
+            ttl (float): Vigencia máxima en segundos desde el login
+        """
+        self.path = path or os.path.join(data_dir(), config.SESSION_FILE_NAME)
+        self.ttl = ttl if ttl is not None else config.SESSION_TTL
+        self._client = client
+        self._executor = executor
+
+    @property
+    def client(self):
+        return self._client or get_api_client()
+
+    @property
+    def executor(self):
+        return self._executor or get_network_executor()
+
+    def save(self, token, nivel, nombre, user_data=None):
+        """
+        Guarda la sesión; expira con el token si es un JWT y nunca después del TTL
+
+        Args:
+            token (str): Token de sesión
+            nivel (str): Nivel del usuario ('admin', 'moderador', 'obrero')
+            nombre (str): Nombre de usuario
+            user_data (dict | UserProfile): Datos del usuario devueltos por el login
+        """
+        ahora = time.time()
+        expira = ahora + self.ttl
+        exp_token = token_expiry(token)
+        if exp_token is not None:
+            expira = min(expira, exp_token)
+
+        datos = {
+            'token': token,
+            'nivel': nivel,
+            'nombre': nombre,
+            'user_data': user_data.to_dict() if isinstance(user_data, Record) else dict(user_data or {}),
+            'saved_at': ahora,
+            'expires_at': expira,
+        }
+        temporal = f"{self.path}.tmp"
+        try:
+            fd = os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as archivo:
+                json.dump(datos, archivo, ensure_ascii=False)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"❌ Error guardando sesión: {e}")
+
+    def load(self):
+        """
+        Lee la sesión guardada
+
+        Returns:
+            dict: token, nivel, nombre, user_data y expires_at, o None si no
+                hay sesión o ya expiró (en ese caso se borra)
+        """
+        try:
+            with open(self.path, encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"❌ Sesión guardada ilegible: {e}")
+            self.clear()
+            return None
+
+        if not isinstance(datos, dict) or not datos.get('token') or not datos.get('nivel'):
+            self.clear()
+            return None
+        if datos.get('expires_at', 0) <= time.time():
+            self.clear()
+            return None
+        return datos
+
+    def clear(self):
+        """Borra la sesión guardada"""
+        for ruta in (self.path, f"{self.path}.tmp"):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"❌ Error borrando sesión: {e}")
+
+    def revalidate(self, headers, on_invalid, on_valid=None):
+        """
+        Comprueba el token con el backend en segundo plano
+
+        Solo un rechazo explícito (401/403) invalida la sesión: sin red o con
+        el servidor dormido se sigue trabajando con la sesión guardada. Si
+        el backend no tiene config.SESSION_VALIDATE_PATH (404/405) se avisa
+        de que no se puede verificar y la sesión dura hasta que expira
+
+        Args:
+            headers (dict): Headers de autenticación con el token guardado
+            on_invalid (callable): Se llama en el hilo de la UI si el token fue rechazado
+            on_valid (callable): Se llama en el hilo de la UI si el token es válido
+
+        Returns:
+            NetworkTask: Comprobación en curso
+        """
+        def verificar():
+            response = self.client.get(
+                config.SESSION_VALIDATE_PATH, headers=headers, coalesce=False,
+                timeout=config.HEALTH_WARMUP_TIMEOUT
+            )
+            response.close()
+            return response.status_code
+
+        def on_success(status_code):
+            if status_code in INVALID_TOKEN_STATUS:
+                self.clear()
+                on_invalid()
+            elif status_code in UNVERIFIABLE_STATUS:
+                metrics.count('session.unverifiable')
+                print(f"⚠️ No se puede verificar la sesión: el backend no expone "
+                      f"{config.SESSION_VALIDATE_PATH} (HTTP {status_code})")
+            elif on_valid is not None and 200 <= status_code < 300:
+                on_valid()
+
+        def on_error(e):
+            print(f"❌ No se pudo revalidar la sesión: {e}")
+
+        return self.executor.submit(
+            verificar, on_success=on_success, on_error=on_error, tag='sesion:revalidar'
+        )
+
+
+_store = None
+
+
+def get_session_store():
+    """
+    Obtiene el almacén de sesión compartido por toda la aplicación
+
+    Returns:
+        SessionStore: Instancia única
+    """
+    global _store
+    if _store is None:
+        _store = SessionStore()
+    return _store
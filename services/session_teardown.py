@@ -0,0 +1,95 @@
+"""
+Cierre de sesión
+Libera todo lo que pertenece al usuario que sale: trabajo en curso,
+mensajes y cursores de sincronización, personal indexado, texturas,
+respuestas memorizadas, reportes descargados, adjuntos privados y la
+sesión guardada. En los teléfonos que comparte una cuadrilla la memoria
+no debe crecer con cada usuario, y el siguiente no debe ver sus datos.
+
+La caché HTTP se conserva porque cada entrada es de su usuario (solo se
+le vuelve a mostrar a él); las imágenes públicas también se conservan.
+"""
+
+import gc
+
+
+def release_user_state(sync=None, outbox=None, executor=None, personnel=None,
+                       scheduler=None, images=None, client=None, session=None,
+                       cache=None, reports=None):
+    """
+    Libera el estado del usuario que cierra sesión
+
+    Cada servicio se puede indicar (p. ej. en pruebas); por defecto se usa
+    la instancia compartida de la aplicación si ya se creó. Los servicios
+    que no se llegaron a crear no tienen nada del usuario y no se crean
+    (la caché de imágenes, por ejemplo, arranca hilos)
+
+    Returns:
+        dict: Resumen de lo liberado (para métricas y pruebas)
+    """
+    from services.api_client import peek_api_client
+    from services.image_cache import peek_image_cache
+    from services.local_cache import peek_local_cache
+    from services.message_sync import peek_message_sync
+    from services.network_executor import peek_network_executor
+    from services.outbox import peek_outbox
+    from services.personnel_repository import peek_personnel_repository
+    from services.report_repository import peek_report_repository
+    from services.session_store import get_session_store
+    from services.ui_scheduler import peek_ui_scheduler
+
+    if sync is None:
+        sync = peek_message_sync()
+    if outbox is None:
+        outbox = peek_outbox()
+    if executor is None:
+        executor = peek_network_executor()
+    if personnel is None:
+        personnel = peek_personnel_repository()
+    if scheduler is None:
+        scheduler = peek_ui_scheduler()
+    if images is None:
+        images = peek_image_cache()
+    if client is None:
+        client = peek_api_client()
+    if session is None:
+        # La sesión guardada en disco se borra aunque el almacén no exista aún
+        session = get_session_store()
+    if cache is None:
+        cache = peek_local_cache()
+    if reports is None:
+        reports = peek_report_repository()
+
+    # Dejar de sincronizar y de enviar en nombre del usuario anterior; las
+    # escrituras ya enviadas (sin grupo) terminan igualmente
+    if sync is not None:
+        sync.clear()
+    if outbox is not None:
+        outbox.set_owner(None)
+    if cache is not None:
+        cache.set_owner(None)
+    if executor is not None:
+        executor.cancel_all()
+    if scheduler is not None:
+        scheduler.clear()
+
+    resumen = {
+        'empleados': len(personnel.store) if personnel is not None else 0,
+        'texturas': len(images.memory) if images is not None else 0,
+    }
+    if personnel is not None:
+        personnel.store.clear()
+    if reports is not None:
+        # Los reportes no tienen dueño en disco: se borran
+        reports.store.clear()
+    if images is not None:
+        images.trim_memory()
+        images.forget_private()
+    if client is not None:
+        client.flights.forget()
+    session.clear()
+
+    # Los widgets de Kivy forman ciclos: recogerlos ahora y no durante el
+    # siguiente login
+    resumen['recogidos'] = gc.collect()
+    return resumen
@@ -0,0 +1,121 @@
+"""
+Agrupación de peticiones duplicadas (single-flight)
+Las llamadas concurrentes con la misma clave comparten una sola
+ejecución, y el resultado se reutiliza durante un TTL corto
+"""
+
+import threading
+import time
+
+
+class _Flight:
+    """Ejecución en curso compartida por varios llamadores"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalescencia de llamadas idénticas con memoria de corta duración"""
+
+    def __init__(self, ttl=0, max_entries=128):
+        """
+        Args:
+            ttl (float): Segundos durante los que se reutiliza un resultado
+            max_entries (int): Resultados memorizados como máximo
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._flights = {}
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, ttl=None, cacheable=None):
+        """
+        Ejecuta func() una sola vez por clave entre llamadores concurrentes
+
+        Args:
+            key: Clave hashable que identifica la llamada
+            func (callable): Trabajo bloqueante
+            ttl (float): TTL de la memoria para esta llamada
+            cacheable (callable): Decide si un resultado se memoriza
+
+        Returns:
+            Resultado de func (el mismo objeto para todos los que esperaban)
+
+        Raises:
+            Exception: La excepción de func, también para los que esperaban
+        """
+        ttl = self.ttl if ttl is None else ttl
+        ahora = time.monotonic()
+        with self._lock:
+            memorizado = self._memo.get(key)
+            if memorizado is not None:
+                if memorizado[0] > ahora:
+                    return memorizado[1]
+                del self._memo[key]
+
+            flight = self._flights.get(key)
+            lider = flight is None
+            if lider:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not lider:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and ttl > 0 and (cacheable is None or cacheable(flight.result)):
+                    if len(self._memo) >= self.max_entries:
+                        self._purge(time.monotonic())
+                    self._memo[key] = (time.monotonic() + ttl, flight.result)
+            flight.done.set()
+        return flight.result
+
+    def forget(self, prefix=None):
+        """
+        Olvida resultados memorizados
+
+        Args:
+            prefix (str): Solo las claves cuya ruta (su primer elemento) es
+                prefix o está bajo él por segmentos completos: '/mensajes/a'
+                no olvida '/mensajes/ab'. None olvida todo
+        """
+        with self._lock:
+            if prefix is None:
+                self._memo.clear()
+                return
+            for key in [k for k in self._memo if path_under(_key_path(k), prefix)]:
+                del self._memo[key]
+
+    def _purge(self, ahora):
+        for key in [k for k, (expira, _) in self._memo.items() if expira <= ahora]:
+            del self._memo[key]
+        while len(self._memo) >= self.max_entries:
+            del self._memo[next(iter(self._memo))]
+
+
+def path_under(path, prefix):
+    """Indica si path es prefix o cuelga de él ('/a' y '/a/' abarcan '/a/b')"""
+    base = prefix.rstrip('/')
+    return path == base or path.startswith(base + '/')
+
+
+def _key_path(key):
+    if isinstance(key, tuple) and key:
+        return str(key[0])
+    return str(key)
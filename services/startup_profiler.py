@@ -0,0 +1,169 @@
+"""
+Perfilador de arranque opcional
+Mide importaciones, build, primer frame y primera respuesta de la API
+y escribe un informe JSON. Solo usa la librería estándar para poder
+importarse antes que Kivy y que config.py.
+
+Variables de entorno:
+    CORPOTACHIRA_STARTUP_PROFILE=1              Activa el perfilador
+    CORPOTACHIRA_STARTUP_PROFILE_OUTPUT=ruta    Archivo del informe (startup_profile.json)
+    CORPOTACHIRA_STARTUP_PROFILE_EXIT=1         Cierra la app al escribir el informe
+    CORPOTACHIRA_STARTUP_PROFILE_TIMEOUT=seg    Espera máxima de los hitos (60)
+"""
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Hitos que cierran el informe cuando se alcanzan todos
+DEFAULT_MILESTONES = ('first_frame', 'first_api_response')
+
+
+def _env_flag(name):
+    return os.getenv(name, '').lower() in ('1', 'true', 'yes')
+
+
+class StartupProfiler:
+    """
+    Registro de fases y hitos del arranque, en milisegundos desde que se
+    importa el perfilador (primera línea de cada punto de entrada). El
+    arranque del intérprete lo mide tools/bench_startup.py como wall_ms
+    """
+
+    def __init__(self, enabled=False, output_path='startup_profile.json',
+                 exit_after_report=False, timeout=60):
+        self.enabled = enabled
+        self.output_path = output_path
+        self.exit_after_report = exit_after_report
+        self.timeout = timeout
+        self.entry_point = os.path.basename(sys.argv[0]) if sys.argv else ''
+        self._t0 = time.perf_counter()
+        self._phases = []
+        self._marks = {}
+        self._expected = set(DEFAULT_MILESTONES)
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def _elapsed_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Mide la duración de un bloque de arranque
+
+        Args:
+            name (str): Nombre de la fase, p. ej. 'import_kivymd'
+        """
+        if not self.enabled:
+            yield
+            return
+        inicio = self._elapsed_ms()
+        try:
+            yield
+        finally:
+            fin = self._elapsed_ms()
+            with self._lock:
+                self._phases.append({
+                    'name': name,
+                    'start_ms': round(inicio, 2),
+                    'duration_ms': round(fin - inicio, 2)
+                })
+
+    def mark(self, name):
+        """
+        Registra un hito la primera vez que ocurre. Puede llamarse desde
+        cualquier hilo
+
+        Args:
+            name (str): Nombre del hito, p. ej. 'first_frame'
+        """
+        if not self.enabled or self._finished:
+            return
+        with self._lock:
+            if name in self._marks:
+                return
+            self._marks[name] = round(self._elapsed_ms(), 2)
+            completo = self._expected.issubset(self._marks)
+        if completo:
+            self._schedule_finish()
+
+    def expect(self, *names):
+        """Define los hitos que deben alcanzarse antes de escribir el informe"""
+        self._expected = set(names)
+
+    def watch_first_frame(self):
+        """
+        Marca 'first_frame' tras el primer intercambio de buffers de la
+        ventana y arma el timeout del informe. Llamar al final de build()
+        """
+        if not self.enabled:
+            return
+        from kivy.clock import Clock
+        from kivy.core.window import Window
+
+        def on_flip(*args):
+            Window.unbind(on_flip=on_flip)
+            self.mark('first_frame')
+
+        Window.bind(on_flip=on_flip)
+        Clock.schedule_once(lambda dt: self.finish(), self.timeout)
+
+    def report(self):
+        """
+        Returns:
+            dict: Informe con fases, hitos y datos del entorno
+        """
+        with self._lock:
+            return {
+                'entry_point': self.entry_point,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': sys.platform,
+                'machine': platform.machine(),
+                'phases': list(self._phases),
+                'marks': dict(self._marks),
+                'missing_marks': sorted(self._expected - set(self._marks)),
+                'total_ms': round(self._elapsed_ms(), 2)
+            }
+
+    def write_report(self, path=None):
+        """Escribe el informe JSON y devuelve la ruta usada"""
+        path = path or self.output_path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        return path
+
+    def finish(self):
+        """Escribe el informe (una sola vez) y cierra la app si se pidió"""
+        if not self.enabled or self._finished:
+            return
+        self._finished = True
+        try:
+            path = self.write_report()
+            print(f"⏱️ Informe de arranque: {path}")
+        except OSError as e:
+            print(f"❌ Error escribiendo informe de arranque: {e}")
+
+        if self.exit_after_report:
+            from kivy.app import App
+            app = App.get_running_app()
+            if app:
+                app.stop()
+
+    def _schedule_finish(self):
+        # Los hitos pueden llegar desde hilos de red; cerrar en el hilo de la UI
+        from kivy.clock import Clock
+        Clock.schedule_once(lambda dt: self.finish(), 0)
+
+
+profiler = StartupProfiler(
+    enabled=_env_flag('CORPOTACHIRA_STARTUP_PROFILE'),
+    output_path=os.getenv('CORPOTACHIRA_STARTUP_PROFILE_OUTPUT', 'startup_profile.json'),
+    exit_after_report=_env_flag('CORPOTACHIRA_STARTUP_PROFILE_EXIT'),
+    timeout=float(os.getenv('CORPOTACHIRA_STARTUP_PROFILE_TIMEOUT', '60'))
+)
@@ -0,0 +1,261 @@
+"""
+Planificador de trabajo de UI por presupuesto de frame
+Reparte la creación y actualización de muchos widgets entre varios
+frames del Clock de Kivy, sin pasar de un presupuesto de milisegundos por
+frame y atendiendo primero lo visible
+"""
+
+import heapq
+import itertools
+import time
+
+import config
+from services.metrics import metrics
+
+# Prioridades: menor número = antes
+PRIORITY_VISIBLE = 0  # Lo que el usuario ve ahora
+PRIORITY_NORMAL = 10  # El resto de la lista
+PRIORITY_BACKGROUND = 20  # Precargas que pueden esperar
+
+
+class UiJob:
+    """Trabajo planificado: una llamada o una función aplicada a una lista"""
+
+    __slots__ = ('func', 'items', 'priority', 'tag', 'on_done', 'done', 'cancelled', 'seq')
+
+    def __init__(self, func, items, priority, tag, on_done, seq):
+        self.func = func
+        self.items = iter(items)
+        self.priority = priority
+        self.tag = tag
+        self.on_done = on_done
+        self.done = 0
+        self.cancelled = False
+        self.seq = seq
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class FrameScheduler:
+    """
+    Cola de trabajo del hilo principal
+
+    En cada frame ejecuta unidades de trabajo (una llamada o un elemento
+    de una lista) en orden de prioridad hasta agotar el presupuesto, y deja
+    el resto para el siguiente frame. Siempre se ejecuta al menos una
+    unidad por frame para que el trabajo avance aunque una unidad sola
+    supere el presupuesto.
+    """
+
+    def __init__(self, budget_ms=None, clock=None, timer=time.perf_counter):
+        """
+        Args:
+            budget_ms (float): Milisegundos por frame (por defecto config.UI_FRAME_BUDGET_MS)
+            clock: Objeto con schedule_once(callback, timeout); por defecto
+                kivy.clock.Clock
+            timer (callable): Reloj en segundos (inyectable para pruebas)
+        """
+        self.budget_ms = budget_ms if budget_ms is not None else config.UI_FRAME_BUDGET_MS
+        self._clock = clock
+        self._timer = timer
+        self._cola = []
+        self._seq = itertools.count()
+        self._programado = False
+
+    @property
+    def clock(self):
+        if self._clock is None:
+            from kivy.clock import Clock
+            self._clock = Clock
+        return self._clock
+
+    def submit(self, func, *args, priority=PRIORITY_NORMAL, tag=None, on_done=None):
+        """
+        Planifica una llamada func(*args)
+
+        Returns:
+            UiJob: Trabajo planificado (se puede cancelar)
+        """
+        return self._agregar(lambda _: func(*args), (None,), priority, tag, on_done)
+
+    def map(self, func, items, priority=PRIORITY_NORMAL, tag=None, on_done=None, visible=0):
+        """
+        Planifica func(item) para cada elemento, repartido entre frames
+
+        Args:
+            func (callable): Crea o actualiza el widget de un elemento
+            items (iterable): Elementos en orden de pantalla
+            priority (int): Prioridad del resto de elementos
+            tag (str): Etiqueta para cancel(); un map nuevo con la misma
+                etiqueta cancela el anterior (p. ej. recargar la lista)
+            on_done (callable): Se llama sin argumentos al terminar
+            visible (int): Los primeros elementos se crean con PRIORITY_VISIBLE
+
+        Returns:
+            UiJob: Trabajo del resto de elementos
+        """
+        if tag is not None:
+            self.cancel(tag)
+        items = list(items) if visible else items
+        if visible:
+            self._agregar(func, items[:visible], PRIORITY_VISIBLE, tag, None)
+            items = items[visible:]
+        return self._agregar(func, items, priority, tag, on_done)
+
+    def populate(self, container, items, factory, tag=None, visible=None,
+                 priority=PRIORITY_NORMAL, on_done=None, pool_kind=None, update=None):
+        """
+        Añade a container un widget por elemento, repartido entre frames
+
+        Args:
+            container (Widget): Contenedor (p. ej. un MDList o GridLayout)
+            items (iterable): Elementos en orden de pantalla
+            factory (callable): factory(item) -> Widget
+            tag (str): Etiqueta; repoblar con la misma cancela lo pendiente
+            visible (int): Elementos que caben en pantalla, creados primero
+                (por defecto config.UI_VISIBLE_ITEMS)
+            pool_kind (str): Tipo de widget en la reserva compartida: los
+                hijos actuales de container vuelven a ella y los nuevos
+                elementos la usan antes de llamar a factory
+            update (callable): update(widget, item) para cargar un elemento
+                en un widget reutilizado (obligatorio con pool_kind)
+
+        Returns:
+            UiJob: Trabajo del resto de elementos
+        """
+        crear = factory
+        if pool_kind is not None:
+            from services.widget_pool import get_widget_pool
+            pool = get_widget_pool()
+            pool.recycle_children(container, pool_kind)
+
+            def crear(item):
+                widget = pool.acquire(pool_kind)
+                if widget is None:
+                    return factory(item)
+                update(widget, item)
+                return widget
+
+        return self.map(
+            lambda item: container.add_widget(crear(item)), items,
+            priority=priority, tag=tag, on_done=on_done,
+            visible=config.UI_VISIBLE_ITEMS if visible is None else visible
+        )
+
+    def cancel(self, tag):
+        """
+        Cancela los trabajos pendientes con la etiqueta indicada
+
+        Returns:
+            int: Trabajos cancelados
+        """
+        cancelados = 0
+        for job in self._cola:
+            if job.tag == tag and not job.cancelled:
+                job.cancel()
+                cancelados += 1
+        return cancelados
+
+    def clear(self):
+        """Cancela todo lo pendiente (p. ej. al cerrar sesión)"""
+        for job in self._cola:
+            job.cancel()
+        self._cola = []
+
+    def pending(self):
+        """Número de trabajos pendientes"""
+        return sum(1 for job in self._cola if not job.cancelled)
+
+    def run_until_idle(self):
+        """Ejecuta todo lo pendiente sin respetar el presupuesto (p. ej. al salir)"""
+        while self._cola:
+            self._ejecutar(float('inf'))
+
+    def _agregar(self, func, items, priority, tag, on_done):
+        job = UiJob(func, items, priority, tag, on_done, next(self._seq))
+        heapq.heappush(self._cola, job)
+        self._programar()
+        return job
+
+    def _programar(self):
+        if not self._programado and self._cola:
+            self._programado = True
+            self.clock.schedule_once(self._tick, 0)
+
+    def _tick(self, dt):
+        self._programado = False
+        try:
+            with metrics.timer('ui_scheduler.frame'):
+                self._ejecutar(self.budget_ms / 1000)
+        finally:
+            # Pase lo que pase, el resto de la cola sigue en el próximo frame
+            self._programar()
+
+    def _ejecutar(self, presupuesto):
+        inicio = self._timer()
+        unidades = 0
+        while self._cola:
+            job = self._cola[0]
+            if job.cancelled:
+                heapq.heappop(self._cola)
+                continue
+            if unidades and self._timer() - inicio >= presupuesto:
+                break
+            try:
+                item = next(job.items)
+            except StopIteration:
+                heapq.heappop(self._cola)
+                self._terminar(job)
+                continue
+            except Exception as e:
+                # Un iterable que falla descarta su trabajo, no la cola
+                heapq.heappop(self._cola)
+                print(f"❌ Error en trabajo de UI ({job.tag}): {e}")
+                metrics.error('ui_scheduler', e)
+                continue
+            try:
+                job.func(item)
+            except Exception as e:
+                print(f"❌ Error en trabajo de UI ({job.tag}): {e}")
+                metrics.error('ui_scheduler', e)
+            job.done += 1
+            unidades += 1
+
+    def _terminar(self, job):
+        if job.on_done is None:
+            return
+        try:
+            job.on_done()
+        except Exception as e:
+            print(f"❌ Error al terminar trabajo de UI ({job.tag}): {e}")
+            metrics.error('ui_scheduler', e)
+
+
+_scheduler = None
+
+
+def get_ui_scheduler():
+    """
+    Obtiene el planificador de UI compartido por toda la aplicación
+
+    Returns:
+        FrameScheduler: Instancia única
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FrameScheduler()
+    return _scheduler
+
+
+def peek_ui_scheduler():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        FrameScheduler: Instancia única o None
+    """
+    return _scheduler
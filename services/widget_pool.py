@@ -0,0 +1,118 @@
+"""
+Reserva de widgets reutilizables
+Las tarjetas de empleados, las filas de reportes y demás elementos de
+lista se devuelven aquí al vaciar una lista (o al cerrar sesión) y se
+reutilizan en la siguiente, en lugar de crear y destruir el árbol de
+widgets en cada carga
+"""
+
+import config
+from services.metrics import metrics
+
+
+class WidgetPool:
+    """
+    Widgets libres por tipo, con un máximo por tipo
+
+    Solo se usa desde el hilo de la UI, así que no usa bloqueos. Un widget
+    que defina reset_for_pool() lo recibe al devolverse, para soltar los
+    datos del elemento anterior (textos, texturas, callbacks).
+    """
+
+    def __init__(self, max_per_kind=None):
+        """
+        Args:
+            max_per_kind (int): Widgets libres que se conservan por tipo
+                (por defecto config.WIDGET_POOL_MAX_PER_KIND)
+        """
+        self.max_per_kind = max_per_kind if max_per_kind is not None else config.WIDGET_POOL_MAX_PER_KIND
+        self._libres = {}  # tipo -> lista de widgets
+
+    def acquire(self, kind):
+        """
+        Returns:
+            Widget: Un widget libre del tipo, o None si no hay
+        """
+        libres = self._libres.get(kind)
+        if not libres:
+            metrics.count('widget_pool.miss')
+            return None
+        metrics.count('widget_pool.reuse')
+        return libres.pop()
+
+    def release(self, kind, widget):
+        """
+        Devuelve un widget a la reserva, quitándolo de su contenedor
+
+        Returns:
+            bool: True si se conservó; False si la reserva del tipo estaba llena
+        """
+        if widget.parent is not None:
+            widget.parent.remove_widget(widget)
+        libres = self._libres.setdefault(kind, [])
+        if len(libres) >= self.max_per_kind:
+            return False
+        reset = getattr(widget, 'reset_for_pool', None)
+        if reset is not None:
+            reset()
+        libres.append(widget)
+        return True
+
+    def recycle_children(self, container, kind):
+        """
+        Vacía un contenedor devolviendo sus hijos a la reserva
+
+        Returns:
+            int: Widgets conservados
+        """
+        conservados = 0
+        for widget in list(container.children):
+            if self.release(kind, widget):
+                conservados += 1
+        return conservados
+
+    def available(self, kind=None):
+        """Widgets libres de un tipo o de todos"""
+        if kind is not None:
+            return len(self._libres.get(kind, ()))
+        return sum(len(libres) for libres in self._libres.values())
+
+    def trim(self, keep=0):
+        """
+        Reduce cada tipo a keep widgets libres (p. ej. con poca memoria)
+
+        Returns:
+            int: Widgets descartados
+        """
+        descartados = 0
+        for libres in self._libres.values():
+            while len(libres) > keep:
+                libres.pop()
+                descartados += 1
+        return descartados
+
+
+_pool = None
+
+
+def get_widget_pool():
+    """
+    Obtiene la reserva de widgets compartida por toda la aplicación
+
+    Returns:
+        WidgetPool: Instancia única
+    """
+    global _pool
+    if _pool is None:
+        _pool = WidgetPool()
+    return _pool
+
+
+def peek_widget_pool():
+    """
+    Instancia compartida si ya se creó, sin crearla (p. ej. para liberarla)
+
+    Returns:
+        WidgetPool: Instancia única o None
+    """
+    return _pool
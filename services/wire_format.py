@@ -0,0 +1,201 @@
+"""
+Formato de las respuestas
+Negocia compresión (gzip/deflate) y, si está instalado msgpack, el
+formato MessagePack para los endpoints de listas, y decodifica las
+respuestas en cualquiera de los dos formatos, completas o en streaming.
+
+msgpack es opcional: sin él todo sigue en JSON comprimido.
+"""
+
+import json
+
+import config
+from services.json_stream import JsonArrayStream
+
+JSON_TYPE = 'application/json'
+MSGPACK_TYPE = 'application/x-msgpack'
+
+_msgpack = None
+_msgpack_probado = False
+
+
+def msgpack_module():
+    """
+    Módulo msgpack si está instalado y habilitado en config.WIRE_MSGPACK
+
+    Returns:
+        module: msgpack o None
+    """
+    global _msgpack, _msgpack_probado
+    if not _msgpack_probado:
+        _msgpack_probado = True
+        if config.WIRE_MSGPACK:
+            try:
+                import msgpack
+                _msgpack = msgpack
+            except ImportError:
+                _msgpack = None
+    return _msgpack
+
+
+def is_compact_path(path):
+    """Indica si una ruta es un endpoint de listas (config.WIRE_COMPACT_PATHS)"""
+    return any(path.startswith(prefijo) for prefijo in config.WIRE_COMPACT_PATHS)
+
+
+def accept_header():
+    """
+    Valor de Accept para los endpoints de listas
+
+    Returns:
+        str: MessagePack preferido si está disponible, JSON como alternativa
+    """
+    if msgpack_module() is not None:
+        return f"{MSGPACK_TYPE}, {JSON_TYPE};q=0.9"
+    return JSON_TYPE
+
+
+def is_msgpack(response):
+    """Indica si la respuesta viene en MessagePack"""
+    tipo = response.headers.get('Content-Type') or ''
+    return tipo.split(';', 1)[0].strip() == MSGPACK_TYPE
+
+
+def decode_body(body):
+    """
+    Decodifica un cuerpo JSON o MessagePack ya descargado (p. ej. de la caché)
+
+    JSON siempre empieza por un byte ASCII y un array u objeto MessagePack
+    por uno >= 0x80, así que no hace falta guardar el tipo
+
+    Args:
+        body (bytes | str): Cuerpo de la respuesta
+
+    Returns:
+        Datos decodificados
+
+    Raises:
+        ValueError: Si el cuerpo no es válido o es MessagePack sin msgpack instalado
+    """
+    if isinstance(body, (bytes, bytearray, memoryview)) and len(body) and body[0] >= 0x80:
+        msgpack = msgpack_module()
+        if msgpack is None:
+            raise ValueError('Respuesta MessagePack sin el módulo msgpack')
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise ValueError(f"MessagePack inválido: {e}")
+    return json.loads(body)
+
+
+def decode_response(response):
+    """
+    Decodifica una respuesta completa según su Content-Type
+
+    Returns:
+        Datos decodificados (la descompresión la hace requests)
+    """
+    if is_msgpack(response):
+        return decode_body(response.content)
+    return response.json()
+
+
+class MsgpackArrayStream:
+    """
+    Decodificador incremental de un array MessagePack de primer nivel,
+    con la misma interfaz que JsonArrayStream
+    """
+
+    def __init__(self):
+        self._unpacker = msgpack_module().Unpacker(raw=False)
+        self._restantes = None
+
+    @property
+    def finished(self):
+        """Indica si ya se leyeron todos los elementos del array"""
+        return self._restantes == 0
+
+    def feed(self, chunk):
+        """
+        Procesa un fragmento de bytes
+
+        Returns:
+            list: Elementos completos decodificados con este fragmento
+        """
+        self._unpacker.feed(chunk)
+        return self._extraer()
+
+    def _extraer(self):
+        from msgpack import OutOfData
+
+        elementos = []
+        if self._restantes is None:
+            try:
+                self._restantes = self._unpacker.read_array_header()
+            except OutOfData:
+                return elementos
+        while self._restantes:
+            try:
+                elementos.append(self._unpacker.unpack())
+            except OutOfData:
+                break
+            self._restantes -= 1
+        return elementos
+
+    def close(self):
+        """
+        Termina la decodificación
+
+        Raises:
+            ValueError: Si la respuesta quedó incompleta
+        """
+        elementos = self._extraer()
+        if self._restantes != 0:
+            raise ValueError('Array MessagePack incompleto')
+        return elementos
+
+
+def starts_array(head):
+    """
+    Indica si el comienzo de un cuerpo es el de un array (JSON o
+    MessagePack) y no el de un objeto u otro valor
+
+    Args:
+        head (bytes): Primeros bytes recibidos
+    """
+    head = head.lstrip()
+    if not head:
+        return False
+    primero = head[0]
+    return primero == ord('[') or 0x90 <= primero <= 0x9f or primero in (0xdc, 0xdd)
+
+
+def array_stream(response):
+    """
+    Decodificador incremental adecuado para una respuesta de lista
+
+    Returns:
+        JsonArrayStream | MsgpackArrayStream: Con feed(chunk) y close()
+    """
+    if is_msgpack(response):
+        if msgpack_module() is None:
+            raise ValueError('Respuesta MessagePack sin el módulo msgpack')
+        return MsgpackArrayStream()
+    return JsonArrayStream()
+
+
+def iter_array(response, chunk_size=None):
+    """
+    Genera los elementos de una respuesta de lista a medida que llegan,
+    sin cargar el documento completo (la petición debe hacerse con stream=True)
+
+    Args:
+        response (requests.Response): Respuesta en streaming
+        chunk_size (int): Bytes por lectura (por defecto config.REPORT_STREAM_CHUNK)
+    """
+    stream = array_stream(response)
+    for chunk in response.iter_content(chunk_size or config.REPORT_STREAM_CHUNK):
+        for elemento in stream.feed(chunk):
+            yield elemento
+    for elemento in stream.close():
+        yield elemento
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extremo a extremo sin pantalla ni red
+Levanta tools/stub_server.py con latencia y tamaño de datos configurables
+y recorre los flujos de la app: login, chat, carga de mensajes, envío,
+personal, reportes, cambio de pestañas y logout. Informa los percentiles
+de latencia por flujo, las asignaciones y el pico de memoria (tracemalloc)
+y los compara con una línea base.
+
+Modos:
+    services  Los flujos sobre los servicios que usan las pantallas, con un
+              despachador inmediato en lugar del Clock de Kivy (por defecto)
+    apps      Ejecuta CorpotachiraApp y EmpresaLimpiezaApp en un subproceso
+              cada una y las conduce con el Clock (requiere Kivy/KivyMD;
+              sin pantalla, usar xvfb-run o --headless)
+
+Uso:
+    python tools/bench_e2e.py --runs 10 --latency-ms 40 --save-baseline
+    python tools/bench_e2e.py --runs 10 --latency-ms 40
+    xvfb-run -a python tools/bench_e2e.py --mode apps
+
+Sale con código 1 si alguna métrica empeora más que la tolerancia.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench_startup import BASELINE_DIR, compare, percentile  # noqa: E402
+from stub_server import StubBackend, start_in_thread  # noqa: E402
+
+FLOWS = (
+    'login', 'chat', 'message_load', 'send', 'personnel',
+    'personnel_search', 'report', 'tab_switch', 'logout',
+)
+
+
+def inmediato(callback):
+    """Despachador sin Kivy: ejecuta el callback en el hilo que lo entrega"""
+    callback()
+
+
+class Espera:
+    """Espera bloqueante al callback de una operación en segundo plano"""
+
+    def __init__(self):
+        self._evento = threading.Event()
+        self.valor = None
+        self.error = None
+
+    def ok(self, valor=None, *args):
+        self.valor = valor
+        self._evento.set()
+
+    def fallo(self, error):
+        self.error = error
+        self._evento.set()
+
+    def esperar(self, timeout=60):
+        if not self._evento.wait(timeout):
+            raise TimeoutError('La operación no terminó a tiempo')
+        if self.error is not None:
+            raise self.error
+        return self.valor
+
+
+class Sesion:
+    """Servicios recién creados sobre un directorio de datos temporal"""
+
+    def __init__(self, url, datos_dir):
+        from services.api_client import ApiClient
+        from services.chat_repository import ChatRepository
+        from services.image_cache import ImageCache
+        from services.local_cache import LocalCache
+        from services.message_sync import MessageSync
+        from services.network_executor import NetworkExecutor
+        from services.outbox import Outbox
+        from services.personnel_repository import PersonnelRepository
+        from services.report_repository import ReportRepository, ReportStore
+        from services.session_store import SessionStore
+        from services.ui_scheduler import FrameScheduler
+
+        ruta = lambda nombre: os.path.join(datos_dir, nombre)  # noqa: E731
+        self.client = ApiClient(base_url=url)
+        self.executor = NetworkExecutor(dispatcher=inmediato)
+        self.cache = LocalCache(ruta('cache.sqlite3'))
+        self.chat = ChatRepository(self.client, self.cache, self.executor)
+        self.sync = MessageSync(self.client, dispatcher=inmediato, cache=self.cache)
+        self.outbox = Outbox(ruta('outbox.sqlite3'), self.client, dispatcher=inmediato)
+        self.personnel = PersonnelRepository(self.client, self.cache, self.executor)
+        self.reports = ReportRepository(
+            self.client, ReportStore(ruta('reports.sqlite3')), self.executor, dispatcher=inmediato
+        )
+        self.session = SessionStore(ruta('session.json'), client=self.client, executor=self.executor)
+        self.images = ImageCache(
+            self.client, directory=ruta('images'), executor=self.executor, dispatcher=inmediato
+        )
+        self.scheduler = FrameScheduler()
+        self.token = None
+        self.headers = None
+
+    def close(self):
+        self.executor.shutdown()
+        self.outbox.stop()
+        self.cache.close()
+        self.reports.store.close()
+        self.client.close()
+
+
+# --- Flujos ---------------------------------------------------------------
+# Cada flujo recibe la sesión y devuelve cuando su resultado llegaría a la UI
+
+def flujo_login(s):
+    respuesta = s.client.post('/api/auth/login', json={
+        'usuario': 'bench', 'password': 'bench', 'nivel': 'admin'
+    })
+    respuesta.raise_for_status()
+    datos = respuesta.json()
+    s.token = datos['token']
+    s.headers = s.client.auth_headers(s.token)
+    s.cache.set_owner(datos['usuario'], datos['nivel'])
+    s.session.save(s.token, datos['nivel'], datos['usuario'])
+    if s.session.load() is None:
+        raise RuntimeError('La sesión no se guardó')
+    espera = Espera()
+    s.session.revalidate(s.headers, on_invalid=lambda: espera.fallo(RuntimeError('Token rechazado')),
+                         on_valid=espera.ok)
+    espera.esperar()
+
+
+def flujo_chat(s):
+    espera = Espera()
+    s.chat.load_channels(
+        lambda canales, desde_cache: None if desde_cache else espera.ok(canales),
+        on_error=espera.fallo, headers=s.headers
+    )
+    canales = espera.esperar()
+    espera = Espera()
+    s.chat.load_messages(
+        canales[0], lambda mensajes, desde_cache: None if desde_cache else espera.ok(mensajes),
+        on_error=espera.fallo, headers=s.headers
+    )
+    espera.esperar()
+
+
+def flujo_message_load(s):
+    s.sync.sync_once('general', headers=s.headers)
+    # Con el cursor ya puesto, la siguiente sincronización no trae nada
+    s.sync.sync_once('general', headers=s.headers)
+
+
+def flujo_send(s):
+    s.outbox.set_owner('bench')
+    s.outbox.headers_provider = lambda: s.headers
+    for i in range(20):
+        s.outbox.enqueue('general', 'bench', f"Mensaje de prueba {i}")
+    while s.outbox.messages('general'):
+        enviados, fallidos = s.outbox.flush()
+        if fallidos:
+            raise RuntimeError('Falló el envío de la bandeja de salida')
+
+
+def flujo_personnel(s):
+    s.personnel.store.clear()
+    # on_done llega una vez por colección: usar una espera propia para que
+    # la segunda entrega no se confunda con la del alta
+    carga = Espera()
+    s.personnel.load(
+        on_done=lambda store: carga.ok(store) if len(store) else None,
+        on_error=carga.fallo, headers=s.headers
+    )
+    carga.esperar()
+
+    espera = Espera()
+    s.personnel.create_employee(
+        {'nombre': 'Bench', 'apellido': 'Prueba', 'cuadrilla_id': 1},
+        on_done=espera.ok, on_error=espera.fallo, headers=s.headers
+    )
+    empleado = espera.esperar()
+    espera = Espera()
+    s.personnel.update_employee(
+        empleado['id'], {'apellido': 'Editado'},
+        on_done=espera.ok, on_error=espera.fallo, headers=s.headers
+    )
+    espera.esperar()
+    espera = Espera()
+    s.personnel.delete_employee(empleado['id'], on_done=espera.ok, on_error=espera.fallo, headers=s.headers)
+    espera.esperar()
+
+
+def flujo_personnel_search(s):
+    if not len(s.personnel.store):
+        flujo_personnel(s)
+    for consulta in ('j', 'jo', 'jos', 'jose p', 'maria go', 'v1000', ''):
+        s.personnel.store.search(consulta)
+        s.personnel.store.search(consulta, cuadrilla_id=1)
+
+
+def flujo_report(s):
+    for filtros in (None, {'cuadrilla': 'Cuadrilla 1'}, {'tipo': 'limpieza'}):
+        espera = Espera()
+        s.reports.load(
+            'actividad', on_done=espera.ok, on_error=espera.fallo,
+            desde='2024-01-01', hasta='2024-01-31', filtros=filtros, headers=s.headers
+        )
+        espera.esperar()
+
+
+def flujo_tab_switch(s):
+    # Lo que hace MainLayout.switch_screen: cancelar lo pendiente de la
+    # pestaña anterior y cargar los datos de la nueva
+    for anterior, pestana in (('chat', 'personal'), ('personal', 'reportes'), ('reportes', 'chat')):
+        s.executor.cancel_group(f"tab:{anterior}")
+        espera = Espera()
+        # espera=espera: las entregas tardías deben ir a la espera de su pestaña
+        if pestana == 'chat':
+            s.chat.load_channels(lambda canales, desde_cache, espera=espera: espera.ok(),
+                                 on_error=espera.fallo, headers=s.headers)
+        elif pestana == 'personal':
+            s.personnel.load(on_done=lambda store, espera=espera: espera.ok(),
+                             on_error=espera.fallo, headers=s.headers)
+        else:
+            s.reports.load('general', on_done=espera.ok, on_error=espera.fallo, headers=s.headers)
+        espera.esperar()
+
+
+def flujo_logout(s):
+    from services.session_teardown import release_user_state
+    release_user_state(
+        sync=s.sync, outbox=s.outbox, executor=s.executor, personnel=s.personnel,
+        scheduler=s.scheduler, images=s.images, client=s.client, session=s.session,
+        cache=s.cache, reports=s.reports
+    )
+    s.token = s.headers = None
+
+
+FLOW_FUNCS = {nombre: globals()[f"flujo_{nombre}"] for nombre in FLOWS}
+
+
+# --- Ejecución --------------------------------------------------------------
+
+def preparar(s, flujo):
+    """Deja la sesión en el estado que el flujo necesita"""
+    if flujo != 'login':
+        flujo_login(s)
+    if flujo == 'personnel_search':
+        flujo_personnel(s)
+
+
+def medir_services(url, flujos, runs):
+    """
+    Ejecuta cada flujo runs veces con una sesión nueva (arranque en frío) y
+    una vez más bajo tracemalloc para medir memoria
+
+    Returns:
+        dict: flujo -> {'ms': [...], 'peak_kb', 'alloc_kb', 'blocks'}
+    """
+    resultados = {}
+    for flujo in flujos:
+        funcion = FLOW_FUNCS[flujo]
+        tiempos = []
+        for _ in range(runs + 1):
+            datos_dir = tempfile.mkdtemp(prefix='bench_e2e_')
+            s = Sesion(url, datos_dir)
+            try:
+                preparar(s, flujo)
+                inicio = time.perf_counter()
+                funcion(s)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            finally:
+                s.close()
+                shutil.rmtree(datos_dir, ignore_errors=True)
+        # La primera ejecución calienta importaciones y conexiones
+        resultados[flujo] = {'ms': tiempos[1:]}
+
+        datos_dir = tempfile.mkdtemp(prefix='bench_e2e_')
+        s = Sesion(url, datos_dir)
+        try:
+            preparar(s, flujo)
+            tracemalloc.start()
+            antes = tracemalloc.take_snapshot()
+            funcion(s)
+            despues = tracemalloc.take_snapshot()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            s.close()
+            shutil.rmtree(datos_dir, ignore_errors=True)
+
+        diferencias = despues.compare_to(antes, 'filename')
+        resultados[flujo].update({
+            'peak_kb': pico / 1024,
+            'alloc_kb': sum(d.size_diff for d in diferencias if d.size_diff > 0) / 1024,
+            'blocks': sum(d.count_diff for d in diferencias if d.count_diff > 0),
+        })
+        print(f"⏱️ {flujo}: mediana {statistics.median(resultados[flujo]['ms']):.1f} ms")
+    return resultados
+
+
+def medir_apps(url, headless, timeout):
+    """Ejecuta cada app en un subproceso con --app-child y junta sus resultados"""
+    resultados = {}
+    for modulo in ('main', 'main_original'):
+        fd, salida = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        env = dict(os.environ)
+        env.update({'API_URL': url, 'KIVY_NO_ARGS': '1', 'KIVY_NO_CONSOLELOG': '1'})
+        env['CORPOTACHIRA_DATA_DIR'] = tempfile.mkdtemp(prefix='bench_e2e_app_')
+        if headless:
+            env['SDL_VIDEODRIVER'] = 'dummy'
+        try:
+            proceso = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--app-child', modulo, '--output', salida],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                timeout=timeout
+            )
+            if proceso.returncode != 0 or os.path.getsize(salida) == 0:
+                error = proceso.stderr.decode('utf-8', 'replace').strip().splitlines()
+                print(f"❌ {modulo} terminó con código {proceso.returncode}: {error[-1] if error else ''}")
+                continue
+            with open(salida, encoding='utf-8') as f:
+                for flujo, datos in json.load(f).items():
+                    resultados[f"{modulo}.{flujo}"] = datos
+        except subprocess.TimeoutExpired:
+            print(f"❌ {modulo} no terminó en {timeout}s")
+        finally:
+            os.remove(salida)
+            shutil.rmtree(env['CORPOTACHIRA_DATA_DIR'], ignore_errors=True)
+    return resultados
+
+
+def app_child(modulo, salida):
+    """
+    Proceso hijo: arranca la app y la conduce paso a paso con el Clock,
+    midiendo cada paso síncrono de la UI
+    """
+    tracemalloc.start()
+    from kivy.clock import Clock
+    app_module = __import__(modulo)
+    from services.metrics import memory_usage
+
+    tiempos = {}
+
+    def medir(nombre, funcion, *args):
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.setdefault(nombre, []).append((time.perf_counter() - inicio) * 1000)
+
+    if modulo == 'main':
+        app = app_module.CorpotachiraApp()
+
+        def pasos():
+            for _ in range(5):
+                listo = threading.Event()
+                inicio = time.perf_counter()
+
+                def al_comprobar(snapshot, inicio=inicio, listo=listo):
+                    tiempos.setdefault('connection_check', []).append((time.perf_counter() - inicio) * 1000)
+                    listo.set()
+
+                app.health.check_now(callback=al_comprobar)
+                while not listo.is_set():
+                    yield 0.01
+                medir('message_append', app.message_log.extend, [f"línea {i}" for i in range(100)])
+    else:
+        app = app_module.EmpresaLimpiezaApp()
+
+        def pasos():
+            for _ in range(3):
+                respuesta = app_module.get_api_client().post('/api/auth/login', json={
+                    'usuario': 'bench', 'password': 'bench', 'nivel': 'admin'
+                })
+                datos = respuesta.json()
+                app.token_sesion = datos['token']
+                app.nivel_usuario = datos['nivel']
+                app.nombre_usuario = datos['usuario']
+                medir('login', app.navegar_a_principal_segun_nivel)
+                yield 0.5
+                main_layout = app.root.screen_manager.get_screen('main').main_layout
+                for pestana in list(main_layout.bottom_nav.visible_tabs) * 2:
+                    medir('tab_switch', main_layout.switch_screen, pestana)
+                    yield 0.05
+                medir('logout', app.logout)
+                yield 0.2
+
+    def terminar():
+        _, pico = tracemalloc.get_traced_memory()
+        resultado = {flujo: {'ms': valores} for flujo, valores in tiempos.items()}
+        resultado['process'] = {
+            'peak_kb': pico / 1024,
+            'rss_kb': memory_usage().get('rss_bytes', 0) / 1024,
+        }
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f)
+        app.stop()
+
+    def on_start(*args):
+        iterador = pasos()
+
+        def siguiente(dt):
+            try:
+                espera = next(iterador)
+            except StopIteration:
+                terminar()
+                return
+            Clock.schedule_once(siguiente, espera)
+
+        Clock.schedule_once(siguiente, 1)
+
+    app.bind(on_start=on_start)
+    app.run()
+
+
+def summarize(resultados):
+    """
+    Returns:
+        dict: Métrica -> {'median', 'p90', 'p99', 'runs', 'unit'}
+    """
+    resumen = {}
+    for flujo, datos in sorted(resultados.items()):
+        valores = datos.get('ms')
+        if valores:
+            resumen[f"flow:{flujo}"] = {
+                'median': round(statistics.median(valores), 2),
+                'p90': round(percentile(valores, 90), 2),
+                'p99': round(percentile(valores, 99), 2),
+                'runs': len(valores),
+                'unit': 'ms',
+            }
+        for clave, unidad in (('peak_kb', 'kb'), ('alloc_kb', 'kb'), ('rss_kb', 'kb'), ('blocks', 'blocks')):
+            if clave in datos:
+                valor = round(datos[clave], 1)
+                resumen[f"mem:{flujo}:{clave}"] = {
+                    'median': valor, 'p90': valor, 'p99': valor, 'runs': 1, 'unit': unidad
+                }
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de extremo a extremo contra el backend local')
+    parser.add_argument('--mode', choices=('services', 'apps'), default='services')
+    parser.add_argument('--flows', default=','.join(FLOWS), help='Flujos separados por comas (modo services)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=20, help='Latencia simulada por respuesta')
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--mensajes', type=int, default=500, help='Mensajes iniciales por canal')
+    parser.add_argument('--largo-texto', type=int, default=80)
+    parser.add_argument('--empleados', type=int, default=300)
+    parser.add_argument('--filas-reporte', type=int, default=5000)
+    parser.add_argument('--headless', action='store_true', help='Usar SDL_VIDEODRIVER=dummy (modo apps)')
+    parser.add_argument('--timeout', type=float, default=180, help='Espera máxima por app (modo apps)')
+    parser.add_argument('--baseline', help='Archivo de línea base (por defecto tools/baselines/e2e_<modo>.json)')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Empeoramiento relativo permitido')
+    parser.add_argument('--min-delta-ms', type=float, default=5, help='Empeoramiento absoluto mínimo en ms')
+    parser.add_argument('--min-delta-kb', type=float, default=256, help='Empeoramiento absoluto mínimo en KB')
+    parser.add_argument('--app-child', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.app_child:
+        app_child(args.app_child, args.output)
+        return 0
+
+    backend = StubBackend(
+        mensajes=args.mensajes, largo_texto=args.largo_texto, empleados=args.empleados,
+        filas_reporte=args.filas_reporte, latencia=args.latency_ms / 1000, jitter=args.jitter_ms / 1000
+    )
+    server, url = start_in_thread(backend=backend)
+    print(f"✅ Backend de pruebas en {url} ({args.latency_ms:.0f} ms de latencia)")
+
+    try:
+        if args.mode == 'apps':
+            resultados = medir_apps(url, args.headless, args.timeout)
+        else:
+            flujos = [f for f in args.flows.split(',') if f]
+            desconocidos = [f for f in flujos if f not in FLOW_FUNCS]
+            if desconocidos:
+                parser.error(f"Flujos desconocidos: {', '.join(desconocidos)}")
+            os.environ.setdefault('CORPOTACHIRA_DATA_DIR', tempfile.mkdtemp(prefix='bench_e2e_'))
+            resultados = medir_services(url, flujos, args.runs)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if not resultados:
+        print("❌ Ningún flujo produjo resultados")
+        return 2
+
+    resumen = summarize(resultados)
+    print(f"\n{'Métrica':<44}{'mediana':>12}{'p90':>12}{'p99':>12}")
+    for metrica, valores in resumen.items():
+        print(f"{metrica:<44}{valores['median']:>12.1f}{valores['p90']:>12.1f}{valores['p99']:>12.1f} {valores['unit']}")
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"e2e_{args.mode}.json")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=2)
+        print(f"\n✅ Línea base guardada en {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"\n⚠️ Sin línea base en {baseline_path}; usar --save-baseline")
+        return 0
+
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regresiones = []
+    for unidad, min_delta in (('ms', args.min_delta_ms), ('kb', args.min_delta_kb)):
+        regresiones += [
+            (metrica, base, actual, unidad)
+            for metrica, base, actual in compare(
+                {m: v for m, v in resumen.items() if v['unit'] == unidad},
+                baseline, args.tolerance, min_delta
+            )
+        ]
+    for metrica, base, actual, unidad in regresiones:
+        print(f"❌ Regresión en {metrica}: {base:.1f} {unidad} -> {actual:.1f} {unidad}")
+    if not regresiones:
+        print("\n✅ Sin regresiones respecto a la línea base")
+    return 1 if regresiones else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
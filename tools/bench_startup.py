@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío
+Lanza la app varias veces con el perfilador de arranque activo, resume
+las fases y los hitos (mediana y p90) y los compara con una línea base.
+
+Uso:
+    python tools/bench_startup.py --entry main.py --runs 10
+    python tools/bench_startup.py --entry main_original.py --save-baseline
+    xvfb-run -a python tools/bench_startup.py --entry main.py
+
+Sin pantalla, ejecutar bajo xvfb-run (o con --headless para usar el
+driver de vídeo dummy de SDL si la plataforma lo soporta).
+Sale con código 1 si alguna métrica empeora más que la tolerancia.
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(ROOT, 'tools', 'baselines')
+
+
+def percentile(values, pct):
+    """Percentil por el método del rango más cercano"""
+    ordenados = sorted(values)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(pct / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def run_once(entry, headless, timeout):
+    """
+    Ejecuta la app una vez y devuelve su informe de arranque
+
+    Returns:
+        dict: Informe del perfilador más 'wall_ms', o None si falló
+    """
+    fd, output = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    env = dict(os.environ)
+    env.update({
+        'CORPOTACHIRA_STARTUP_PROFILE': '1',
+        'CORPOTACHIRA_STARTUP_PROFILE_EXIT': '1',
+        'CORPOTACHIRA_STARTUP_PROFILE_OUTPUT': output,
+        'CORPOTACHIRA_STARTUP_PROFILE_TIMEOUT': str(timeout),
+        'KIVY_NO_ARGS': '1',
+        'KIVY_NO_CONSOLELOG': '1',
+    })
+    if headless:
+        env['SDL_VIDEODRIVER'] = 'dummy'
+
+    inicio = time.perf_counter()
+    try:
+        proceso = subprocess.run(
+            [sys.executable, entry], cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            timeout=timeout + 30
+        )
+        wall_ms = (time.perf_counter() - inicio) * 1000
+        if proceso.returncode != 0 or os.path.getsize(output) == 0:
+            error = proceso.stderr.decode('utf-8', 'replace').strip().splitlines()
+            print(f"❌ {entry} terminó con código {proceso.returncode}: {error[-1] if error else ''}")
+            return None
+        with open(output, encoding='utf-8') as f:
+            informe = json.load(f)
+        informe['wall_ms'] = round(wall_ms, 2)
+        return informe
+    except subprocess.TimeoutExpired:
+        print(f"❌ {entry} no terminó en {timeout + 30}s")
+        return None
+    finally:
+        os.remove(output)
+
+
+def summarize(informes):
+    """
+    Agrupa las métricas de varias ejecuciones
+
+    Returns:
+        dict: Métrica -> {'median', 'p90', 'runs'} en milisegundos
+    """
+    muestras = {}
+    for informe in informes:
+        for fase in informe['phases']:
+            muestras.setdefault(f"phase:{fase['name']}", []).append(fase['duration_ms'])
+        for hito, valor in informe['marks'].items():
+            muestras.setdefault(f"mark:{hito}", []).append(valor)
+        muestras.setdefault('wall_ms', []).append(informe['wall_ms'])
+
+    return {
+        metrica: {
+            'median': round(statistics.median(valores), 2),
+            'p90': round(percentile(valores, 90), 2),
+            'runs': len(valores)
+        }
+        for metrica, valores in sorted(muestras.items())
+    }
+
+
+def compare(resumen, baseline, tolerance, min_delta_ms):
+    """
+    Compara la mediana de cada métrica con la línea base
+
+    Returns:
+        list: Métricas que empeoraron (nombre, base, actual)
+    """
+    regresiones = []
+    for metrica, valores in resumen.items():
+        base = baseline.get(metrica)
+        if not base:
+            continue
+        actual = valores['median']
+        if actual > base['median'] * (1 + tolerance) and actual - base['median'] > min_delta_ms:
+            regresiones.append((metrica, base['median'], actual))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de arranque en frío')
+    parser.add_argument('--entry', default='main.py', help='Punto de entrada (main.py o main_original.py)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60, help='Espera máxima de los hitos por ejecución')
+    parser.add_argument('--headless', action='store_true', help='Usar SDL_VIDEODRIVER=dummy')
+    parser.add_argument('--baseline', help='Archivo de línea base (por defecto tools/baselines/startup_<entry>.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar el resultado como nueva línea base')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Empeoramiento relativo permitido')
+    parser.add_argument('--min-delta-ms', type=float, default=5, help='Empeoramiento absoluto mínimo para fallar')
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or os.path.join(
+        BASELINE_DIR, f"startup_{os.path.splitext(args.entry)[0]}.json"
+    )
+
+    informes = []
+    for i in range(args.runs):
+        informe = run_once(args.entry, args.headless, args.timeout)
+        if informe:
+            informes.append(informe)
+            print(f"⏱️ Ejecución {i + 1}/{args.runs}: {informe['wall_ms']:.0f} ms")
+
+    if not informes:
+        print("❌ Ninguna ejecución produjo informe")
+        return 2
+
+    resumen = summarize(informes)
+    print(f"\n{'Métrica':<40}{'mediana':>12}{'p90':>12}")
+    for metrica, valores in resumen.items():
+        print(f"{metrica:<40}{valores['median']:>12.1f}{valores['p90']:>12.1f}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=2)
+        print(f"\n✅ Línea base guardada en {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"\n⚠️ Sin línea base en {baseline_path}; usar --save-baseline")
+        return 0
+
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regresiones = compare(resumen, baseline, args.tolerance, args.min_delta_ms)
+    for metrica, base, actual in regresiones:
+        print(f"❌ Regresión en {metrica}: {base:.1f} ms -> {actual:.1f} ms")
+    if not regresiones:
+        print("\n✅ Sin regresiones respecto a la línea base")
+    return 1 if regresiones else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
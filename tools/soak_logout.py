@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Prueba de resistencia de login/logout
+Repite cientos de ciclos de login, uso de la app (chat, mensajes,
+personal, reportes) y logout como en un teléfono compartido por una
+cuadrilla, y comprueba que la memoria se mantiene plana: compara la
+memoria tras el calentamiento con la de los últimos ciclos.
+
+Modos:
+    services  Los ciclos sobre los servicios, con el backend local en otro
+              proceso para que su estado no cuente (por defecto). Mide los
+              bloques vivos del heap de Python y la memoria residente
+    app       Conduce EmpresaLimpiezaApp con el Clock de Kivy (requiere
+              Kivy/KivyMD; sin pantalla, usar xvfb-run o --headless). Mide
+              la memoria residente y el número de widgets
+
+Uso:
+    python tools/soak_logout.py --cycles 300
+    xvfb-run -a python tools/soak_logout.py --mode app --cycles 200
+
+Sale con código 1 si la memoria crece más que la tolerancia.
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+for ruta in (ROOT, TOOLS):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def arrancar_backend(args):
+    """
+    Arranca tools/stub_server.py en un subproceso
+
+    Returns:
+        tuple: (proceso, URL base)
+    """
+    puerto = puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, os.path.join(TOOLS, 'stub_server.py'), '--port', str(puerto),
+         '--mensajes', str(args.mensajes), '--empleados', str(args.empleados),
+         '--filas-reporte', str(args.filas_reporte), '--latency-ms', str(args.latency_ms)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=0.2).close()
+            return proceso, f"http://127.0.0.1:{puerto}"
+        except OSError:
+            if proceso.poll() is not None:
+                break
+            time.sleep(0.1)
+    proceso.kill()
+    raise RuntimeError('El backend local no arrancó')
+
+
+def rss_kb():
+    from services.metrics import memory_usage
+    return memory_usage().get('rss_bytes', 0) / 1024
+
+
+# --- Modo services -----------------------------------------------------------
+
+def ciclos_services(url, ciclos, datos_dir):
+    """
+    Ejecuta los ciclos sobre una misma sesión de servicios (un solo
+    proceso de app a lo largo de muchos usuarios)
+
+    Returns:
+        dict: Serie -> muestras por ciclo
+    """
+    from bench_e2e import (
+        Espera, Sesion, flujo_login, flujo_logout, flujo_message_load,
+        flujo_personnel, flujo_report
+    )
+
+    def usar_chat(s):
+        # La caché HTTP del usuario sobrevive a su logout y el soak vuelve a
+        # entrar con el mismo: vale la primera entrega, sea de la caché o de
+        # la red
+        espera = Espera()
+        s.chat.load_channels(lambda canales, desde_cache: espera.ok(canales),
+                             on_error=espera.fallo, headers=s.headers)
+        canales = espera.esperar()
+        espera = Espera()
+        s.chat.load_messages(canales[0], lambda mensajes, desde_cache: espera.ok(mensajes),
+                             on_error=espera.fallo, headers=s.headers)
+        espera.esperar()
+
+    s = Sesion(url, datos_dir)
+    # Se cuentan bloques y no bytes: tablas que crecen de una vez (p. ej.
+    # la de cadenas internadas) cambian de tamaño sin que sea una fuga
+    muestras = {'blocks': [], 'rss_kb': [], 'cycle_ms': []}
+    try:
+        for ciclo in range(ciclos):
+            inicio = time.perf_counter()
+            flujo_login(s)
+            usar_chat(s)
+            flujo_message_load(s)
+            flujo_personnel(s)
+            flujo_report(s)
+            flujo_logout(s)
+            muestras['cycle_ms'].append((time.perf_counter() - inicio) * 1000)
+
+            gc.collect()
+            muestras['blocks'].append(sys.getallocatedblocks())
+            muestras['rss_kb'].append(rss_kb())
+            if (ciclo + 1) % 50 == 0:
+                print(f"🔁 {ciclo + 1} ciclos · bloques {muestras['blocks'][-1]}"
+                      f" · rss {muestras['rss_kb'][-1] / 1024:.1f} MB")
+    finally:
+        s.close()
+    return muestras
+
+
+# --- Modo app ----------------------------------------------------------------
+
+def ciclos_app(url, ciclos, headless):
+    """
+    Conduce EmpresaLimpiezaApp con el Clock: login, recorrido de pestañas y
+    logout en cada ciclo
+
+    Returns:
+        dict: Serie -> muestras por ciclo
+    """
+    os.environ.update({'API_URL': url, 'KIVY_NO_ARGS': '1', 'KIVY_NO_CONSOLELOG': '1'})
+    if headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+
+    import main_original
+    from services.metrics import count_widgets
+
+    app = main_original.EmpresaLimpiezaApp()
+    muestras = {'rss_kb': [], 'widgets': [], 'cycle_ms': []}
+
+    def pasos():
+        for ciclo in range(ciclos):
+            inicio = time.perf_counter()
+            respuesta = main_original.get_api_client().post('/api/auth/login', json={
+                'usuario': f"obrero{ciclo % 23}", 'password': 'soak',
+                'nivel': ('admin', 'moderador', 'obrero')[ciclo % 3]
+            })
+            datos = respuesta.json()
+            app.token_sesion = datos['token']
+            app.nivel_usuario = datos['nivel']
+            app.nombre_usuario = datos['usuario']
+            app.navegar_a_principal_segun_nivel()
+            yield 0.3
+            main_layout = app.root.screen_manager.get_screen('main').main_layout
+            for pestana in list(main_layout.bottom_nav.visible_tabs):
+                main_layout.switch_screen(pestana)
+                yield 0.1
+            app.logout()
+            yield 0.1
+            muestras['cycle_ms'].append((time.perf_counter() - inicio) * 1000)
+            gc.collect()
+            muestras['rss_kb'].append(rss_kb())
+            muestras['widgets'].append(count_widgets(Window))
+            if (ciclo + 1) % 25 == 0:
+                print(f"🔁 {ciclo + 1} ciclos · rss {muestras['rss_kb'][-1] / 1024:.1f} MB"
+                      f" · widgets {muestras['widgets'][-1]}")
+
+    def on_start(*args):
+        iterador = pasos()
+
+        def siguiente(dt):
+            try:
+                espera = next(iterador)
+            except StopIteration:
+                app.stop()
+                return
+            Clock.schedule_once(siguiente, espera)
+
+        Clock.schedule_once(siguiente, 1)
+
+    app.bind(on_start=on_start)
+    app.run()
+    return muestras
+
+
+# --- Evaluación ----------------------------------------------------------------
+
+def crecimiento(valores, calentamiento, ventana):
+    """
+    Diferencia entre la mediana de los últimos ciclos y la de los ciclos
+    justo después del calentamiento
+
+    Returns:
+        tuple: (inicial, final, crecimiento) o None si no hay ciclos suficientes
+    """
+    if len(valores) < calentamiento + 2 * ventana:
+        return None
+    inicial = statistics.median(valores[calentamiento:calentamiento + ventana])
+    final = statistics.median(valores[-ventana:])
+    return inicial, final, final - inicial
+
+
+def evaluar(muestras, limites, calentamiento, ventana):
+    """
+    Compara el crecimiento de cada serie con su límite
+
+    Returns:
+        bool: True si ninguna serie creció más de lo permitido
+    """
+    ok = True
+    for serie, limite in limites.items():
+        resultado = crecimiento(muestras.get(serie, []), calentamiento, ventana)
+        if resultado is None:
+            continue
+        inicial, final, delta = resultado
+        estado = '✅' if delta <= limite else '❌'
+        ok = ok and delta <= limite
+        print(f"{estado} {serie:<10} {inicial:>12.1f} → {final:>12.1f}  (+{delta:.1f}, límite {limite})")
+    tiempos = muestras.get('cycle_ms')
+    if tiempos:
+        print(f"⏱️ ciclo: mediana {statistics.median(tiempos):.0f} ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de resistencia de login/logout')
+    parser.add_argument('--mode', choices=('services', 'app'), default='services')
+    parser.add_argument('--cycles', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=30, help='Ciclos iniciales que no cuentan')
+    parser.add_argument('--window', type=int, default=20, help='Ciclos promediados al inicio y al final')
+    parser.add_argument('--max-block-growth', type=float, default=2000,
+                        help='Bloques de memoria de Python vivos')
+    parser.add_argument('--max-rss-growth-kb', type=float, default=4096)
+    parser.add_argument('--max-widget-growth', type=float, default=0)
+    parser.add_argument('--mensajes', type=int, default=300)
+    parser.add_argument('--empleados', type=int, default=300)
+    parser.add_argument('--filas-reporte', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--headless', action='store_true', help='Usar SDL_VIDEODRIVER=dummy (modo app)')
+    parser.add_argument('--output', help='Guardar las muestras en este JSON')
+    args = parser.parse_args()
+
+    datos_dir = tempfile.mkdtemp(prefix='soak_logout_')
+    os.environ['CORPOTACHIRA_DATA_DIR'] = datos_dir
+    backend, url = arrancar_backend(args)
+    try:
+        if args.mode == 'services':
+            muestras = ciclos_services(url, args.cycles, datos_dir)
+        else:
+            muestras = ciclos_app(url, args.cycles, args.headless)
+    finally:
+        backend.terminate()
+        backend.wait()
+        shutil.rmtree(datos_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(muestras, f)
+
+    limites = {
+        'blocks': args.max_block_growth,
+        'rss_kb': args.max_rss_growth_kb,
+        'widgets': args.max_widget_growth,
+    }
+    print(f"\n{args.cycles} ciclos ({args.mode}), calentamiento {args.warmup}:")
+    return 0 if evaluar(muestras, limites, args.warmup, args.window) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Backend local de pruebas
+Implementa en memoria los endpoints del README para probar la app y los
+servicios sin red:
+
+    GET  /                  Estado del servidor
+    GET  /canales           Lista de canales
+    POST /crear_canal       Crea un canal {"nombre": ...}
+    GET  /mensajes/{canal}  Mensajes; admite ?since_id=, ?since= y ?wait= (long-polling)
+    POST /enviar            Envía {"canal", "usuario", "texto"}; respeta Idempotency-Key
+    GET|POST /api/personnel/{empleados|cuadrillas}        Lista o alta
+    PUT|DELETE /api/personnel/{empleados|cuadrillas}/{id} Edición o baja
+    GET  /api/reports/{nombre}  Filas de un reporte; admite ?desde=, ?hasta=, ?page= y ?page_size=
+    POST /api/auth/login    Devuelve un token {"usuario", "password", "nivel"}
+    GET  /api/auth/verify   200 si el token Bearer es válido, 401 si no
+
+Las respuestas se comprimen con gzip o deflate según Accept-Encoding y se
+envían en MessagePack si Accept lo pide y msgpack está instalado, como
+negocia el cliente de la app.
+
+La latencia y el tamaño de los datos iniciales son configurables para
+los benchmarks (ver --help).
+
+Uso:
+    python tools/stub_server.py --port 8000 --latency-ms 80 --empleados 300
+    API_URL=http://127.0.0.1:8000 python main.py
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import uuid
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+REPORT_NAMES = ('general', 'cuadrillas', 'actividad')
+PERSONNEL_COLLECTIONS = ('empleados', 'cuadrillas')
+
+MSGPACK_TYPE = 'application/x-msgpack'
+COMPRESS_MIN_BYTES = 256  # Por debajo la cabecera gzip no compensa
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+NOMBRES = ('José', 'María', 'Ángel', 'Luis', 'Ana', 'Carmen', 'Jesús', 'Rosa', 'Pedro', 'Yolanda')
+APELLIDOS = ('Pérez', 'Gómez', 'Rodríguez', 'Núñez', 'Contreras', 'Ramírez', 'Molina', 'Chacón')
+
+
+def generar_filas_reporte(nombre, total, inicio=date(2024, 1, 1)):
+    """
+    Filas deterministas de un reporte, repartidas en días consecutivos
+
+    Returns:
+        list: Filas ordenadas por fecha
+    """
+    filas = []
+    for i in range(total):
+        dia = inicio + timedelta(days=i // 50)
+        filas.append({
+            'id': i + 1,
+            'fecha': f"{dia.isoformat()}T{8 + i % 10:02d}:00:00",
+            'cuadrilla': f"Cuadrilla {i % 5 + 1}",
+            'usuario': f"obrero{i % 23}",
+            'tipo': ('limpieza', 'mantenimiento', 'inspeccion')[i % 3],
+            'estado': ('completado', 'pendiente')[i % 4 == 0],
+            'horas': 1 + i % 8,
+            'reporte': nombre,
+        })
+    return filas
+
+
+class StubBackend:
+    """Estado en memoria del backend simulado"""
+
+    def __init__(self, canales=('general',), filas_reporte=2000, mensajes=0,
+                 largo_texto=40, empleados=0, cuadrillas=5, latencia=0.0, jitter=0.0,
+                 comprimir=True, usar_msgpack=True):
+        """
+        Args:
+            canales (tuple): Canales iniciales
+            filas_reporte (int): Filas de cada reporte
+            mensajes (int): Mensajes iniciales por canal
+            largo_texto (int): Caracteres del texto de los mensajes iniciales
+            empleados (int): Empleados iniciales
+            cuadrillas (int): Cuadrillas iniciales
+            latencia (float): Segundos añadidos a cada respuesta
+            jitter (float): Segundos aleatorios extra (0..jitter) por respuesta
+            comprimir (bool): Atender Accept-Encoding (gzip/deflate)
+            usar_msgpack (bool): Atender Accept: application/x-msgpack
+        """
+        self.canales = list(canales)
+        self.mensajes = {canal: [] for canal in self.canales}
+        self.next_id = 1
+        self.idempotencia = {}
+        self.cond = threading.Condition()
+        self.reportes = {
+            nombre: generar_filas_reporte(nombre, filas_reporte) for nombre in REPORT_NAMES
+        }
+        self.peticiones_reportes = 0
+        self.latencia = latencia
+        self.jitter = jitter
+        self.comprimir = comprimir
+        self.usar_msgpack = usar_msgpack and msgpack is not None
+        self.bytes_enviados = 0
+        self.stats_lock = threading.Lock()
+        self.tokens = {}
+        self.personal = {coleccion: {} for coleccion in PERSONNEL_COLLECTIONS}
+        self.next_personal_id = 1
+
+        for canal in self.canales:
+            for i in range(mensajes):
+                texto = (f"Mensaje {i} " + 'x' * largo_texto)[:largo_texto]
+                self.enviar(canal, f"usuario{i % 7}", texto)
+        for i in range(cuadrillas):
+            self.crear_item('cuadrillas', {'nombre': f"Cuadrilla {i + 1}"})
+        for i in range(empleados):
+            self.crear_item('empleados', {
+                'nombre': NOMBRES[i % len(NOMBRES)],
+                'apellido': APELLIDOS[(i // len(NOMBRES)) % len(APELLIDOS)],
+                'cedula': f"V{10000000 + i}",
+                'cuadrilla_id': 1 + i % cuadrillas if cuadrillas else None,
+            })
+
+    def esperar_latencia(self):
+        """Simula la latencia de red configurada"""
+        espera = self.latencia + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if espera > 0:
+            time.sleep(espera)
+
+    def login(self, usuario, nivel='admin'):
+        token = uuid.uuid4().hex
+        with self.cond:
+            self.tokens[token] = {'usuario': usuario, 'nivel': nivel}
+        return token
+
+    def verificar(self, token):
+        with self.cond:
+            return self.tokens.get(token)
+
+    def logout(self, token):
+        with self.cond:
+            self.tokens.pop(token, None)
+
+    def listar(self, coleccion):
+        with self.cond:
+            return list(self.personal[coleccion].values())
+
+    def crear_item(self, coleccion, datos):
+        with self.cond:
+            item = dict(datos, id=self.next_personal_id)
+            self.next_personal_id += 1
+            self.personal[coleccion][item['id']] = item
+            return item
+
+    def actualizar_item(self, coleccion, item_id, datos):
+        with self.cond:
+            item = self.personal[coleccion].get(item_id)
+            if item is None:
+                return None
+            item.update({k: v for k, v in datos.items() if k != 'id'})
+            return dict(item)
+
+    def eliminar_item(self, coleccion, item_id):
+        with self.cond:
+            return self.personal[coleccion].pop(item_id, None)
+
+    def crear_canal(self, nombre):
+        with self.cond:
+            if nombre in self.mensajes:
+                return False
+            self.canales.append(nombre)
+            self.mensajes[nombre] = []
+            return True
+
+    def enviar(self, canal, usuario, texto, key=None):
+        with self.cond:
+            if key is not None and key in self.idempotencia:
+                return self.idempotencia[key]
+            if canal not in self.mensajes:
+                return None
+            mensaje = {
+                'id': self.next_id,
+                'canal': canal,
+                'usuario': usuario,
+                'texto': texto,
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }
+            self.next_id += 1
+            self.mensajes[canal].append(mensaje)
+            if key is not None:
+                self.idempotencia[key] = mensaje
+            self.cond.notify_all()
+            return mensaje
+
+    def leer(self, canal, since_id=None, since=None, wait=0):
+        """
+        Mensajes posteriores al cursor; con wait retiene la petición hasta
+        que llegue alguno o se agote el tiempo
+
+        Returns:
+            list: Mensajes o None si el canal no existe
+        """
+        limite = time.monotonic() + wait
+        with self.cond:
+            while True:
+                if canal not in self.mensajes:
+                    return None
+                mensajes = self.mensajes[canal]
+                if since_id is not None:
+                    mensajes = [m for m in mensajes if m['id'] > since_id]
+                elif since is not None:
+                    mensajes = [m for m in mensajes if m['timestamp'] > since]
+                restante = limite - time.monotonic()
+                if mensajes or restante <= 0:
+                    return list(mensajes)
+                self.cond.wait(restante)
+
+    def reporte(self, nombre, desde=None, hasta=None, page=1, page_size=500):
+        """
+        Página de un reporte filtrado por fechas
+
+        Returns:
+            tuple: (filas, página siguiente o None) o None si no existe
+        """
+        filas = self.reportes.get(nombre)
+        if filas is None:
+            return None
+        with self.cond:
+            self.peticiones_reportes += 1
+        if desde:
+            filas = [f for f in filas if f['fecha'][:10] >= desde]
+        if hasta:
+            filas = [f for f in filas if f['fecha'][:10] <= hasta]
+        inicio = (page - 1) * page_size
+        pagina = filas[inicio:inicio + page_size]
+        siguiente = page + 1 if inicio + page_size < len(filas) else None
+        return pagina, siguiente
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Traduce las peticiones HTTP a operaciones de StubBackend"""
+
+    backend = None
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo salen en escrituras separadas: sin esto Nagle y el
+    # ACK retardado añaden ~40 ms a cada respuesta en loopback
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, data, headers=None):
+        """Envía data en JSON o MessagePack, comprimido si el cliente lo acepta"""
+        if self.backend.usar_msgpack and MSGPACK_TYPE in (self.headers.get('Accept') or ''):
+            tipo, body = MSGPACK_TYPE, msgpack.packb(data, use_bin_type=True)
+        else:
+            tipo, body = 'application/json', json.dumps(data, ensure_ascii=False).encode('utf-8')
+        codificacion = self.negotiate_encoding() if len(body) >= COMPRESS_MIN_BYTES else None
+        if codificacion == 'gzip':
+            body = gzip.compress(body, 6)
+        elif codificacion == 'deflate':
+            body = zlib.compress(body, 6)
+
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept, Accept-Encoding')
+        if codificacion:
+            self.send_header('Content-Encoding', codificacion)
+        for nombre, valor in (headers or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.backend.stats_lock:
+            self.backend.bytes_enviados += len(body)
+
+    def negotiate_encoding(self):
+        """
+        Returns:
+            str: 'gzip', 'deflate' o None según Accept-Encoding
+        """
+        if not self.backend.comprimir:
+            return None
+        aceptadas = set()
+        for parte in (self.headers.get('Accept-Encoding') or '').split(','):
+            nombre, _, parametros = parte.strip().partition(';')
+            if parametros.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+                continue
+            aceptadas.add(nombre.strip().lower())
+        for codificacion in ('gzip', 'deflate'):
+            if codificacion in aceptadas:
+                return codificacion
+        return None
+
+    def read_json(self):
+        longitud = int(self.headers.get('Content-Length') or 0)
+        if not longitud:
+            return {}
+        try:
+            return json.loads(self.rfile.read(longitud))
+        except ValueError:
+            return None
+
+    def personnel_target(self, path):
+        """
+        Returns:
+            tuple: (colección, id o None) de una ruta /api/personnel/..., o None
+        """
+        partes = path[len('/api/personnel/'):].strip('/').split('/')
+        if partes[0] not in PERSONNEL_COLLECTIONS or len(partes) > 2:
+            return None
+        if len(partes) == 1:
+            return partes[0], None
+        try:
+            return partes[0], int(partes[1])
+        except ValueError:
+            return None
+
+    def bearer_token(self):
+        cabecera = self.headers.get('Authorization') or ''
+        return cabecera[len('Bearer '):] if cabecera.startswith('Bearer ') else None
+
+    def do_GET(self):
+        self.backend.esperar_latencia()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/':
+            return self.send_json(200, {'status': 'ok'})
+
+        if url.path == '/canales':
+            return self.send_json(200, list(self.backend.canales))
+
+        if url.path.startswith('/mensajes/'):
+            canal = unquote(url.path[len('/mensajes/'):])
+            since_id = query.get('since_id', [None])[0]
+            mensajes = self.backend.leer(
+                canal,
+                since_id=int(since_id) if since_id is not None else None,
+                since=query.get('since', [None])[0],
+                wait=min(float(query.get('wait', ['0'])[0]), 60)
+            )
+            if mensajes is None:
+                return self.send_json(404, {'error': 'Canal no encontrado'})
+            return self.send_json(200, mensajes)
+
+        if url.path == '/api/auth/verify':
+            sesion = self.backend.verificar(self.bearer_token())
+            if sesion is None:
+                return self.send_json(401, {'error': 'Token inválido'})
+            return self.send_json(200, sesion)
+
+        if url.path.startswith('/api/personnel/'):
+            destino = self.personnel_target(url.path)
+            if destino is None or destino[1] is not None:
+                return self.send_json(404, {'error': 'No encontrado'})
+            return self.send_json(200, self.backend.listar(destino[0]))
+
+        if url.path.startswith('/api/reports/'):
+            resultado = self.backend.reporte(
+                url.path[len('/api/reports/'):],
+                desde=query.get('desde', [None])[0],
+                hasta=query.get('hasta', [None])[0],
+                page=int(query.get('page', ['1'])[0]),
+                page_size=int(query.get('page_size', ['500'])[0])
+            )
+            if resultado is None:
+                return self.send_json(404, {'error': 'Reporte no encontrado'})
+            filas, siguiente = resultado
+            return self.send_json(200, filas, headers={
+                'X-Next-Page': str(siguiente) if siguiente else ''
+            })
+
+        self.send_json(404, {'error': 'No encontrado'})
+
+    def do_POST(self):
+        self.backend.esperar_latencia()
+        url = urlparse(self.path)
+        datos = self.read_json()
+        if datos is None:
+            return self.send_json(400, {'error': 'JSON inválido'})
+
+        if url.path == '/api/auth/login':
+            usuario = datos.get('usuario')
+            if not usuario or not datos.get('password'):
+                return self.send_json(401, {'error': 'Credenciales inválidas'})
+            nivel = datos.get('nivel', 'admin')
+            return self.send_json(200, {
+                'token': self.backend.login(usuario, nivel),
+                'nivel': nivel,
+                'usuario': usuario,
+            })
+
+        if url.path.startswith('/api/personnel/'):
+            destino = self.personnel_target(url.path)
+            if destino is None or destino[1] is not None:
+                return self.send_json(404, {'error': 'No encontrado'})
+            return self.send_json(201, self.backend.crear_item(destino[0], datos))
+
+        if url.path == '/crear_canal':
+            nombre = datos.get('nombre')
+            if not nombre:
+                return self.send_json(400, {'error': 'Falta nombre'})
+            if not self.backend.crear_canal(nombre):
+                return self.send_json(409, {'error': 'El canal ya existe'})
+            return self.send_json(201, {'nombre': nombre})
+
+        if url.path == '/enviar':
+            mensaje = self.backend.enviar(
+                datos.get('canal'), datos.get('usuario'), datos.get('texto'),
+                key=self.headers.get('Idempotency-Key')
+            )
+            if mensaje is None:
+                return self.send_json(404, {'error': 'Canal no encontrado'})
+            return self.send_json(201, mensaje)
+
+        self.send_json(404, {'error': 'No encontrado'})
+
+    def do_PUT(self):
+        self.backend.esperar_latencia()
+        datos = self.read_json()
+        if datos is None:
+            return self.send_json(400, {'error': 'JSON inválido'})
+        destino = self.personnel_target(urlparse(self.path).path) if self.path.startswith('/api/personnel/') else None
+        if destino is None or destino[1] is None:
+            return self.send_json(404, {'error': 'No encontrado'})
+        item = self.backend.actualizar_item(destino[0], destino[1], datos)
+        if item is None:
+            return self.send_json(404, {'error': 'No encontrado'})
+        return self.send_json(200, item)
+
+    def do_DELETE(self):
+        self.backend.esperar_latencia()
+        self.read_json()
+        destino = self.personnel_target(urlparse(self.path).path) if self.path.startswith('/api/personnel/') else None
+        if destino is None or destino[1] is None:
+            return self.send_json(404, {'error': 'No encontrado'})
+        if self.backend.eliminar_item(destino[0], destino[1]) is None:
+            return self.send_json(404, {'error': 'No encontrado'})
+        return self.send_json(200, {'eliminado': destino[1]})
+
+
+def create_server(host='127.0.0.1', port=0, backend=None):
+    """
+    Crea el servidor sin arrancarlo
+
+    Args:
+        host (str): Interfaz de escucha
+        port (int): Puerto (0 = uno libre)
+        backend (StubBackend): Estado inicial
+
+    Returns:
+        ThreadingHTTPServer: Servidor; su URL es http://host:server.server_port
+    """
+    handler = type('BoundStubHandler', (StubHandler,), {'backend': backend or StubBackend()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(**kwargs):
+    """
+    Arranca el servidor en un hilo en segundo plano
+
+    Returns:
+        tuple: (servidor, URL base)
+    """
+    server = create_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backend local de pruebas')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latencia añadida a cada respuesta')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Latencia aleatoria extra (0..jitter)')
+    parser.add_argument('--mensajes', type=int, default=0, help='Mensajes iniciales por canal')
+    parser.add_argument('--largo-texto', type=int, default=40, help='Caracteres por mensaje inicial')
+    parser.add_argument('--empleados', type=int, default=0, help='Empleados iniciales')
+    parser.add_argument('--cuadrillas', type=int, default=5, help='Cuadrillas iniciales')
+    parser.add_argument('--filas-reporte', type=int, default=2000, help='Filas de cada reporte')
+    parser.add_argument('--sin-compresion', action='store_true', help='Ignorar Accept-Encoding')
+    parser.add_argument('--sin-msgpack', action='store_true', help='Responder siempre en JSON')
+    args = parser.parse_args()
+
+    backend = StubBackend(
+        filas_reporte=args.filas_reporte, mensajes=args.mensajes,
+        largo_texto=args.largo_texto, empleados=args.empleados, cuadrillas=args.cuadrillas,
+        latencia=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        comprimir=not args.sin_compresion, usar_msgpack=not args.sin_msgpack
+    )
+    server = create_server(args.host, args.port, backend)
+    print(f"✅ Backend de pruebas en http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+"""
+Widgets reutilizables de la aplicación móvil
+"""
@@ -0,0 +1,46 @@
+"""
+Imagen remota con caché
+Sustituye a AsyncImage en listas (chat, personal, reportes): al reciclar
+o volver a mostrar una fila la textura sale de la caché en memoria o en
+disco en lugar de descargarse y decodificarse de nuevo
+"""
+
+from kivy.properties import StringProperty
+from kivy.uix.image import Image
+
+from services.image_cache import get_image_cache
+
+
+class CachedImage(Image):
+    """
+    Image que carga su textura desde url a través de la caché compartida
+
+    Mientras llega muestra la imagen de source (p. ej. un avatar genérico)
+    """
+
+    url = StringProperty('')
+
+    def on_url(self, instance, url):
+        cache = get_image_cache()
+        textura = cache.get(url) if url else None
+        if textura is not None:
+            self.texture = textura
+            return
+
+        # Fila reciclada: no dejar la imagen anterior mientras se carga la nueva
+        if self.source:
+            self.reload()
+        else:
+            self.texture = None
+        if url:
+            cache.load(url, lambda textura, url=url: self._aplicar(url, textura))
+
+    def reset_for_pool(self):
+        """Suelta la textura al devolverse a la reserva de widgets"""
+        self.url = ''
+        self.texture = None
+
+    def _aplicar(self, url, textura):
+        # La fila pudo reciclarse para otra URL mientras se cargaba
+        if url == self.url:
+            self.texture = textura
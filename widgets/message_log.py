@@ -0,0 +1,116 @@
+"""
+Registro de mensajes acotado y virtualizado
+Sustituye al Label que crecía sin límite: conserva solo las últimas
+líneas en un buffer circular y pinta únicamente las filas visibles
+"""
+
+from collections import deque
+
+from kivy.lang import Builder
+from kivy.properties import NumericProperty
+from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+
+import config
+
+Builder.load_string('''
+<MessageLogRow>:
+    size_hint_y: None
+    height: self.texture_size[1] + dp(8)
+    text_size: self.width, None
+    halign: 'left'
+    valign: 'top'
+    font_size: '12sp'
+
+<MessageLog>:
+    viewclass: 'MessageLogRow'
+    RecycleBoxLayout:
+        orientation: 'vertical'
+        default_size: None, dp(24)
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+''')
+
+
+class MessageLogRow(Label):
+    """Fila reciclable del registro"""
+    pass
+
+
+class MessageLog(RecycleView):
+    """
+    Lista de mensajes con retención limitada
+
+    Añadir una línea cuesta lo mismo al principio del turno que al final:
+    al llegar al límite se descarta la más antigua y el RecycleView solo
+    reutiliza las filas que caben en pantalla.
+    """
+
+    max_entries = NumericProperty(config.MESSAGE_LOG_LIMIT)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._buffer = deque(maxlen=max(1, int(self.max_entries)))
+
+    def append(self, text):
+        """
+        Agrega una línea al final del registro
+
+        Args:
+            text (str): Texto de la línea
+        """
+        if len(self._buffer) == self._buffer.maxlen:
+            self._buffer.popleft()
+            del self.data[0]
+
+        entrada = {'text': text}
+        self._buffer.append(entrada)
+
+        # Seguir al último mensaje solo si el usuario no se ha desplazado
+        seguir = self.scroll_y <= 0.01 or self.height >= self.viewport_height()
+        self.data.append(entrada)
+        if seguir:
+            self.scroll_y = 0
+
+    def extend(self, lines):
+        """
+        Agrega varias líneas de una vez, con una sola actualización de la
+        lista en lugar de una por línea
+        """
+        entradas = [{'text': line} for line in lines]
+        if not entradas:
+            return
+        seguir = self.scroll_y <= 0.01 or self.height >= self.viewport_height()
+        self._buffer.extend(entradas)
+        self.data = list(self._buffer)
+        if seguir:
+            self.scroll_y = 0
+
+    def clear(self, *lines):
+        """
+        Vacía el registro y opcionalmente lo inicializa con nuevas líneas
+
+        Args:
+            *lines (str): Líneas iniciales
+        """
+        self._buffer.clear()
+        self._buffer.extend({'text': line} for line in lines[-self._buffer.maxlen:])
+        self.data = list(self._buffer)
+        self.scroll_y = 1
+
+    def lines(self):
+        """
+        Returns:
+            list: Textos retenidos, del más antiguo al más reciente
+        """
+        return [entrada['text'] for entrada in self._buffer]
+
+    def viewport_height(self):
+        """Altura total del contenido desplazable"""
+        return self.layout_manager.height if self.layout_manager else 0
+
+    def on_max_entries(self, instance, value):
+        # Rehacer el buffer con la nueva capacidad conservando lo más reciente
+        self._buffer = deque(getattr(self, '_buffer', ()), maxlen=max(1, int(value)))
+        self.data = list(self._buffer)
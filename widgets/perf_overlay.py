@@ -0,0 +1,73 @@
+"""
+Superposición de rendimiento
+Muestra sobre toda la interfaz los frames, la memoria, los widgets y las
+métricas más lentas. Un toque exporta el snapshot JSON.
+"""
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.lang import Builder
+from kivy.uix.label import Label
+
+import config
+from services.metrics import metrics
+
+Builder.load_string('''
+#:import Window kivy.core.window.Window
+
+<PerfOverlay>:
+    size_hint: None, None
+    width: Window.width
+    height: self.texture_size[1] + dp(6)
+    pos: 0, Window.height - self.height
+    text_size: self.width - dp(8), None
+    halign: 'left'
+    valign: 'top'
+    font_size: '10sp'
+    color: 0.6, 1, 0.6, 1
+    canvas.before:
+        Color:
+            rgba: 0, 0, 0, 0.6
+        Rectangle:
+            pos: self.pos
+            size: self.size
+''')
+
+
+class PerfOverlay(Label):
+    """Etiqueta flotante actualizada cada config.METRICS_OVERLAY_INTERVAL segundos"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._evento = None
+
+    def show(self):
+        """Añade la superposición a la ventana y empieza a refrescarla"""
+        if self.parent is None:
+            Window.add_widget(self)
+        if self._evento is None:
+            self._evento = Clock.schedule_interval(self.refresh, config.METRICS_OVERLAY_INTERVAL)
+        self.refresh()
+
+    def hide(self):
+        if self._evento is not None:
+            self._evento.cancel()
+            self._evento = None
+        if self.parent is not None:
+            Window.remove_widget(self)
+
+    def refresh(self, *args):
+        # Contar widgets recorre el árbol: solo al ritmo de la superposición
+        raiz = Window.children[-1] if Window.children else None
+        metrics.sample_runtime(raiz)
+        self.text = '\n'.join(metrics.summary_lines())
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return False
+        try:
+            path = metrics.export()
+            print(f"📊 Métricas exportadas: {path}")
+        except OSError as e:
+            print(f"❌ Error exportando métricas: {e}")
+        return True